@@ -0,0 +1,95 @@
+"""Measures the temporary memory allocated by one optimizer step.
+
+Compares the reference update (``_update_parameter(x_t)``, which builds
+every intermediate term as a new array) with the in-place kernels used by
+``step()`` and ``fit()`` (``_update_parameter(x_t, out)``). The gradient
+writes into a preallocated array, so only the optimizer allocations are
+counted. Allocations are reported in units of the parameter array size.
+
+Usage:
+    python -m benchmarks.bench_allocations [dimension]
+"""
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from gradient_descent import GradientDescent, Momentum, NAG, RMSprop, Adam
+
+OPTIMIZERS = [GradientDescent, Momentum, NAG, RMSprop, Adam]
+N_STEPS = 20
+
+
+def make_problem(dimension, dtype):
+    """Builds the quadratic 4*sum(x**2) with an allocation-free gradient
+
+    Args:
+        dimension (int): number of parameters
+        dtype (np.dtype): floating point type of the parameters
+
+    Returns:
+        (function): objective
+        (function): gradient writing into a preallocated array
+    """
+    gradient = np.empty(dimension, dtype=dtype)
+
+    def f(x):
+        return 4*np.dot(x, x)
+
+    def df(x):
+        return np.multiply(x, 8, out=gradient)
+
+    return f, df
+
+
+def measure(optimizer, x_t, inplace):
+    """Runs N_STEPS steps and records the transient memory of each one
+
+    Args:
+        optimizer (GradientDescent): optimizer instance
+        x_t (np.array): point for calculation
+        inplace (bool): whether to use the preallocated kernels
+
+    Returns:
+        (float): peak temporary bytes per step, in parameter arrays
+        (float): mean time per step in milliseconds
+    """
+    optimizer._init_state(x_t)
+    out = optimizer._update_buffer if inplace else None
+    optimizer.n_iterations = 1
+    optimizer._update_parameter(x_t, out)  # warm up the state
+
+    peaks = []
+    start = time.perf_counter()
+    for _ in range(N_STEPS):
+        optimizer.n_iterations += 1
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        optimizer._update_parameter(x_t, out)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    elapsed = (time.perf_counter() - start)/N_STEPS
+
+    return max(peaks)/x_t.nbytes, elapsed*1e3
+
+
+def main(dimension=1_000_000):
+    tracemalloc.start()
+    print(f'dimension={dimension}, peak temporary arrays per step '
+          '(reference -> in-place), ms per step')
+    for dtype in (np.float64, np.float32):
+        f, df = make_problem(dimension, dtype)
+        x_t = np.linspace(-1, 1, dimension, dtype=dtype)
+        for optimizer_class in OPTIMIZERS:
+            before = measure(optimizer_class(f, df, x_t, n_history_points=0),
+                             x_t, False)
+            after = measure(optimizer_class(f, df, x_t, n_history_points=0),
+                            x_t, True)
+            print(f'{optimizer_class.__name__:>16} {np.dtype(dtype).name:>8}'
+                  f'  {before[0]:4.1f} -> {after[0]:4.1f}'
+                  f'  {before[1]:7.2f} -> {after[1]:7.2f}')
+    tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,61 @@
+"""Compares the iterations per second of the Python and Numba backends.
+
+Each optimizer minimizes 4*x**2 from x = 10 with a tolerance too small to
+be reached, so every run performs max_iterations iterations. The first
+compiled run is discarded, as it includes the compilation.
+
+Usage:
+    python -m benchmarks.bench_jit [max_iterations]
+"""
+import sys
+import time
+
+from gradient_descent import GradientDescent, Momentum, NAG, RMSprop, Adam
+
+OPTIMIZERS = [GradientDescent, Momentum, NAG, RMSprop, Adam]
+
+
+def f(x):
+    return 4*x**2
+
+
+def df(x):
+    return 8*x
+
+
+def iterations_per_second(optimizer_class, backend, max_iterations):
+    """Times one fit
+
+    Args:
+        optimizer_class (class): optimizer to run
+        backend (str): 'python' or 'numba'
+        max_iterations (int): number of iterations
+
+    Returns:
+        (float): iterations per second
+        (float): local minimum found
+    """
+    optimizer = optimizer_class(f, df, x_t=10, learning_rate=1e-4,
+                                tolerance=0, max_iterations=max_iterations,
+                                backend=backend)
+    start = time.perf_counter()
+    minimum = optimizer.fit()
+    elapsed = time.perf_counter() - start
+    return optimizer.n_iterations/elapsed, minimum
+
+
+def main(max_iterations=200_000):
+    print(f'max_iterations={max_iterations}, iterations per second')
+    for optimizer_class in OPTIMIZERS:
+        iterations_per_second(optimizer_class, 'numba', 10)  # compilation
+        python, reference = iterations_per_second(optimizer_class, 'python',
+                                                  max_iterations)
+        numba, minimum = iterations_per_second(optimizer_class, 'numba',
+                                               max_iterations)
+        print(f'{optimizer_class.__name__:>16}  python {python:12,.0f}'
+              f'  numba {numba:14,.0f}  |difference| '
+              f'{abs(minimum - reference):.1e}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,94 @@
+"""Compares L-BFGS with Adam on smooth test functions.
+
+Each optimizer runs until its step falls below the tolerance, or up to
+max_iterations. Reports the iterations, the gradient evaluations (L-BFGS
+also evaluates df in its line search), the wall time and the final value
+of the function.
+
+Usage:
+    python -m benchmarks.bench_lbfgs [dimension] [max_iterations]
+"""
+import sys
+import time
+
+import numpy as np
+
+from gradient_descent import Adam, LBFGS
+
+
+def make_problems(dimension):
+    """Builds the test functions
+
+    Args:
+        dimension (int): number of parameters
+
+    Returns:
+        (dict): (f, df, x_0) by name
+    """
+    curvatures = np.logspace(0, 3, dimension)
+
+    def quadratic(x):
+        return 0.5*np.dot(curvatures, x**2)
+
+    def quadratic_gradient(x):
+        return curvatures*x
+
+    def rosenbrock(x):
+        return np.sum(100*(x[1:] - x[:-1]**2)**2 + (1 - x[:-1])**2)
+
+    def rosenbrock_gradient(x):
+        g = np.zeros_like(x)
+        g[:-1] = -400*x[:-1]*(x[1:] - x[:-1]**2) - 2*(1 - x[:-1])
+        g[1:] += 200*(x[1:] - x[:-1]**2)
+        return g
+
+    def log_sum_exp(x):
+        return np.log(np.sum(np.exp(x))) + 0.5*np.dot(x, x)
+
+    def log_sum_exp_gradient(x):
+        e = np.exp(x)
+        return e/np.sum(e) + x
+
+    return {'ill-conditioned quadratic': (quadratic, quadratic_gradient,
+                                          np.ones(dimension)),
+            'rosenbrock': (rosenbrock, rosenbrock_gradient,
+                           np.zeros(dimension)),
+            'log-sum-exp': (log_sum_exp, log_sum_exp_gradient,
+                            np.linspace(-1, 1, dimension))}
+
+
+def run(optimizer):
+    """Times one fit
+
+    Args:
+        optimizer (GradientDescent): optimizer to run
+
+    Returns:
+        (float): wall time in seconds
+        (float): value of the function at the minimum found
+    """
+    start = time.perf_counter()
+    minimum = optimizer.fit()
+    return time.perf_counter() - start, optimizer.f(minimum)
+
+
+def main(dimension=100, max_iterations=20_000):
+    print(f'dimension={dimension}, max_iterations={max_iterations}')
+    print(f'{"function":>26} {"optimizer":>10} {"iterations":>10} '
+          f'{"df calls":>9} {"time (s)":>9} {"f":>10}')
+    for name, (f, df, x_0) in make_problems(dimension).items():
+        for optimizer in (Adam(f, df, x_0, learning_rate=1e-2,
+                               tolerance=1e-8, max_iterations=max_iterations,
+                               n_history_points=0),
+                          LBFGS(f, df, x_0, tolerance=1e-8,
+                                max_iterations=max_iterations,
+                                n_history_points=0)):
+            elapsed, f_min = run(optimizer)
+            print(f'{name:>26} {type(optimizer).__name__:>10} '
+                  f'{optimizer.n_iterations:>10} '
+                  f'{optimizer.n_gradient_evaluations:>9} {elapsed:>9.3f} '
+                  f'{f_min:>10.2e}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,338 @@
+"""Measures the throughput and convergence speed of every optimizer.
+
+Each optimizer minimizes the standard test functions (quadratic,
+ill-conditioned quadratic, Rosenbrock and Rastrigin) for scalar and vector
+parameters of several sizes. For every run the suite reports:
+
+- iterations and iterations per second of fit(), best of the repeats.
+  Each repeat calls fit() as many times as needed to last at least
+  min_seconds, so that short runs aren't dominated by timer and
+  scheduling noise
+- time to tolerance: wall time of fit() when the step fell below the
+  tolerance before max_iterations, null otherwise
+- gradient evaluations
+- peak memory allocated during fit(), measured by a separate traced run
+  so that tracing doesn't slow down the timed ones
+
+The results are written as JSON. Given a baseline file from an earlier run,
+the suite compares the two and exits with status 1 when a run got slower
+than the threshold or needs a different number of iterations. The spread
+of the repeats is the noise floor of the comparison: a run is only slower
+when its fastest repeat is slower than the slowest repeat of the baseline.
+
+Usage:
+    python -m benchmarks.bench_suite [--output results.json]
+        [--baseline baseline.json] [--threshold 0.1] [--sizes 1 100 10000]
+        [--max-iterations 10000] [--repeats 5] [--min-seconds 0.2]
+        [--quick]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from gradient_descent import GradientDescent, Momentum, NAG, RMSprop, Adam
+
+OPTIMIZERS = [GradientDescent, Momentum, NAG, RMSprop, Adam]
+# Momentum and NAG take the learning rate of GradientDescent, RMSprop and
+# Adam normalize the gradient, so their learning rate bounds the step
+ADAPTIVE = (RMSprop, Adam)
+
+
+class Problem():
+    """Test function, its gradient and the starting point of each size
+
+    Attributes:
+        name (str): name of the function
+        f (function): objective
+        df (function): gradient
+        learning_rate (float): stable learning rate of GradientDescent,
+        Momentum and NAG
+        adaptive_learning_rate (float): learning rate of RMSprop and Adam
+        supports_scalar (bool): whether the function is defined for scalar
+        parameters
+    """
+
+    def __init__(self, name, f, df, start, learning_rate,
+                 adaptive_learning_rate=1e-2, supports_scalar=True):
+        """Constructor
+
+        Args:
+            name (str): name of the function
+            f (function): objective
+            df (function): gradient
+            start (function): starting point of a number of parameters
+            learning_rate (float): stable learning rate of GradientDescent,
+            Momentum and NAG
+            adaptive_learning_rate (float, optional): learning rate of
+            RMSprop and Adam
+            supports_scalar (bool, optional): whether the function is
+            defined for scalar parameters
+
+        Returns:
+            None
+        """
+        self.name = name
+        self.f = f
+        self.df = df
+        self.start = start
+        self.learning_rate = learning_rate
+        self.adaptive_learning_rate = adaptive_learning_rate
+        self.supports_scalar = supports_scalar
+
+    def x_0(self, size):
+        """Starting point
+
+        Args:
+            size (int or None): number of parameters, None for a scalar
+
+        Returns:
+            (float or np.array): starting point
+        """
+        if size is None:
+            return float(self.start(1)[0])
+        return self.start(size)
+
+
+def _curvatures(x):
+    """Curvatures from 1 to 100 of the ill-conditioned quadratic"""
+    return np.logspace(0, 2, np.size(x))
+
+
+def make_problems():
+    """Builds the test functions
+
+    Args:
+        None
+
+    Returns:
+        (list): Problem instances
+    """
+    def quadratic(x):
+        return 4*np.sum(x**2)
+
+    def quadratic_gradient(x):
+        return 8*x
+
+    def ill_conditioned(x):
+        return 0.5*np.sum(_curvatures(x)*x**2)
+
+    def ill_conditioned_gradient(x):
+        return _curvatures(x)*x
+
+    def rosenbrock(x):
+        return np.sum(100*(x[1:] - x[:-1]**2)**2 + (1 - x[:-1])**2)
+
+    def rosenbrock_gradient(x):
+        g = np.zeros_like(x)
+        g[:-1] = -400*x[:-1]*(x[1:] - x[:-1]**2) - 2*(1 - x[:-1])
+        g[1:] += 200*(x[1:] - x[:-1]**2)
+        return g
+
+    def rastrigin(x):
+        return 10*np.size(x) + np.sum(x**2 - 10*np.cos(2*np.pi*x))
+
+    def rastrigin_gradient(x):
+        return 2*x + 20*np.pi*np.sin(2*np.pi*x)
+
+    return [Problem('quadratic', quadratic, quadratic_gradient,
+                    lambda n: np.linspace(-10, 10, n) + 1, 0.05),
+            Problem('ill-conditioned', ill_conditioned,
+                    ill_conditioned_gradient, np.ones, 0.009,
+                    supports_scalar=False),
+            Problem('rosenbrock', rosenbrock, rosenbrock_gradient,
+                    np.zeros, 1e-3, supports_scalar=False),
+            Problem('rastrigin', rastrigin, rastrigin_gradient,
+                    lambda n: np.linspace(-0.4, 0.4, n), 2e-3)]
+
+
+def _build(optimizer_class, problem, size, max_iterations, tolerance):
+    """Builds the optimizer of one run"""
+    learning_rate = problem.adaptive_learning_rate \
+        if issubclass(optimizer_class, ADAPTIVE) else problem.learning_rate
+    return optimizer_class(problem.f, problem.df, problem.x_0(size),
+                           learning_rate=learning_rate, tolerance=tolerance,
+                           max_iterations=max_iterations)
+
+
+def run(optimizer_class, problem, size, max_iterations=10_000,
+        tolerance=1e-6, repeats=5, min_seconds=0.2):
+    """Benchmarks one optimizer on one problem
+
+    Args:
+        optimizer_class (class): optimizer to run
+        problem (Problem): test function
+        size (int or None): number of parameters, None for a scalar
+        max_iterations (int, optional): maximum number of iterations
+        tolerance (float, optional): step size at which a run converges
+        repeats (int, optional): number of timed runs
+        min_seconds (float, optional): minimum duration of a timed run,
+        which calls fit() again until it is reached
+
+    Returns:
+        (dict): measurements of the run
+    """
+    optimizer = _build(optimizer_class, problem, size, max_iterations,
+                       tolerance)
+    repeat_seconds = []
+    for _ in range(repeats):
+        n_fits = 0
+        start = time.perf_counter()
+        while True:
+            minimum = optimizer.fit()
+            n_fits += 1
+            seconds = time.perf_counter() - start
+            if seconds >= min_seconds:
+                break
+        repeat_seconds.append(seconds/n_fits)
+    elapsed = min(repeat_seconds)
+
+    # fit() reuses the buffers of the timed runs, so the traced run only
+    # sees the allocations of an optimization, not the first allocation
+    tracemalloc.start()
+    optimizer.fit()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    converged = optimizer.n_iterations < max_iterations
+    return {'problem': problem.name,
+            'optimizer': optimizer_class.__name__,
+            'size': 'scalar' if size is None else size,
+            'iterations': optimizer.n_iterations,
+            'iterations_per_second': optimizer.n_iterations/elapsed,
+            'seconds': elapsed,
+            'repeat_seconds': repeat_seconds,
+            'time_to_tolerance': elapsed if converged else None,
+            'converged': converged,
+            'gradient_evaluations': optimizer.n_gradient_evaluations,
+            'peak_memory_bytes': peak_memory,
+            'f': float(problem.f(minimum))}
+
+
+def run_suite(sizes=(None, 100, 10_000), max_iterations=10_000,
+              tolerance=1e-6, repeats=5, min_seconds=0.2):
+    """Benchmarks every optimizer on every problem and size
+
+    Args:
+        sizes (tuple, optional): numbers of parameters, None for a scalar
+        max_iterations (int, optional): maximum number of iterations
+        tolerance (float, optional): step size at which a run converges
+        repeats (int, optional): number of timed runs
+        min_seconds (float, optional): minimum duration of a timed run
+
+    Returns:
+        (dict): metadata of the environment and results of every run
+    """
+    results = []
+    for problem in make_problems():
+        for size in sizes:
+            if size is None and not problem.supports_scalar:
+                continue
+            for optimizer_class in OPTIMIZERS:
+                results.append(run(optimizer_class, problem, size,
+                                   max_iterations, tolerance, repeats,
+                                   min_seconds))
+    return {'metadata': {'date': datetime.now(timezone.utc).isoformat(),
+                         'python': platform.python_version(),
+                         'numpy': np.__version__,
+                         'machine': platform.machine(),
+                         'max_iterations': max_iterations,
+                         'tolerance': tolerance,
+                         'repeats': repeats,
+                         'min_seconds': min_seconds},
+            'results': results}
+
+
+def compare(results, baseline, threshold=0.1):
+    """Compares a run of the suite with a baseline
+
+    Args:
+        results (dict): output of run_suite
+        baseline (dict): earlier output of run_suite
+        threshold (float, optional): relative loss of iterations per second
+        reported as a regression, beyond the spread of the repeats
+
+    Returns:
+        (list): one line per regression, empty when there is none
+    """
+    def key(result):
+        return result['problem'], result['optimizer'], str(result['size'])
+
+    reference = {key(result): result for result in baseline['results']}
+    regressions = []
+    for result in results['results']:
+        before = reference.get(key(result))
+        if before is None:
+            continue
+        name = '{} {} size={}'.format(*key(result))
+        if result['iterations'] != before['iterations']:
+            regressions.append(f'{name}: {before["iterations"]} -> '
+                               f'{result["iterations"]} iterations')
+        # Best of the run against the worst of the baseline, so that the
+        # noise of the repeats isn't reported
+        slowest = max(before.get('repeat_seconds', [before['seconds']]))
+        ratio = result['iterations_per_second'] / \
+            (before['iterations']/slowest)
+        if ratio < 1 - threshold:
+            regressions.append(f'{name}: {ratio:.2f}x iterations per second')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--output', help='JSON file receiving the results')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--threshold', type=float,
+                        help='relative slowdown reported as a regression. '
+                             'Defaults to 0.1, and 0.3 with --quick')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10_000],
+                        help='numbers of vector parameters, run along with '
+                             'the scalar case')
+    parser.add_argument('--max-iterations', type=int, default=10_000)
+    parser.add_argument('--tolerance', type=float, default=1e-6)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--min-seconds', type=float, default=0.2,
+                        help='minimum duration of a timed run')
+    parser.add_argument('--quick', action='store_true',
+                        help='small sizes and budgets, for a smoke test '
+                             'only reporting large slowdowns')
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.sizes, args.max_iterations = [10], 500
+        args.repeats, args.min_seconds = 5, 0.05
+    if args.threshold is None:
+        # The short runs of --quick are noisier
+        args.threshold = 0.3 if args.quick else 0.1
+
+    results = run_suite([None] + args.sizes, args.max_iterations,
+                        args.tolerance, args.repeats, args.min_seconds)
+    print(f'{"problem":>16} {"optimizer":>16} {"size":>7} {"iterations":>10}'
+          f' {"it/s":>10} {"evals":>7} {"peak KiB":>9} {"f":>10}')
+    for result in results['results']:
+        print(f'{result["problem"]:>16} {result["optimizer"]:>16} '
+              f'{result["size"]:>7} {result["iterations"]:>10} '
+              f'{result["iterations_per_second"]:>10.0f} '
+              f'{result["gradient_evaluations"]:>7} '
+              f'{result["peak_memory_bytes"]/1024:>9.1f} '
+              f'{result["f"]:>10.2e}')
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print('REGRESSION', regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,7 +10,7 @@ class Adam(GradientDescent):
         name (string): name of the optmizer
         f (function): function for optimization
         df (function): first derivation of the function
-        x_t (float): starting variable for analysis
+        x_t (float or np.array): starting variable for analysis
         learning_rate (float): learning rate
         tolerance (int): tolerance for the distance between two consecutive
         estimates in a subsequence that converges
@@ -33,12 +33,12 @@ class Adam(GradientDescent):
     """
     def __init__(self, f, df, x_t, learning_rate=1e-3, tolerance=1e-6,
                  max_iterations=1000, n_history_points=1000, beta_1=0.9,
-                 beta_2=0.999):
+                 beta_2=0.999, **kwargs):
         """Constructor
         Args:
             f (function): function for optimization
             df (function): first derivation of the function
-            x_t (float): starting variable for analysis
+            x_t (float or np.array): starting variable for analysis
             learning_rate (float, optional): learning rate
             tolerance (int, optional): tolerance for the distance
             between two consecutive estimates in a subsequence that converges
@@ -50,12 +50,15 @@ class Adam(GradientDescent):
             beta_2 (float, optional): fraction of the past vector that
             contains an exponentially decaying average of
             past squared gradients
+            **kwargs: optional arguments forwarded to GradientDescent,
+            such as batch
 
         Returns:
             None
         """
-        GradientDescent.__init__(self, f, df, x_t, learning_rate, tolerance, 
-                                 max_iterations, n_history_points)
+        GradientDescent.__init__(self, f, df, x_t, learning_rate, tolerance,
+                                 max_iterations, n_history_points,
+                                 **kwargs)
         self.name = 'Adam Optimizer'
         self.beta_1 = beta_1
         self.beta_2 = beta_2
@@ -64,23 +67,87 @@ class Adam(GradientDescent):
         self.__v_t = 0
         self.__v_t_1 = 0
 
-    def _update_parameter(self, x_t):
+    def _get_state(self):
+        """Gets the internal state of the optimizer
+
+        Args:
+            None
+
+        Returns:
+            (dict): state values by name
+        """
+        return {**GradientDescent._get_state(self), 'm_t': self.__m_t,
+                'v_t': self.__v_t}
+
+    def _set_state(self, state):
+        """Restores the internal state of the optimizer
+
+        Args:
+            state (dict): state values by name, as given by _get_state
+
+        Returns:
+            None
+        """
+        GradientDescent._set_state(self, state)
+        self.__m_t = self.__m_t_1 = state['m_t']
+        self.__v_t = self.__v_t_1 = state['v_t']
+
+    def _init_state(self, x_t):
+        """Allocates the moment arrays of array parameters
+
+        Args:
+            x_t (np.array): point the state is shaped after
+
+        Returns:
+            None
+        """
+        GradientDescent._init_state(self, x_t)
+        self.__m_t = self.__m_t_1 = self._state_buffer(self.__m_t, x_t)
+        self.__v_t = self.__v_t_1 = self._state_buffer(self.__v_t, x_t)
+
+    def _compute_update(self, g_t, out=None):
         """Computes the current update vector for Adam Optimizer
 
         Params:
-            x_t (float): point for calculation
+            g_t (float): gradient evaluated for the current step
+            out (np.array, optional): preallocated array receiving the update
 
         Returns:
             (float): update amount
         """
+        epsilon = 1e-8  # handling division by zero
+
+        if out is not None:
+            # Same update computed in preallocated arrays: out holds the
+            # intermediate terms before receiving the update
+            np.multiply(g_t, 1 - self.beta_1, out=out)
+            self.__m_t *= self.beta_1
+            self.__m_t += out
+            np.multiply(g_t, g_t, out=out)
+            out *= 1 - self.beta_2
+            self.__v_t *= self.beta_2
+            self.__v_t += out
+
+            # Bias corrections are folded into scalar factors
+            np.sqrt(self.__v_t, out=out)
+            out /= (1 - self.beta_2**self.n_iterations)**0.5
+            out += epsilon
+            np.divide(self.__m_t, out, out=out)
+            out *= self.learning_rate/(1 - self.beta_1**self.n_iterations)
+            return out
+
+        # Moments are updated in place, so vector parameters reuse the
+        # same state arrays at every step
 
         # Exponentially decaying average of past gradient m_t
-        self.__m_t_1 = self.beta_1*self.__m_t + (1 - self.beta_1)*self.df(x_t)
-        self.__m_t = self.__m_t_1
+        self.__m_t *= self.beta_1
+        self.__m_t += (1 - self.beta_1)*g_t
+        self.__m_t_1 = self.__m_t
 
         # Exponentially decaying average of past squared gradients v_t
-        self.__v_t_1 = self.beta_2*self.__v_t + (1-self.beta_2)*self.df(x_t)**2
-        self.__v_t = self.__v_t_1
+        self.__v_t *= self.beta_2
+        self.__v_t += (1 - self.beta_2)*g_t**2
+        self.__v_t_1 = self.__v_t
 
         # Adam includes bias correction to the estimates of both the
         # first-moments (the momentum term) and the second order moments
@@ -89,6 +156,47 @@ class Adam(GradientDescent):
         m_hat_t = self.__m_t_1/(1 - self.beta_1**self.n_iterations)
         v_hat_t = self.__v_t_1/(1 - self.beta_2**self.n_iterations)
 
-        epsilon = 1e-8  # handling division by zero
-
         return self.learning_rate*m_hat_t/(np.sqrt(v_hat_t) + epsilon)
+
+    def _compute_sparse_update(self, indices, g_t):
+        """Computes the update of the rows with a nonzero gradient, with
+        the bias corrections of the current iteration
+
+        Params:
+            indices (np.array): unique indices of the rows
+            g_t (np.array): gradient of the rows
+
+        Returns:
+            (np.array): update of the rows
+        """
+        epsilon = 1e-8
+
+        m_t = self.__m_t[indices]
+        m_t *= self.beta_1
+        m_t += (1 - self.beta_1)*g_t
+        self.__m_t[indices] = m_t
+        v_t = self.__v_t[indices]
+        v_t *= self.beta_2
+        v_t += (1 - self.beta_2)*g_t**2
+        self.__v_t[indices] = v_t
+
+        denominator = np.sqrt(v_t)
+        denominator /= (1 - self.beta_2**self.n_iterations)**0.5
+        denominator += epsilon
+        return self.learning_rate/(1 - self.beta_1**self.n_iterations) * \
+            m_t/denominator
+
+    def _catch_up(self, indices, skipped):
+        """Decays the moments of rows with a zero gradient over the steps
+        they skipped. The rows don't move during these steps, the dense
+        update would still move them along their decaying first moment
+
+        Params:
+            indices (np.array): unique indices of the rows
+            skipped (np.array): number of skipped steps of each row
+
+        Returns:
+            None
+        """
+        self.__m_t[indices] *= self.beta_1**skipped
+        self.__v_t[indices] *= self.beta_2**skipped
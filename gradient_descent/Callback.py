@@ -0,0 +1,228 @@
+"""Callbacks notified by fit(), resume(), fit_minibatch() and fit_async()
+while they run, passed to the optimizers with the callbacks argument.
+
+Without callbacks, the loop only pays for one check of the empty list per
+iteration. With callbacks, the optimizer also measures the time spent in df
+(or fg), available to the callbacks as optimizer.gradient_seconds.
+"""
+import time
+
+import numpy as np
+
+
+class Callback():
+    """Base class of the callbacks. Every event does nothing by default, so
+    subclasses only override the ones they use
+    """
+
+    def on_fit_start(self, optimizer, x_t):
+        """Called when an optimization starts or resumes
+
+        Args:
+            optimizer (GradientDescent): running optimizer. Its
+            n_iterations is the iteration of x_t: 0, or the iteration of
+            the checkpoint when resuming
+            x_t (float or np.array): starting point
+
+        Returns:
+            None
+        """
+
+    def on_step(self, optimizer, x_t, step):
+        """Called after every iteration. Array parameters are updated in
+        place, copy x_t to keep it
+
+        Args:
+            optimizer (GradientDescent): running optimizer
+            x_t (float or np.array): new point
+            step (float): size of the step, the per-start convergence mask
+            in batch mode
+
+        Returns:
+            None
+        """
+
+    def on_converge(self, optimizer, x_t):
+        """Called when the step falls below the tolerance before
+        max_iterations. In batch mode, when every start has converged
+
+        Args:
+            optimizer (GradientDescent): running optimizer
+            x_t (float or np.array): local minimum
+
+        Returns:
+            None
+        """
+
+    def on_diverge(self, optimizer, x_t, error=None):
+        """Called when the optimization ends on a point that isn't finite,
+        or on an OverflowError
+
+        Args:
+            optimizer (GradientDescent): running optimizer
+            x_t (float or np.array): last point
+            error (Exception, optional): error that stopped the optimization
+
+        Returns:
+            None
+        """
+
+    def on_fit_end(self, optimizer, x_t):
+        """Called last when an optimization ends, however it ends: after
+        on_converge or on_diverge, at max_iterations, or when an error or a
+        cancellation interrupts it
+
+        Args:
+            optimizer (GradientDescent): running optimizer
+            x_t (float or np.array): last point
+
+        Returns:
+            None
+        """
+
+
+class StepTimer(Callback):
+    """Collects the wall time of every iteration
+
+    Attributes:
+        times (np.array): seconds taken by each iteration of the last
+        optimization
+        total (float): seconds taken by all the iterations
+        mean (float): mean seconds per iteration
+    """
+
+    def __init__(self):
+        """Constructor
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.__times = []
+        self.__last = None
+
+    def on_fit_start(self, optimizer, x_t):
+        self.__times.clear()
+        self.__last = time.perf_counter()
+
+    def on_step(self, optimizer, x_t, step):
+        now = time.perf_counter()
+        self.__times.append(now - self.__last)
+        self.__last = now
+
+    @property
+    def times(self):
+        return np.array(self.__times)
+
+    @property
+    def total(self):
+        return sum(self.__times)
+
+    @property
+    def mean(self):
+        return self.total/len(self.__times) if self.__times else np.nan
+
+
+class GradientTimer(Callback):
+    """Splits the time of an optimization between the evaluations of df
+    (or fg, including the ones of line searches) and the overhead of the
+    optimizer: updates, history and callbacks
+
+    Attributes:
+        total_seconds (float): wall time of the last optimization
+        gradient_seconds (float): time spent in df
+        overhead_seconds (float): remaining time
+        gradient_fraction (float): share of the time spent in df
+    """
+
+    def __init__(self):
+        """Constructor
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.total_seconds = 0.0
+        self.gradient_seconds = 0.0
+        self.__start = None
+        self.__gradient_start = 0.0
+
+    def on_fit_start(self, optimizer, x_t):
+        self.__start = time.perf_counter()
+        self.__gradient_start = optimizer.gradient_seconds
+        self.total_seconds = 0.0
+        self.gradient_seconds = 0.0
+
+    def on_step(self, optimizer, x_t, step):
+        self.total_seconds = time.perf_counter() - self.__start
+        self.gradient_seconds = optimizer.gradient_seconds - \
+            self.__gradient_start
+
+    @property
+    def overhead_seconds(self):
+        return self.total_seconds - self.gradient_seconds
+
+    @property
+    def gradient_fraction(self):
+        if not self.total_seconds:
+            return np.nan
+        return self.gradient_seconds/self.total_seconds
+
+
+class GradientNormStats(Callback):
+    """Running statistics of the norm of the gradient of each step: the
+    euclidean norm for vector parameters, the absolute value per start in
+    batch mode. Nothing is stored per iteration
+
+    Attributes:
+        count (int): number of gradients seen
+        last (float): norm of the last gradient
+        min (float): smallest norm
+        max (float): largest norm
+        mean (float): mean norm
+        std (float): standard deviation of the norms
+    """
+
+    def __init__(self):
+        """Constructor
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.on_fit_start(None, None)
+
+    def on_fit_start(self, optimizer, x_t):
+        self.count = 0
+        self.last = np.nan
+        self.min = np.inf
+        self.max = -np.inf
+        self.mean = 0.0
+        self.__m_2 = 0.0
+
+    def on_step(self, optimizer, x_t, step):
+        g_t = optimizer._g_t
+        if optimizer._is_array and not optimizer.batch:
+            norm = np.linalg.norm(g_t)
+        else:
+            norm = np.abs(g_t)
+        # Welford's update of the mean and of the sum of squared deviations
+        self.count += 1
+        delta = norm - self.mean
+        self.mean = self.mean + delta/self.count
+        self.__m_2 = self.__m_2 + delta*(norm - self.mean)
+        self.min = np.minimum(self.min, norm)
+        self.max = np.maximum(self.max, norm)
+        self.last = norm
+
+    @property
+    def std(self):
+        if not self.count:
+            return np.nan
+        return np.sqrt(self.__m_2/self.count)
@@ -0,0 +1,164 @@
+import os
+import time
+
+import numpy as np
+
+
+class Checkpoint():
+    """Periodic snapshot of an optimization, written to a binary .npz file.
+
+    The file holds the current point, the optimizer state (moments),
+    the iteration and gradient evaluation counters, the last gradient and
+    step, the records of the history and the state of the step-size
+    rule and of the stopping criterion. It is written to a temporary file
+    that then replaces the previous checkpoint, so an interrupted job always
+    leaves a complete checkpoint behind.
+
+    f and df can't be stored: resume on an optimizer built with the same
+    functions and hyperparameters to continue the optimization bit for bit.
+
+    Attributes:
+        path (str): path of the checkpoint file
+        every (int): number of iterations between two checkpoints
+        seconds (float): time between two checkpoints
+    """
+
+    def __init__(self, path, every=None, seconds=None):
+        """Constructor
+
+        Args:
+            path (str): path of the checkpoint file
+            every (int, optional): write a checkpoint every this many
+            iterations
+            seconds (float, optional): write a checkpoint when this many
+            seconds went by since the last one
+
+        Returns:
+            None
+        """
+        self.path = os.fspath(path)
+        self.every = every
+        self.seconds = seconds
+        self.__last_save = time.monotonic()
+
+    def due(self, iteration):
+        """Checks whether a checkpoint has to be written
+
+        Args:
+            iteration (int): index of the last iteration
+
+        Returns:
+            (bool): True if every iterations or seconds went by
+        """
+        if self.every and iteration % self.every == 0:
+            return True
+        return bool(self.seconds) and \
+            time.monotonic() - self.__last_save >= self.seconds
+
+    def save(self, optimizer, x_t, step):
+        """Writes the state of an optimization
+
+        Args:
+            optimizer (GradientDescent): running optimizer
+            x_t (float or np.array): current point
+            step (float): size of the last step, as returned by _step
+
+        Returns:
+            None
+        """
+        arrays = {'optimizer': np.asarray(type(optimizer).__name__),
+                  'x': np.asarray(x_t), 'step': np.asarray(step),
+                  'g_t': np.asarray(optimizer._g_t),
+                  'n_iterations': np.asarray(optimizer.n_iterations),
+                  'n_gradient_evaluations':
+                      np.asarray(optimizer.n_gradient_evaluations),
+                  'f_pending': np.asarray(optimizer._f_pending)}
+        if optimizer.batch:
+            arrays['converged'] = optimizer.converged
+            arrays['n_iterations_per_start'] = \
+                optimizer.n_iterations_per_start
+        for name, value in optimizer._get_state().items():
+            arrays['state_' + name] = np.asarray(value)
+        for name, value in optimizer.history._get_state().items():
+            arrays['history_' + name] = value
+        if optimizer.step_size is not None:
+            for name, value in optimizer.step_size._get_state().items():
+                arrays['step_size_' + name] = np.asarray(value)
+        if optimizer.stopping is not None:
+            for name, value in optimizer.stopping._get_state().items():
+                arrays['stopping_' + name] = np.asarray(value)
+
+        temporary = self.path + '.tmp'
+        with open(temporary, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temporary, self.path)
+        self.__last_save = time.monotonic()
+
+    def load(self, optimizer):
+        """Restores the state of an optimization into an optimizer
+
+        Args:
+            optimizer (GradientDescent): optimizer built with the
+            hyperparameters of the checkpointed one
+
+        Returns:
+            (float or np.array): current point
+            (float): size of the last step
+
+        Raises:
+            ValueError: if the checkpoint was written by another optimizer
+            class or for parameters of another shape
+        """
+        with np.load(self.path) as file:
+            arrays = dict(file.items())
+
+        name = str(arrays['optimizer'])
+        if name != type(optimizer).__name__:
+            raise ValueError(f'Checkpoint written by {name}, not '
+                             f'{type(optimizer).__name__}')
+        x_t = arrays['x']
+        if x_t.shape != np.shape(optimizer.x_t):
+            raise ValueError(f'Checkpoint point has shape {x_t.shape}, '
+                             f'expected {np.shape(optimizer.x_t)}')
+
+        optimizer.reset()
+        if optimizer._is_array:
+            optimizer._init_state(x_t)
+        else:
+            # Scalars come back as NumPy scalars, which compute the same
+            # values bit for bit
+            x_t = x_t[()]
+
+        state = {name[len('state_'):]: value if optimizer._is_array
+                 else value[()] for name, value in arrays.items()
+                 if name.startswith('state_')}
+        optimizer._set_state(state)
+        optimizer.history._set_state({name[len('history_'):]: value
+                                      for name, value in arrays.items()
+                                      if name.startswith('history_')})
+        if optimizer.step_size is not None:
+            optimizer.step_size._set_state({
+                name[len('step_size_'):]: value
+                for name, value in arrays.items()
+                if name.startswith('step_size_')})
+        if optimizer.stopping is not None:
+            optimizer.stopping._set_state({
+                name[len('stopping_'):]: value
+                for name, value in arrays.items()
+                if name.startswith('stopping_')})
+
+        optimizer.n_iterations = int(arrays['n_iterations'])
+        optimizer.n_gradient_evaluations = \
+            int(arrays['n_gradient_evaluations'])
+        optimizer._f_pending = bool(arrays['f_pending'])
+        self.__last_save = time.monotonic()
+        if optimizer.batch:
+            optimizer._g_t = arrays['g_t']
+            optimizer.converged = arrays['converged']
+            optimizer.n_iterations_per_start = \
+                arrays['n_iterations_per_start']
+            # In batch mode the step is the convergence mask itself
+            return x_t, optimizer.converged
+        optimizer._g_t = arrays['g_t'] if optimizer._is_array else \
+            arrays['g_t'][()]
+        return x_t, arrays['step'][()]
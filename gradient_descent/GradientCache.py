@@ -0,0 +1,129 @@
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class GradientCache():
+    """Bounded memoization of an expensive df (or fg), passed to the
+    optimizers in its place: optimizer = Adam(f, GradientCache(df), x_t).
+
+    Gradients are cached by the exact value of the point, or by the point
+    rounded to a grid of spacing resolution, so that nearby points share
+    their gradient. When maxsize gradients are cached, the least recently
+    used one is evicted.
+
+    Repeated points come from multi-start runs sharing starting points,
+    revisited points and line searches: the gradient evaluated by a Wolfe
+    line search at the step it accepts is the gradient of the next step.
+
+    The cached gradients are read-only copies, so a df writing into a
+    reused buffer doesn't alter them.
+
+    Attributes:
+        df (function): cached function
+        maxsize (int): maximum number of cached gradients
+        resolution (float): spacing of the grid the points are rounded to,
+        None for exact keys
+        hits (int): number of calls answered from the cache
+        misses (int): number of calls evaluating df
+        hit_rate (float): share of the calls answered from the cache
+    """
+
+    def __init__(self, df, maxsize=128, resolution=None):
+        """Constructor
+
+        Args:
+            df (function): function to cache, returning an array, a scalar
+            or a tuple of them (e.g. fg)
+            maxsize (int, optional): maximum number of cached gradients
+            resolution (float, optional): spacing of the grid the points
+            are rounded to. Defaults to exact keys
+
+        Returns:
+            None
+        """
+        if maxsize < 1:
+            raise ValueError(f'maxsize must be positive, got {maxsize}')
+        if resolution is not None and not resolution > 0:
+            raise ValueError('resolution must be positive, got '
+                             f'{resolution}')
+        self.df = df
+        self.maxsize = maxsize
+        self.resolution = resolution
+        self.hits = 0
+        self.misses = 0
+        self.__cache = OrderedDict()
+
+    def _key(self, x_t):
+        """Builds the cache key of a point
+
+        Args:
+            x_t (float or np.array): point
+
+        Returns:
+            (tuple): shape, type and bytes of the point, or of its grid
+            coordinates
+        """
+        x = np.asarray(x_t)
+        if self.resolution is not None:
+            # + 0.0 turns -0.0 into 0.0, which have different bytes
+            x = np.rint(x/self.resolution) + 0.0
+        return x.shape, x.dtype.str, x.tobytes()
+
+    @staticmethod
+    def _freeze(value):
+        """Makes a read-only copy of a result of df"""
+        if isinstance(value, tuple):
+            return tuple(GradientCache._freeze(item) for item in value)
+        if isinstance(value, np.ndarray):
+            value = value.copy()
+            value.setflags(write=False)
+        return value
+
+    def __call__(self, x_t):
+        key = self._key(x_t)
+        cache = self.__cache
+        value = cache.get(key)
+        if value is not None:
+            self.hits += 1
+            cache.move_to_end(key)
+            return value
+
+        self.misses += 1
+        value = self._freeze(self.df(x_t))
+        cache[key] = value
+        if len(cache) > self.maxsize:
+            cache.popitem(last=False)
+        return value
+
+    @property
+    def hit_rate(self):
+        calls = self.hits + self.misses
+        return self.hits/calls if calls else 0.0
+
+    def cache_info(self):
+        """Gets the statistics of the cache, as functools.lru_cache does
+
+        Args:
+            None
+
+        Returns:
+            (CacheInfo): hits, misses, maxsize and currsize
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self.__cache))
+
+    def clear(self):
+        """Empties the cache and its statistics
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.__cache.clear()
+        self.hits = 0
+        self.misses = 0
@@ -1,116 +1,1067 @@
+import time
+
 import numpy as np
-import matplotlib.pyplot as plt
 
-from .ExceptionHandler import ConvergencePointsValueError
+from .History import History, EveryK
+from .Checkpoint import Checkpoint
+from .autodiff import grad, value_and_grad
+from .MiniBatch import as_source, iter_batches, BatchGradient
 
 
 class GradientDescent():
     """Class containing differents methods for applying gradient descent method
-    for single variable function
+    for single variable function, or for a vector of parameters held in a
+    NumPy array
 
     Attributes:
         name (string): name of the optmizer
         f (function): function for optimization
         df (function): first derivation of the function
-        x_t (float): starting variable for analysis
+        fg (function): fused evaluation of f and df, or None
+        x_t (float or np.array): starting variable for analysis
         learning_rate (float): learning rate
         tolerance (int): tolerance for the distance between two consecutive
         estimates in a subsequence that converges
         max_iterations (int): maximum number of iterations
-        convergence_points (list): list to store the history of points during
-        optimization n_iterations (int): number of iterations for convegence
+        history (History): record of the iteration index, point, value of
+        the function and gradient norm during optimization
+        convergence_points (np.array): points stored in the history, None
+        when the history doesn't store them, see history_x
+        n_iterations (int): number of iterations for convegence
+        batch (bool): whether x_t holds several independent starting points
+        converged (np.array): per-start convergence mask (batch mode only)
+        n_iterations_per_start (np.array): number of iterations performed by
+        each starting point (batch mode only)
+        n_gradient_evaluations (int): number of calls to df during the last
+        optimization
+        callbacks (list): Callback instances notified during optimization
+        gradient_seconds (float): time spent in df during the last
+        optimization, only measured when there are callbacks
+        stopping (StoppingCriterion): additional stopping criterion, or None
+        check_every (int): number of iterations between two checks of the
+        stopping criterion
+        stopped (bool): whether the stopping criterion ended the last
+        optimization
+        sparse (bool): whether df returns sparse gradients
+        shards (int): number of worker processes updating the parameters,
+        or None
     """
     def __init__(self, f, df, x_t, learning_rate=1e-3, tolerance=1e-6,
-                 max_iterations=1000, n_history_points=1000):
+                 max_iterations=1000, n_history_points=1000, batch=False,
+                 dtype=None, history_sampling=None, backend='python',
+                 fg=None, step_size=None, callbacks=None, stopping=None,
+                 check_every=10, sparse=False, shards=None, history_x=None):
         """Constructor
 
         Args:
-            f (function): function for optimization
-            df (function): first derivation of the function
-            x_t (float): starting variable for analysis
+            f (function): function for optimization. May be None when only
+            fit_minibatch is used
+            df (function or str): first derivation of the function. May be
+            None when only fit_minibatch is used. 'forward' or 'reverse'
+            derive it from f by automatic differentiation, see autodiff
+            x_t (float or np.array): starting variable for analysis. Arrays
+            are treated as a single vector of parameters, and convergence is
+            tested on the euclidean norm of the update
             learning_rate (float, optional): learning rate
             tolerance (int, optional): tolerance for the distance between two
             consecutive estimates in a subsequence that converges
             max_iterations (int, optional): maximum number of iterations
             n_history_points (int, optional): total amount of history points
-            to be saved during optization
+            to be saved during optization. 0 disables the history
+            batch (bool, optional): if True, x_t is an array of independent
+            starting points that are optimized together. f and df must then
+            accept and return arrays element-wise
+            dtype (np.dtype, optional): floating point type of the parameters
+            and of the optimizer state, e.g. np.float32 to halve the memory
+            traffic of each step. Defaults to the type of x_t
+            history_sampling (function, optional): policy choosing the
+            iterations stored in the history, such as EveryK, LogSpaced or
+            LastN. Defaults to every max_iterations*0.01 iterations
+            backend (str, optional): 'python', or 'numba' to run the whole
+            loop of scalar optimizations as compiled code. f and df must then
+            be compilable by Numba. Falls back to 'python' when Numba isn't
+            installed or df can't be compiled
+            fg (function, optional): fg(x) returns (f(x), df(x)) from one
+            evaluation, for objectives whose value and gradient share most
+            of their computation. It replaces df, f and df may then be None,
+            and the values it computes are the ones stored in the history.
+            Implied by df='forward' or df='reverse'
+            step_size (StepSize, optional): rule scaling the update of each
+            step, e.g. a line search or a learning-rate schedule. Defaults
+            to the constant learning_rate
+            callbacks (list, optional): Callback instances notified of the
+            steps and of the end of each optimization, e.g. StepTimer,
+            GradientTimer or GradientNormStats. Disables the numba backend
+            stopping (StoppingCriterion, optional): criterion that also
+            stops the optimization, e.g. RelativeChange, GradientNorm,
+            WallClock, NonFinite or Patience, combined with | and &. In
+            batch mode the starts that meet it stop as converged ones.
+            Disables the numba backend
+            check_every (int, optional): number of iterations between two
+            checks of the stopping criterion
+            sparse (bool, optional): if True, df (or the gradient of fg)
+            returns (indices, values): the indices along the first axis of
+            x_t of the rows with a nonzero gradient, and the gradient of
+            these rows. Each step then costs O(len(indices)) instead of
+            O(x_t.size), see _sparse_step. Requires array parameters, and
+            isn't supported in batch mode or with step_size
+            shards (int, optional): number of worker processes applying the
+            update rule to contiguous shards of the parameters, held with
+            the optimizer state in shared memory, for vectors whose updates
+            are bound by memory bandwidth. df is still evaluated by the
+            calling process. The workers are kept between runs until close
+            is called, see sharding. Requires array parameters, and isn't
+            supported in batch mode, with sparse gradients or with
+            step_size
+            history_x (bool, optional): whether the history stores the
+            points, each record holding a copy of x_t. Defaults to True for
+            scalar parameters only: the history of vector parameters and
+            batch optimizations then holds the iteration, f and the
+            gradient norm
 
         Returns:
             None
         """
+        if backend not in ('python', 'numba'):
+            raise ValueError(f'Unknown backend {backend!r}, expected '
+                             "'python' or 'numba'")
+        if sparse and (batch or step_size is not None or
+                       not isinstance(x_t, (np.ndarray, list, tuple))):
+            raise ValueError('Sparse gradients require array parameters, '
+                             'and are not supported in batch mode or with '
+                             'step_size')
+        if shards is not None and (
+                batch or sparse or step_size is not None or
+                not isinstance(x_t, (np.ndarray, list, tuple))):
+            raise ValueError('Sharding requires array parameters, and is '
+                             'not supported in batch mode, with sparse '
+                             'gradients or with step_size')
+
         self.name = 'Gradient Descent'
         self.f = f
+        if isinstance(df, str):
+            fg = value_and_grad(f, df)
+            df = grad(f, df)
         self.df = df
+        self.fg = fg
+        self.batch = batch
+        if batch or dtype is not None or \
+                isinstance(x_t, (np.ndarray, list, tuple)):
+            x_t = np.asarray(x_t, dtype=dtype)
+            if not np.issubdtype(x_t.dtype, np.floating):
+                x_t = x_t.astype(float)
         self.x_t = x_t
+        self._is_array = isinstance(x_t, np.ndarray)
         self.learning_rate = learning_rate
         self.tolerance = tolerance
         self.max_iterations = max_iterations
-        self.convergence_points = np.array([None]*n_history_points)
+        self.backend = backend
+        self.step_size = step_size
+        self.callbacks = list(callbacks or ())
+        self.stopping = stopping
+        self.check_every = max(1, int(check_every))
+        self.stopped = False
+        self.sparse = sparse
+        self.shards = shards
+        if history_x is None:
+            # Vector parameters and batches of starts would be copied
+            # into every record
+            history_x = not self._is_array
+        self.history = History(n_history_points, np.shape(self.x_t),
+                               self.x_t.shape if batch else (),
+                               getattr(self.x_t, 'dtype', np.float64),
+                               history_sampling or
+                               EveryK(max_iterations*0.01), history_x)
         self.n_iterations = 0
+        self.n_gradient_evaluations = 0
+        self.gradient_seconds = 0.0
+        self.converged = None
+        self.n_iterations_per_start = None
+        self._update_buffer = None
+        self._active = None
+        self._g_t = None
+        self._f_t = None
+        self._f_pending = False
+        self._f_check = None
+        self._g_ahead = None
+        self._last_update = None
+        self._row_steps = None
+        self._step_total = 0.0
+        self._shard_pool = None
 
-    def _update_parameter(self, x_t):
-        """Computes the current update vector for GradientDescent
+    def _init_state(self, x_t):
+        """Allocates the buffers used by the in-place update kernels of
+        array parameters. Subclasses extend it with their own state
+
+        Args:
+            x_t (np.array): point the buffers are shaped after
+
+        Returns:
+            None
+        """
+        buffer = self._update_buffer
+        if buffer is None or buffer.shape != x_t.shape or \
+                buffer.dtype != x_t.dtype:
+            self._update_buffer = np.empty_like(x_t)
+        if self.batch and (self._active is None or
+                           self._active.shape != x_t.shape):
+            self._active = np.empty(x_t.shape, dtype=bool)
+        last_update = self._last_update
+        if self.sparse and (not isinstance(last_update, np.ndarray) or
+                            last_update.shape != x_t.shape[:1]):
+            self._last_update = np.zeros(x_t.shape[:1], dtype=np.int64)
+            self._row_steps = np.zeros(x_t.shape[:1])
+
+    @staticmethod
+    def _state_buffer(state, x_t):
+        """Returns an optimizer state as an array shaped like x_t. Arrays
+        that already match are reused, so their memory carries over between
+        runs
+
+        Args:
+            state (float or np.array): current value of the state
+            x_t (np.array): point the state is shaped after
+
+        Returns:
+            (np.array): state array
+        """
+        if isinstance(state, np.ndarray):
+            if state.shape == x_t.shape and state.dtype == x_t.dtype:
+                return state
+            state = 0
+        return np.full_like(x_t, state)
+
+    def _start_point(self, x0):
+        """Converts a new starting point to the type of x_t
+
+        Args:
+            x0 (float or np.array): starting point
+
+        Returns:
+            (float or np.array): starting point
+
+        Raises:
+            ValueError: if x0 doesn't have the shape of x_t, which the
+            preallocated buffers are shaped after
+        """
+        if not self._is_array:
+            return x0
+        x0 = np.asarray(x0, dtype=self.x_t.dtype)
+        if x0.shape != self.x_t.shape:
+            raise ValueError(f'x0 has shape {x0.shape}, expected '
+                             f'{self.x_t.shape}')
+        return x0
+
+    def reset(self, x0=None):
+        """Clears the last optimization: optimizer state, counters and
+        history. State arrays are zeroed in place, so the next run reuses
+        every preallocated buffer
+
+        Args:
+            x0 (float or np.array, optional): new starting point, with the
+            shape of x_t. Defaults to the current x_t
+
+        Returns:
+            None
+        """
+        if x0 is not None:
+            self.x_t = self._start_point(x0)
+
+        state = self._get_state()
+        for name, value in state.items():
+            if isinstance(value, np.ndarray):
+                value.fill(0)
+            else:
+                state[name] = 0
+        self._set_state(state)
+
+        self.n_iterations = 0
+        self.n_gradient_evaluations = 0
+        self.gradient_seconds = 0.0
+        for mask in (self.converged, self.n_iterations_per_start):
+            if mask is not None:
+                mask.fill(0)
+        self._g_t = None
+        self._g_ahead = None
+        self._f_pending = False
+        self.stopped = False
+        self.history.reset()
+        if self.step_size is not None:
+            self.step_size.reset()
+        if self.stopping is not None:
+            self.stopping.reset()
+
+    def _get_state(self):
+        """Gets the internal state of the optimizer. Subclasses extend it
+        with their own state
+
+        Args:
+            None
+
+        Returns:
+            (dict): state values by name. With sparse gradients, last_update
+            holds the last iteration each row was brought up to date, and
+            row_steps the squared norm of the last update of each row
+        """
+        if self.sparse:
+            return {'last_update': self._last_update,
+                    'row_steps': self._row_steps}
+        return {}
+
+    def _set_state(self, state):
+        """Restores the internal state of the optimizer
+
+        Args:
+            state (dict): state values by name, as given by _get_state
+
+        Returns:
+            None
+        """
+        if self.sparse:
+            self._last_update = state['last_update']
+            self._row_steps = state['row_steps']
+            self._step_total = float(np.sum(self._row_steps))
+
+    def step(self, x_t, out=None):
+        """Advances the optimizer by one iteration and computes the update
+        for x_t. The optimizer state and the update are written into
+        preallocated buffers, so no new array is created besides the one
+        returned by df
+
+        Args:
+            x_t (np.array): point for calculation
+            out (np.array, optional): array receiving the update. Defaults
+            to an internal buffer reused at every call
+
+        Returns:
+            (np.array): update amount, the new point is x_t - update
+
+        Raises:
+            ValueError: with sparse gradients, whose updates are only
+            applied by the optimization loops
+        """
+        if self.sparse:
+            raise ValueError('step() computes dense updates, which sparse '
+                             'gradients avoid')
+        buffer = self._update_buffer
+        if buffer is None or buffer.shape != np.shape(x_t) or \
+                buffer.dtype != x_t.dtype:
+            self._init_state(x_t)
+        self.n_iterations += 1
+        if out is None:
+            out = self._update_buffer
+        return self._update_parameter(x_t, out)
+
+    def _gradient_point(self, x_t, out=None):
+        """Computes the point where the gradient of the current step is
+        evaluated
+
+        Args:
+            x_t (float): point for calculation
+            out (np.array, optional): preallocated array that may receive
+            the point
+
+        Returns:
+            (float): x_t itself
+        """
+        return x_t
+
+    def _gradient(self, x_t):
+        """Evaluates df, or fg when given. Every gradient evaluation of the
+        optimizers goes through this method, which counts them in
+        n_gradient_evaluations
+
+        Args:
+            x_t (float): point for calculation
+
+        Returns:
+            (float): df(x_t)
+        """
+        if self._g_ahead is not None:
+            # Evaluated at x_t, with f(x_t) in _f_t, by the last stopping
+            # check or line search, see _keep_ahead
+            self._g_t, self._g_ahead = self._g_ahead, None
+        else:
+            self.n_gradient_evaluations += 1
+            timed = bool(self.callbacks)
+            if timed:
+                start = time.perf_counter()
+            if self.fg is None:
+                self._g_t = self.df(x_t)
+            else:
+                self._f_t, self._g_t = self.fg(x_t)
+            if timed:
+                self.gradient_seconds += time.perf_counter() - start
+            if isinstance(self._g_t, np.ndarray) and \
+                    np.may_share_memory(self._g_t, x_t):
+                # x_t is updated in place: a gradient viewing it, e.g. the
+                # one of df = lambda x: x, would change with it
+                self._g_t = self._g_t.copy()
+
+        if self._f_pending and self.fg is not None:
+            # x_t is the last recorded point, whose value was left pending
+            self.history.set_last_f(self._f_t)
+            self._f_pending = False
+        return self._g_t
+
+    def _evaluate(self, x_t):
+        """Evaluates f and df at a point outside of the steps, e.g. for a
+        line search. The gradient is counted in n_gradient_evaluations
 
         Args:
             x_t (float): point for calculation
 
+        Returns:
+            (float): f(x_t)
+            (float): df(x_t)
+        """
+        self.n_gradient_evaluations += 1
+        timed = bool(self.callbacks)
+        if timed:
+            start = time.perf_counter()
+        if self.fg is not None:
+            f_t, g_t = self.fg(x_t)
+        else:
+            f_t, g_t = self._objective(x_t), self.df(x_t)
+        if timed:
+            self.gradient_seconds += time.perf_counter() - start
+        return f_t, g_t
+
+    def _keep_ahead(self, f_t, g_t):
+        """Keeps f and the gradient at the point the next step starts
+        from, evaluated ahead of it, e.g. by a line search: the next
+        gradient evaluation returns them instead of calling df. Optimizers
+        evaluating the gradient elsewhere, as NAG does, don't keep them
+
+        Args:
+            f_t (float): f at the next point
+            g_t (float): gradient at the next point
+
+        Returns:
+            None
+        """
+        if type(self)._gradient_point is GradientDescent._gradient_point:
+            self._f_t, self._g_ahead = f_t, g_t
+
+    def _fuses_value(self):
+        """Checks whether fg gives f at the current point: the gradient is
+        evaluated at x_t unless the optimizer looks ahead, as NAG does
+
+        Args:
+            None
+
+        Returns:
+            (bool): True if the value of each fused evaluation is f(x_t)
+        """
+        return self.fg is not None and \
+            type(self)._gradient_point is GradientDescent._gradient_point
+
+    def _current_objective(self, x_t):
+        """Gets f at the current point, from the fused evaluation of the
+        step when there is one
+
+        Args:
+            x_t (float): current point
+
+        Returns:
+            (float): f(x_t)
+        """
+        if self._fuses_value():
+            return self._f_t
+        return self._objective(x_t)
+
+    def _objective(self, x_t):
+        """Evaluates f, or fg when f isn't given. Evaluations of fg are
+        counted in n_gradient_evaluations
+
+        Args:
+            x_t (float): point for calculation
+
+        Returns:
+            (float): f(x_t), NaN when neither f nor fg is given
+        """
+        if self.f is not None:
+            return self.f(x_t)
+        if self.fg is not None:
+            self.n_gradient_evaluations += 1
+            return self.fg(x_t)[0]
+        return np.nan
+
+    def _compute_update(self, g_t, out=None):
+        """Computes the current update vector for GradientDescent
+
+        Args:
+            g_t (float): gradient evaluated for the current step
+            out (np.array, optional): preallocated array receiving the update
+
         Returns:
             (float): update amount
         """
-        return self.learning_rate*self.df(x_t)
+        if out is None:
+            return self.learning_rate*g_t
+        return np.multiply(g_t, self.learning_rate, out=out)
 
-    def fit(self):
-        """Gradient Descent for Optimization Algorithm
+    def _compute_sparse_update(self, indices, g_t):
+        """Computes the update of the rows with a nonzero gradient. The
+        optimizer state of these rows is up to date, see _catch_up
 
         Args:
+            indices (np.array): unique indices of the rows
+            g_t (np.array): gradient of the rows
+
+        Returns:
+            (np.array): update of the rows
+        """
+        return self.learning_rate*g_t
+
+    def _catch_up(self, indices, skipped):
+        """Decays the state of rows of a sparse optimization over the
+        steps they skipped with a zero gradient. GradientDescent has no
+        state to decay
+
+        Args:
+            indices (np.array): unique indices of the rows
+            skipped (np.array): number of skipped steps of each row, shaped
+            to broadcast against the rows
+
+        Returns:
             None
+        """
+
+    def _update_parameter(self, x_t, out=None):
+        """Computes the current update vector. The gradient is evaluated
+        exactly once and shared by every term of the update
+
+        Args:
+            x_t (float): point for calculation
+            out (np.array, optional): preallocated array receiving the update
+
+        Returns:
+            (float): update amount
+        """
+        g_t = self._gradient(self._gradient_point(x_t, out))
+        update = self._compute_update(g_t, out)
+        if self.step_size is not None:
+            update = self.step_size(self, x_t, g_t, update)
+        return update
+
+    def fit(self, x0=None, checkpoint=None):
+        """Gradient Descent for Optimization Algorithm. Every call starts a
+        new optimization from a cleared state, see reset
+
+        Args:
+            x0 (float or np.array, optional): starting point of this and the
+            following runs, with the shape of x_t. Defaults to x_t
+            checkpoint (Checkpoint, optional): periodically saves the state
+            of the optimization, which resume continues after an
+            interruption. Disables the numba backend
 
         Returns:
-            (float) : local minimum measured by the algorithm
+            (float) : local minimum measured by the algorithm. For vector
+            parameters, (np.array): the minimizer. In batch mode,
+            (np.array): local minimum reached from each starting point
         """
         # Compute First Interation
         # Set new x_{t+1} = x_{t} - lambda*f'(x_{t})
-        self.n_iterations = 1  # iteration step
-        n_convergence_points = 0  # iteration step of list convergence_points
+        self.reset(x0)
+
+        if self.backend == 'numba' and not self._is_array and \
+                checkpoint is None and self.fg is None and \
+                self.step_size is None and self.stopping is None and \
+                not self.callbacks:
+            # The compiled loop returns None when it isn't available
+            from .jit import fit_compiled
+
+            x_t = fit_compiled(self)
+            if x_t is not None:
+                return x_t
+
+        x_t = self._start()
+        for callback in self.callbacks:
+            callback.on_fit_start(self, x_t)
+        return self._iterate(x_t, None, checkpoint)
+
+    def fit_async(self, x0=None, yield_every=100, timeout=None,
+                  checkpoint=None):
+        """Asynchronous fit, for optimizations sharing an asyncio event
+        loop: await optimizer.fit_async(). df or fg may be coroutine
+        functions, awaited at every step. The loop yields to the event loop
+        every yield_every iterations. Cancelling the task, or reaching the
+        timeout, stops the optimization after its last complete step
+
+        Args:
+            x0 (float or np.array, optional): starting point of this and the
+            following runs, with the shape of x_t. Defaults to x_t
+            yield_every (int, optional): number of iterations between two
+            yields to the event loop
+            timeout (float, optional): seconds after which the optimization
+            is cancelled and asyncio.TimeoutError raised
+            checkpoint (Checkpoint, optional): periodically saves the state
+            of the optimization, and saves it when the optimization is
+            cancelled, for resume to continue it
+
+        Returns:
+            (coroutine): returns the local minimum measured by the
+            algorithm, as fit
+        """
+        # asyncio is only loaded by the asynchronous optimizations
+        from .aio import fit_async
+
+        return fit_async(self, x0, yield_every, timeout, checkpoint)
+
+    def resume(self, checkpoint):
+        """Continues an optimization from a checkpoint. The optimizer must
+        be built with the f, df and hyperparameters of the checkpointed
+        one, and the run then ends exactly as the uninterrupted one would
+
+        Args:
+            checkpoint (Checkpoint or str): checkpoint, or path of the
+            checkpoint file. A Checkpoint keeps saving the optimization as
+            it goes on
+
+        Returns:
+            (float): local minimum measured by the algorithm, as fit
+        """
+        if not isinstance(checkpoint, Checkpoint):
+            checkpoint = Checkpoint(checkpoint)
+        x_t, step = checkpoint.load(self)
+        for callback in self.callbacks:
+            callback.on_fit_start(self, x_t)
+        return self._iterate(x_t, step, checkpoint)
+
+    def _iterate(self, x_t, step, checkpoint=None):
+        """Runs the iterations of fit until convergence or max_iterations
+
+        Args:
+            x_t (float): current point
+            step (float): size of the last step, as returned by _step. None
+            for a new optimization, whose first step is then taken here
+            checkpoint (Checkpoint, optional): saves the optimization when
+            it is due
+
+        Returns:
+            (float): local minimum measured by the algorithm
+        """
+        callbacks = self.callbacks
+        try:
+            while step is None or (self._is_running(step) and
+                                   self.n_iterations < self.max_iterations):
+                try:
+                    # Update x_t
+                    self.n_iterations += 1
+                    x_t, step = self._step(x_t)
+                    if self._end_iteration(x_t, step, checkpoint):
+                        break
+
+                except OverflowError as err:
+                    return self._overflow(x_t, err)
+
+            self._complete_history(x_t)
+            if callbacks:
+                self._notify_end(x_t, step)
+            return self._result(x_t)
+
+        finally:
+            # Also reached when an error interrupts the optimization
+            for callback in callbacks:
+                callback.on_fit_end(self, x_t)
+
+    def _end_iteration(self, x_t, step, checkpoint=None):
+        """Bookkeeping of an iteration, shared by the loops of fit,
+        fit_async and fit_minibatch: records the history, notifies the
+        step, checks the stopping criterion and saves the checkpoint when
+        they are due
+
+        Args:
+            x_t (float): new point
+            step (float): size of the step, as returned by _step
+            checkpoint (Checkpoint, optional): saves the optimization when
+            it is due
+
+        Returns:
+            (bool): True if the stopping criterion is met
+        """
+        self._record_history(self.n_iterations, x_t)
+        if self.callbacks:
+            for callback in self.callbacks:
+                callback.on_step(self, x_t, step)
+
+        if self.stopping is not None and \
+                self.n_iterations % self.check_every == 0 and \
+                self._stop(x_t):
+            return True
+
+        if checkpoint is not None and checkpoint.due(self.n_iterations):
+            checkpoint.save(self, x_t, step)
+        return False
+
+    def _overflow(self, x_t, error):
+        """Ends an optimization whose values exploded, e.g. with a too
+        large learning_rate: the callbacks are notified of the divergence
+
+        Args:
+            x_t (float): last point
+            error (OverflowError): raised error
+
+        Returns:
+            (OverflowError): the error, returned by the fit
+        """
+        for callback in self.callbacks:
+            callback.on_diverge(self, x_t, error)
+        return error
+
+    def _stop(self, x_t):
+        """Checks the stopping criterion. In batch mode, the starts that
+        meet it are marked as converged
+
+        Args:
+            x_t (float): current point
+
+        Returns:
+            (bool): True if the optimization has to stop
+        """
+        self._f_check = None
+        stop = self.stopping(self, x_t)
+        if self.batch:
+            self.converged |= stop
+            stop = self.converged.all()
+        self.stopped = bool(stop)
+        return self.stopped
+
+    def _stopping_objective(self, x_t):
+        """Evaluates f for the stopping criteria, once per check. With fg
+        and no f, the fused evaluation of the next step is made ahead of it:
+        its value is f(x_t), and its gradient is kept for the step
+
+        Args:
+            x_t (float): current point
 
+        Returns:
+            (float): f(x_t)
+        """
+        if self._f_check is None:
+            if self.f is None and self._fuses_value():
+                # The criteria still see the gradient of the last step
+                g_t = self._g_t
+                g_ahead = self._gradient(x_t)
+                self._keep_ahead(self._f_t, g_ahead)
+                self._g_t = g_t
+                self._f_check = self._f_t
+            else:
+                self._f_check = self._objective(x_t)
+        return self._f_check
+
+    def _notify_end(self, x_t, step):
+        """Notifies the callbacks of the end of an optimization: divergence
+        when x_t or the last gradient isn't finite, convergence when the
+        step fell below the tolerance. Nothing is notified when
+        max_iterations was reached or the stopping criterion was met
+
+        Args:
+            x_t (float): last point
+            step (float): size of the last step, as returned by _step
+
+        Returns:
+            None
+        """
+        if not (np.all(np.isfinite(x_t)) and np.all(np.isfinite(self._g_t))):
+            for callback in self.callbacks:
+                callback.on_diverge(self, x_t)
+        elif not (self.stopped or self._is_running(step)):
+            for callback in self.callbacks:
+                callback.on_converge(self, x_t)
+
+    def fit_minibatch(self, df_sample, data, batch_size=32, n_epochs=1,
+                      block_size=None, shuffle=True, seed=None, x0=None):
+        """Stochastic optimization on mini-batches of samples. The gradient
+        of each mini-batch is fed to the update rule of the optimizer, and
+        one iteration is performed per mini-batch
+
+        Args:
+            df_sample (function): df_sample(x, batch) returns the gradients
+            at x of every sample of the batch, stacked along the first axis
+            data: samples, one per row: array, path of a .npy file streamed
+            through a memory map, function returning an iterable of samples
+            (e.g. a generator function) or any source from MiniBatch
+            batch_size (int, optional): number of samples per mini-batch
+            n_epochs (int, optional): number of passes over the data
+            block_size (int, optional): number of consecutive samples loaded
+            and shuffled together. Defaults to 64 mini-batches
+            shuffle (bool, optional): whether to shuffle the samples
+            seed (int, optional): seed of the shuffling
+            x0 (float or np.array, optional): starting point of this and the
+            following runs, with the shape of x_t. Defaults to x_t
+
+        Returns:
+            (float): point reached after the last epoch
+        """
+        if self.batch or self.sparse:
+            raise ValueError('Mini-batch optimization does not support '
+                             'batch mode or sparse gradients')
+
+        source = as_source(data)
+        block_size = block_size or 64*batch_size
+        rng = np.random.default_rng(seed) if shuffle else None
+
+        self.reset(x0)
+        x_t = self._start()
+        for callback in self.callbacks:
+            callback.on_fit_start(self, x_t)
+
+        # The mini-batch gradient takes the place of df and fg during the run
+        df, fg = self.df, self.fg
+        self.df = gradient = BatchGradient(df_sample)
+        self.fg = None
+        try:
+            for _ in range(n_epochs):
+                for gradient.batch in iter_batches(source, batch_size,
+                                                   block_size, rng):
+                    self.n_iterations += 1
+                    x_t, step = self._step(x_t)
+                    if self._end_iteration(x_t, step):
+                        return self._result(x_t)
+        finally:
+            self.df, self.fg = df, fg
+            for callback in self.callbacks:
+                callback.on_fit_end(self, x_t)
+
+        return self._result(x_t)
+
+    def _start(self):
+        """Prepares a new optimization from x_t
+
+        Args:
+            None
+
+        Returns:
+            (float): starting point. Array parameters are updated in place on
+            a copy, leaving x_t untouched
+        """
         x_t = self.x_t
-        x_t_1 = x_t - self._update_parameter(x_t)
-
-        self.convergence_points[n_convergence_points] = x_t
-
-        while (np.abs(x_t_1 - x_t) > self.tolerance) and \
-                (self.n_iterations <= self.max_iterations):
-            try:
-                # Update x_t
-                x_t = x_t_1
-                x_t_1 = x_t - self._update_parameter(x_t)
-
-                # Stores some convergence points. Stores points that are
-                # divisible by max_iterations*0.01.
-                # Only some random points are stored in order not to create
-                # a too big list and ending up
-                # slowing down performance.
-                if (self.n_iterations % (self.max_iterations*0.01) == 0):
-                    n_convergence_points += 1
-                    self.convergence_points[n_convergence_points] = x_t
-                    if(n_convergence_points ==
-                       (len(self.convergence_points) - 1)):
-                        n_convergence_points = 0
-
-                self.n_iterations += 1
-
-            except OverflowError as err:
-                print('Overflowed exception raised. The value of the function \
-                    exploded. Try reducing the learning_rate')
-                return err
-
-        # If convergence_points list isn't completed, select only
-        # the non-null values.
-        self.convergence_points = \
-            self.convergence_points[self.convergence_points is not None]\
-            .astype(float)
-
-        return x_t_1
+        if self._is_array:
+            x_t = x_t.copy()
+            self._init_state(x_t)
+
+        if self.batch and self.converged is None:
+            self.converged = np.zeros(x_t.shape, dtype=bool)
+            self.n_iterations_per_start = np.zeros(x_t.shape, dtype=int)
+
+        # No gradient has been evaluated at the starting point yet
+        self._g_t = np.full(np.shape(x_t), np.nan)
+        self._record_history(0, x_t)
+        return x_t
+
+    def _record_history(self, iteration, x_t):
+        """Stores x_t, f(x_t) and the norm of the last gradient in the
+        history, if the sampling policy selects the iteration. The starting
+        point, iteration 0, is always stored. With fg, f(x_t) is taken from
+        the fused evaluation of the next step, see _complete_history
+
+        Args:
+            iteration (int): iteration index
+            x_t (float): current point
+
+        Returns:
+            None
+        """
+        history = self.history
+        if not history.capacity or \
+                (iteration and not history.sampling(iteration)):
+            return
+
+        if self.batch or not self._is_array:
+            gradient_norm = np.abs(self._g_t)
+        else:
+            gradient_norm = np.linalg.norm(self._g_t)
+        # fg will give f(x_t) for free at the next step
+        fused = self._fuses_value()
+        f_t = np.nan if fused else self._objective(x_t)
+        history.record(iteration, x_t, f_t, gradient_norm)
+        self._f_pending = fused
+
+    def _complete_history(self, x_t):
+        """Evaluates f at the last recorded point when its value was left
+        pending for a step that didn't happen
+
+        Args:
+            x_t (float): last point
+
+        Returns:
+            None
+        """
+        if self._f_pending:
+            self.history.set_last_f(self._objective(x_t))
+            self._f_pending = False
+
+    def _step(self, x_t):
+        """Applies one update to x_t. Array parameters are updated in place
+
+        Args:
+            x_t (float): current point
+
+        Returns:
+            (float): new point
+            (float): size of the step. The euclidean norm of the update
+            for vector parameters, and the per-start convergence mask in
+            batch mode
+        """
+        if not self._is_array:
+            update = self._update_parameter(x_t)
+            return x_t - update, np.abs(update)
+        if self.sparse:
+            return self._sparse_step(x_t)
+        if self.shards is not None:
+            return self._sharded_step(x_t)
+
+        update = self._update_parameter(x_t, self._update_buffer)
+
+        if self.batch:
+            # All trajectories are updated at once, but converged ones
+            # keep their current value
+            active = np.logical_not(self.converged, out=self._active)
+            np.subtract(x_t, update, out=x_t, where=active)
+            self.n_iterations_per_start += active
+            np.abs(update, out=update)
+            np.less_equal(update, self.tolerance, out=active)
+            self.converged |= active
+            return x_t, self.converged
+
+        x_t -= update
+        return x_t, np.linalg.norm(update)
+
+    def _sparse_step(self, x_t):
+        """Applies one update to the rows of x_t with a nonzero gradient.
+        Rows without a gradient are left untouched, state included: when a
+        row gets a gradient again, the decay of its state over the steps it
+        skipped is caught up first, see _catch_up. The moments are then
+        those of the dense update, but rows only move on the steps where
+        they have a gradient (lazy updates). Without a state, as in
+        GradientDescent and RMSprop, the steps are those of the dense update.
+
+        The size of the step, tested for convergence, is the euclidean norm
+        of the last update of every row, and not only of the rows of this
+        step: the running sum of their squares is kept in O(len(indices))
+
+        Args:
+            x_t (np.array): current point, updated in place
+
+        Returns:
+            (np.array): new point
+            (float): euclidean norm of the last update of every row. inf
+            when no row has a gradient, so that the step doesn't count as a
+            convergence
+        """
+        indices, g_t = self._gradient(self._gradient_point(x_t))
+        indices, g_t = self._coalesce(indices, g_t)
+        self._g_t = g_t
+        if not len(indices):
+            return x_t, np.inf
+
+        last_update = self._last_update
+        skipped = self.n_iterations - 1 - last_update[indices]
+        if skipped.any():
+            self._catch_up(indices, skipped.reshape(
+                skipped.shape + (1,)*(x_t.ndim - 1)))
+        last_update[indices] = self.n_iterations
+
+        update = self._compute_sparse_update(indices, g_t)
+        x_t[indices] -= update
+
+        row_steps = np.square(update).reshape(len(indices), -1).sum(axis=1)
+        total = self._step_total + np.sum(row_steps) - \
+            np.sum(self._row_steps[indices])
+        self._row_steps[indices] = row_steps
+        # Rounding errors of the running sum can't make it negative
+        self._step_total = max(total, 0.0)
+        return x_t, np.sqrt(self._step_total)
+
+    def _sharded_step(self, x_t):
+        """Applies one update to x_t on the shard workers, see sharding
+
+        Args:
+            x_t (np.array): current point
+
+        Returns:
+            (np.array): new point, in shared memory
+            (float): euclidean norm of the update
+        """
+        pool = self._shard_pool
+        if pool is None:
+            from .sharding import ShardPool
+
+            pool = self._shard_pool = ShardPool(self, x_t, self.shards)
+        x_t = pool.attach(self, x_t)
+        g_t = self._gradient(self._gradient_point(x_t, self._update_buffer))
+        return x_t, pool.step(g_t, self.n_iterations)
+
+    def _result(self, x_t):
+        """Gets the point returned by an optimization. The shared point of
+        sharded optimizations is copied, as the next run reuses it
+
+        Args:
+            x_t (float): last point
+
+        Returns:
+            (float): last point
+        """
+        if self._shard_pool is not None and x_t is self._shard_pool.x:
+            return x_t.copy()
+        return x_t
+
+    def close(self):
+        """Stops the shard workers and frees their shared memory. The
+        optimizer can still be used, and starts new workers when needed
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self._shard_pool is not None:
+            self._shard_pool.close(self)
+            self._shard_pool = None
+
+    @staticmethod
+    def _coalesce(indices, g_t):
+        """Sums the gradients of repeated rows, e.g. an embedding used twice
+        in a sample
+
+        Args:
+            indices (np.array): indices of the rows
+            g_t (np.array): gradient of each index
+
+        Returns:
+            (np.array): unique indices of the rows
+            (np.array): gradient of the rows
+        """
+        indices = np.asarray(indices)
+        g_t = np.asarray(g_t)
+        unique, inverse = np.unique(indices, return_inverse=True)
+        if len(unique) == len(indices):
+            return indices, g_t
+        summed = np.zeros(unique.shape + g_t.shape[1:], dtype=g_t.dtype)
+        np.add.at(summed, inverse.ravel(), g_t)
+        return unique, summed
+
+    def _is_running(self, step):
+        """Checks whether the optimization has to keep iterating
+
+        Args:
+            step (float): size of the last step, as returned by _step
+
+        Returns:
+            (bool): True while the last step is above tolerance. In batch
+            mode, while at least one start hasn't converged
+        """
+        if self.batch:
+            return not step.all()
+        return step > self.tolerance
+
+    @property
+    def convergence_points(self):
+        """(np.array): points stored in the history, oldest first"""
+        return self.history.x
 
     def get_n_iteration(self):
         """Get numbers of iterations required for optimization
@@ -124,7 +1075,8 @@ class GradientDescent():
         return self.n_iterations
 
     def plot_optimization(self, x1=None, x2=None, n_points=100):
-        """Plotting function between interval (x1,x2)
+        """Plotting function between interval (x1,x2). Matplotlib is only
+        imported when this method is called
 
         Args:
             x1 (float, optional): start of interval
@@ -135,26 +1087,6 @@ class GradientDescent():
         Returns:
             None
         """
-        try:
-            if (len(self.convergence_points[self.convergence_points is None])):
-                raise ConvergencePointsValueError('Empty x-axis. \
-                    No Convergence Points')
-
-            x1 = x1 or min(self.convergence_points)
-            x2 = x2 or max(self.convergence_points)
-
-            x_axis = np.linspace(x1, x2, n_points)
-            y_x = self.f(x_axis)
-
-            plt.plot(x_axis, y_x, color='blue')
-            plt.ylabel('$f(x)$')
-            plt.xlabel('$x$')
-            plt.title(f'{self.name}')
-
-            # Plot points on f(x)
-            plt.plot(self.convergence_points, self.f(self.convergence_points),
-                     'bo', color='red')
-            plt.show()
+        from .plotting import plot_optimization
 
-        except ConvergencePointsValueError as err:
-            print('Please, run the fit() method first: ', err)
\ No newline at end of file
+        plot_optimization(self, x1, x2, n_points)
@@ -0,0 +1,390 @@
+import numpy as np
+
+
+class EveryK():
+    """Sampling policy recording one iteration out of every k
+
+    Attributes:
+        k (int): number of iterations between two records
+    """
+
+    def __init__(self, k):
+        """Constructor
+
+        Args:
+            k (int): number of iterations between two records
+
+        Returns:
+            None
+        """
+        self.k = max(1, int(k))
+
+    def reset(self):
+        """Prepares the policy for a new optimization
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+    def __call__(self, iteration):
+        """Checks whether an iteration has to be recorded
+
+        Args:
+            iteration (int): iteration index
+
+        Returns:
+            (bool): True if the iteration is recorded
+        """
+        return iteration % self.k == 0
+
+    def _get_state(self):
+        """Gets the position of the policy, stored in checkpoints
+
+        Args:
+            None
+
+        Returns:
+            (dict): state values by name
+        """
+        return {}
+
+    def _set_state(self, state):
+        """Restores the position of the policy
+
+        Args:
+            state (dict): state values by name, as given by _get_state
+
+        Returns:
+            None
+        """
+
+
+class LastN(EveryK):
+    """Sampling policy recording every iteration. As the history is a ring
+    buffer, it ends up holding the last N iterations, N being its capacity
+    """
+
+    def __init__(self):
+        """Constructor
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        EveryK.__init__(self, 1)
+
+
+class LogSpaced():
+    """Sampling policy recording iterations on a logarithmic scale: every
+    early iteration, and fewer and fewer of them as the optimization goes on
+
+    Attributes:
+        points_per_decade (int): number of records between iterations 10^n
+        and 10^(n+1)
+    """
+
+    def __init__(self, points_per_decade=10):
+        """Constructor
+
+        Args:
+            points_per_decade (int, optional): number of records between
+            iterations 10^n and 10^(n+1)
+
+        Returns:
+            None
+        """
+        self.points_per_decade = points_per_decade
+        self.__ratio = 10**(1/points_per_decade)
+        self.__next = 1
+
+    def reset(self):
+        """Prepares the policy for a new optimization
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.__next = 1
+
+    def __call__(self, iteration):
+        """Checks whether an iteration has to be recorded
+
+        Args:
+            iteration (int): iteration index
+
+        Returns:
+            (bool): True if the iteration is recorded
+        """
+        if iteration < self.__next:
+            return False
+        self.__next = max(self.__next*self.__ratio, iteration + 1)
+        return True
+
+    def _get_state(self):
+        """Gets the position of the policy, stored in checkpoints
+
+        Args:
+            None
+
+        Returns:
+            (dict): state values by name
+        """
+        return {'next': self.__next}
+
+    def _set_state(self, state):
+        """Restores the position of the policy
+
+        Args:
+            state (dict): state values by name, as given by _get_state
+
+        Returns:
+            None
+        """
+        self.__next = float(state['next'])
+
+
+class History():
+    """Record of an optimization stored in typed, preallocated ring buffers.
+
+    Every buffer is allocated twice as long as the capacity and each record
+    is written at slots i and i + capacity. Any window of capacity
+    consecutive records is then contiguous, so the records are returned in
+    chronological order as views, without copies, even after wrapping.
+    The mirror doubles the memory of the records: a full history of
+    capacity records takes 2*capacity rows per buffer. The buffers are
+    allocated by the first record for a few records, and doubled as the
+    records come, up to the capacity, so that short optimizations don't
+    pay for the whole capacity. Values of f without the
+    shape of the records, e.g. those of an element-wise f of vector
+    parameters, are recorded as NaN.
+
+    Attributes:
+        capacity (int): maximum number of records kept
+        sampling (function): policy choosing the recorded iterations
+        store_x (bool): whether the points are recorded
+        n_records (int): total number of records written since the last
+        reset, including the overwritten ones
+    """
+
+    def __init__(self, capacity, shape=(), value_shape=(), dtype=np.float64,
+                 sampling=None, store_x=True):
+        """Constructor
+
+        Args:
+            capacity (int): maximum number of records kept. 0 disables the
+            history
+            shape (tuple, optional): shape of the recorded points
+            value_shape (tuple, optional): shape of the recorded f(x) and
+            gradient norms, e.g. one value per start in batch mode
+            dtype (np.dtype, optional): floating point type of the recorded
+            points
+            sampling (function, optional): policy choosing the recorded
+            iterations. Defaults to every iteration
+            store_x (bool, optional): whether the points are recorded. Each
+            record then holds a copy of the point, which takes capacity
+            times the memory of the parameters
+
+        Returns:
+            None
+        """
+        self.capacity = capacity
+        self.sampling = sampling or LastN()
+        self.store_x = store_x
+        self.n_records = 0
+        self.__shape = tuple(shape)
+        self.__value_shape = tuple(value_shape)
+        self.__dtype = dtype
+        self.__size = 0
+        self.__iterations = None
+        self.__x = None
+        self.__f = None
+        self.__gradient_norm = None
+
+    def __allocate(self, n_records=0):
+        """Makes room for n_records records. The buffers start with 16
+        records and are doubled up to the capacity, keeping the records,
+        which don't wrap before the capacity is reached"""
+        size = self.__size
+        if self.__iterations is not None and \
+                (n_records <= size or size == self.capacity):
+            return
+        new_size = min(self.capacity, max(2*size, n_records, 16))
+        kept = min(self.n_records, size)
+
+        def grow(buffer, shape, dtype=np.float64):
+            new = np.zeros((2*new_size,) + shape, dtype=dtype)
+            if kept:
+                new[:kept] = new[new_size:new_size + kept] = buffer[:kept]
+            return new
+
+        self.__iterations = grow(self.__iterations, (), np.int64)
+        if self.store_x:
+            self.__x = grow(self.__x, self.__shape, self.__dtype)
+        self.__f = grow(self.__f, self.__value_shape)
+        self.__gradient_norm = grow(self.__gradient_norm, self.__value_shape)
+        self.__size = new_size
+
+    def __value(self, f):
+        """Gets the recorded value of f: NaN when its shape doesn't match"""
+        if np.ndim(f) and np.shape(f) != self.__value_shape:
+            return np.nan
+        return f
+
+    def __len__(self):
+        return min(self.n_records, self.capacity)
+
+    def reset(self):
+        """Empties the history, keeping its buffers
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.n_records = 0
+        self.sampling.reset()
+
+    def record(self, iteration, x, f, gradient_norm):
+        """Stores one record, overwriting the oldest one when full
+
+        Args:
+            iteration (int): iteration index
+            x (float): point
+            f (float): value of the function at x
+            gradient_norm (float): norm of the gradient
+
+        Returns:
+            None
+        """
+        if not self.capacity:
+            return
+        self.__allocate(self.n_records + 1)
+        f = self.__value(f)
+        size = self.__size
+        slot = self.n_records % size
+        for i in (slot, slot + size):
+            self.__iterations[i] = iteration
+            if self.store_x:
+                self.__x[i] = x
+            self.__f[i] = f
+            self.__gradient_norm[i] = gradient_norm
+        self.n_records += 1
+
+    def set_last_f(self, f):
+        """Sets the value of the function of the last record, e.g. once it
+        is computed by a later evaluation
+
+        Args:
+            f (float): value of the function at the last recorded point
+
+        Returns:
+            None
+        """
+        if not self.n_records:
+            return
+        slot = (self.n_records - 1) % self.__size
+        self.__f[slot] = self.__f[slot + self.__size] = self.__value(f)
+
+    def _get_state(self):
+        """Gets the stored records and the position of the sampling policy,
+        e.g. to write them in a checkpoint
+
+        Args:
+            None
+
+        Returns:
+            (dict): arrays by name. The records are views on the buffers
+        """
+        state = {'n_records': np.asarray(self.n_records),
+                 'iterations': self.iterations, 'f': self.f,
+                 'gradient_norm': self.gradient_norm}
+        if self.store_x:
+            state['x'] = self.x
+        # Plain functions used as sampling policies have no state
+        sampling_state = getattr(self.sampling, '_get_state', dict)()
+        for name, value in sampling_state.items():
+            state['sampling_' + name] = np.asarray(value)
+        return state
+
+    def _set_state(self, state):
+        """Restores the records and the sampling policy saved by
+        _get_state. The records are written back in their original slots,
+        so the ring buffer wraps exactly as it would have
+
+        Args:
+            state (dict): arrays by name, as given by _get_state
+
+        Returns:
+            None
+        """
+        n_records = int(state['n_records'])
+        if not self.capacity:
+            self.n_records = n_records
+            return
+        # The restored records replace the current ones
+        self.n_records = 0
+        self.__allocate(min(n_records, self.capacity))
+        self.n_records = n_records
+        size = self.__size
+        first = self.n_records - len(state['iterations'])
+        for i, (iteration, f, gradient_norm) in enumerate(zip(
+                state['iterations'], state['f'], state['gradient_norm'])):
+            slot = (first + i) % size
+            for j in (slot, slot + size):
+                self.__iterations[j] = iteration
+                self.__f[j] = f
+                self.__gradient_norm[j] = gradient_norm
+                if self.store_x and 'x' in state:
+                    self.__x[j] = state['x'][i]
+        if hasattr(self.sampling, '_set_state'):
+            self.sampling._set_state({name[len('sampling_'):]: value
+                                      for name, value in state.items()
+                                      if name.startswith('sampling_')})
+
+    def __window(self, buffer):
+        """Returns the stored records of a buffer in chronological order
+
+        Args:
+            buffer (np.array): one of the mirrored buffers
+
+        Returns:
+            (np.array): view on the records, oldest first
+        """
+        if buffer is None:
+            return buffer
+        size = self.__size
+        start = max(0, self.n_records - size) % max(1, size)
+        return buffer[start:start + len(self)]
+
+    @property
+    def iterations(self):
+        """(np.array): recorded iteration indexes, oldest first"""
+        self.__allocate()
+        return self.__window(self.__iterations)
+
+    @property
+    def x(self):
+        """(np.array): recorded points, oldest first. None when the points
+        aren't stored"""
+        self.__allocate()
+        return self.__window(self.__x)
+
+    @property
+    def f(self):
+        """(np.array): recorded values of the function, oldest first"""
+        self.__allocate()
+        return self.__window(self.__f)
+
+    @property
+    def gradient_norm(self):
+        """(np.array): recorded gradient norms, oldest first"""
+        self.__allocate()
+        return self.__window(self.__gradient_norm)
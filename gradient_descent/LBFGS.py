@@ -0,0 +1,230 @@
+from .GradientDescent import GradientDescent
+from .StepSize import ArmijoBacktracking, WolfeLineSearch
+import numpy as np
+
+
+class LBFGS(GradientDescent):
+    """Limited-memory BFGS quasi-Newton method. The inverse Hessian is
+    approximated from the last m steps s = x_{t+1} - x_t and gradient
+    changes y = g_{t+1} - g_t, and applied to the gradient with the two-loop
+    recursion. The pairs are stored in preallocated (m, n_parameters)
+    arrays used as a circular buffer, so each step only overwrites the
+    oldest pair.
+
+    In batch mode every start keeps its own curvature estimate.
+
+    Attributes:
+        name (string): name of the optmizer
+        f (function): function for optimization
+        df (function): first derivation of the function
+        x_t (float or np.array): starting variable for analysis
+        learning_rate (float): factor of the quasi-Newton direction, the
+        first step size tried by the line search
+        tolerance (int): tolerance for the distance between two consecutive
+        estimates in a subsequence that converges
+        max_iterations (int): maximum number of iterations
+        n_iterations (int): number of iterations for convegence
+        memory (int): number of curvature pairs kept
+        s (np.array): flattened steps of the stored pairs
+        y (np.array): flattened gradient changes of the stored pairs
+        rho (np.array): 1/(s.y) of the stored pairs, 0 for the pairs
+        skipped because they don't have positive curvature
+    """
+
+    def __init__(self, f, df, x_t, learning_rate=1.0, tolerance=1e-6,
+                 max_iterations=1000, n_history_points=1000, memory=10,
+                 step_size=None, **kwargs):
+        """Constructor
+        Args:
+            f (function): function for optimization
+            df (function): first derivation of the function
+            x_t (float or np.array): starting variable for analysis
+            learning_rate (float, optional): factor of the quasi-Newton
+            direction. 1 takes full quasi-Newton steps
+            tolerance (int, optional): tolerance for the distance between
+            two consecutive estimates in a subsequence that converges
+            max_iterations (int, optional): maximum number of iterations
+            n_history_points (int, optional): total amount of history points
+            to be saved during optization
+            memory (int, optional): number of curvature pairs kept
+            step_size (StepSize, optional): step-size rule. Defaults to a
+            WolfeLineSearch, or to ArmijoBacktracking in batch mode
+            **kwargs: optional arguments forwarded to GradientDescent,
+            such as batch
+
+        Returns:
+            None
+        """
+        if kwargs.get('sparse'):
+            raise ValueError('L-BFGS directions move every row, it does not '
+                             'support sparse gradients')
+        if kwargs.get('shards') is not None:
+            raise ValueError('L-BFGS directions depend on the whole gradient, '
+                             'it does not support sharding')
+        if step_size is None:
+            step_size = ArmijoBacktracking() if kwargs.get('batch') \
+                else WolfeLineSearch()
+        GradientDescent.__init__(self, f, df, x_t, learning_rate, tolerance,
+                                 max_iterations, n_history_points,
+                                 step_size=step_size, **kwargs)
+        self.name = 'L-BFGS'
+        self.memory = memory
+        self.s = None
+        self.y = None
+        self.rho = None
+        self.__alpha = None
+        self.__x_1 = None
+        self.__g_1 = None
+        self.__work = None
+        self.__n_pairs = 0
+        self.__has_previous = 0
+
+    def _get_state(self):
+        """Gets the internal state of the optimizer
+
+        Args:
+            None
+
+        Returns:
+            (dict): state values by name
+        """
+        if self.s is None:
+            return {'n_pairs': self.__n_pairs,
+                    'has_previous': self.__has_previous}
+        return {'s': self.s, 'y': self.y, 'rho': self.rho,
+                'x_1': self.__x_1, 'g_1': self.__g_1,
+                'n_pairs': self.__n_pairs,
+                'has_previous': self.__has_previous}
+
+    def _set_state(self, state):
+        """Restores the internal state of the optimizer
+
+        Args:
+            state (dict): state values by name, as given by _get_state
+
+        Returns:
+            None
+        """
+        self.__n_pairs = int(state['n_pairs'])
+        self.__has_previous = int(state['has_previous'])
+        if 's' in state:
+            self.__allocate(np.asarray(state['x_1']))
+            for buffer, name in ((self.s, 's'), (self.y, 'y'),
+                                 (self.rho, 'rho'), (self.__x_1, 'x_1'),
+                                 (self.__g_1, 'g_1')):
+                if buffer is not state[name]:
+                    np.copyto(buffer, state[name])
+
+    def _init_state(self, x_t):
+        """Allocates the curvature pairs of array parameters
+
+        Args:
+            x_t (np.array): point the state is shaped after
+
+        Returns:
+            None
+        """
+        GradientDescent._init_state(self, x_t)
+        self.__allocate(x_t)
+
+    def __allocate(self, x_t):
+        """Allocates the circular buffers, unless they already match x_t
+
+        Args:
+            x_t (np.array): point the state is shaped after
+
+        Returns:
+            None
+        """
+        # Parameters are stored flattened, scalars as arrays of one value
+        shape = (self.memory, np.size(x_t))
+        if self.s is not None and self.s.shape == shape and \
+                self.s.dtype == x_t.dtype:
+            return
+        # One curvature value per start in batch mode, one per pair for a
+        # vector of parameters
+        values_shape = shape if self.batch or not self._is_array \
+            else (self.memory,)
+        self.s = np.zeros(shape, dtype=x_t.dtype)
+        self.y = np.zeros(shape, dtype=x_t.dtype)
+        self.rho = np.zeros(values_shape, dtype=x_t.dtype)
+        self.__alpha = np.zeros(values_shape, dtype=x_t.dtype)
+        self.__x_1 = np.zeros(shape[1], dtype=x_t.dtype)
+        self.__g_1 = np.zeros(shape[1], dtype=x_t.dtype)
+        self.__work = np.empty(shape[1], dtype=x_t.dtype)
+
+    def __inner(self, a, b):
+        """Inner product of two parameter arrays: one value per start in
+        batch mode"""
+        if self._is_array and not self.batch:
+            return np.vdot(a, b)
+        return a*b
+
+    def _update_parameter(self, x_t, out=None):
+        """Computes the quasi-Newton update from the gradient and the stored
+        curvature pairs
+
+        Args:
+            x_t (float): point for calculation
+            out (np.array, optional): preallocated array receiving the update
+
+        Returns:
+            (float): update amount
+        """
+        g_t = self._gradient(x_t)
+        x = np.reshape(x_t, -1)
+        if not np.issubdtype(x.dtype, np.floating):
+            x = x.astype(float)  # e.g. an integer starting point
+        g = np.reshape(g_t, -1)
+        self.__allocate(x)
+
+        if self.__has_previous:
+            # The newest pair overwrites the oldest one
+            slot = self.__n_pairs % self.memory
+            np.subtract(x, self.__x_1, out=self.s[slot])
+            np.subtract(g, self.__g_1, out=self.y[slot])
+            s_y = self.__inner(self.s[slot], self.y[slot])
+            # Pairs without positive curvature would break the positive
+            # definiteness of the approximation
+            with np.errstate(divide='ignore'):
+                self.rho[slot] = np.where(s_y > 0, 1/s_y, 0)
+            self.__n_pairs += 1
+        np.copyto(self.__x_1, x)
+        np.copyto(self.__g_1, g)
+        self.__has_previous = 1
+
+        q = np.empty_like(x) if out is None else out.reshape(-1)
+        np.copyto(q, g)
+        work = self.__work
+        n_pairs = min(self.__n_pairs, self.memory)
+        newest_first = [(self.__n_pairs - 1 - i) % self.memory
+                        for i in range(n_pairs)]
+
+        for i in newest_first:
+            self.__alpha[i] = self.rho[i]*self.__inner(self.s[i], q)
+            np.multiply(self.y[i], self.__alpha[i], out=work)
+            q -= work
+
+        if n_pairs:
+            # Initial inverse Hessian scaled as s.y/y.y along the newest pair
+            newest = newest_first[0]
+            s_y = self.__inner(self.s[newest], self.y[newest])
+            y_y = self.__inner(self.y[newest], self.y[newest])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                q *= np.where(self.rho[newest] > 0, s_y/y_y, 1)
+
+        for i in reversed(newest_first):
+            beta = self.rho[i]*self.__inner(self.y[i], q)
+            np.multiply(self.s[i], self.__alpha[i] - beta, out=work)
+            q += work
+
+        q *= self.learning_rate
+        if out is not None:
+            update = out
+        elif self._is_array:
+            update = q.reshape(np.shape(x_t))
+        else:
+            update = q[0]
+        if self.step_size is not None:
+            update = self.step_size(self, x_t, g_t, update)
+        return update
@@ -0,0 +1,183 @@
+import os
+
+import numpy as np
+
+
+class ArraySource():
+    """Data source reading the samples of an array, one row per sample.
+
+    The array is read in contiguous blocks of rows, visited in random order,
+    and only the current block is copied in memory to be shuffled. Memory
+    mapped arrays are thus streamed from disk without being loaded whole.
+
+    Attributes:
+        data (np.array): samples, one per row
+    """
+
+    def __init__(self, data):
+        """Constructor
+
+        Args:
+            data (np.array): samples, one per row
+
+        Returns:
+            None
+        """
+        self.data = data
+
+    def blocks(self, block_size, rng=None):
+        """Iterates over the samples in shuffled blocks
+
+        Args:
+            block_size (int): number of samples per block
+            rng (np.random.Generator, optional): random generator. The
+            samples are read in order when it is None
+
+        Returns:
+            (generator): arrays of at most block_size samples
+        """
+        starts = np.arange(0, len(self.data), block_size)
+        if rng is not None:
+            rng.shuffle(starts)
+        for start in starts:
+            block = self.data[start:start + block_size]
+            if rng is not None:
+                block = block[rng.permutation(len(block))]
+            yield np.asarray(block)
+
+
+class NpySource(ArraySource):
+    """Data source streaming the samples of a .npy file through a memory map
+
+    Attributes:
+        path (str): path of the .npy file
+        data (np.memmap): memory mapped samples, one per row
+    """
+
+    def __init__(self, path):
+        """Constructor
+
+        Args:
+            path (str): path of the .npy file
+
+        Returns:
+            None
+        """
+        self.path = path
+        ArraySource.__init__(self, np.load(path, mmap_mode='r'))
+
+
+class IterableSource():
+    """Data source reading the samples of an iterable, e.g. a generator.
+
+    Samples are gathered in blocks that are shuffled in memory. Since
+    generators can only be iterated once, the source takes a function
+    returning a new iterable for each epoch.
+
+    Attributes:
+        make_iterable (function): function returning an iterable of samples
+    """
+
+    def __init__(self, make_iterable):
+        """Constructor
+
+        Args:
+            make_iterable (function): function without arguments returning
+            an iterable of samples
+
+        Returns:
+            None
+        """
+        self.make_iterable = make_iterable
+
+    def blocks(self, block_size, rng=None):
+        """Iterates over the samples in shuffled blocks
+
+        Args:
+            block_size (int): number of samples per block
+            rng (np.random.Generator, optional): random generator. The
+            samples are read in order when it is None
+
+        Returns:
+            (generator): arrays of at most block_size samples
+        """
+        block = []
+        for sample in self.make_iterable():
+            block.append(sample)
+            if len(block) == block_size:
+                yield self.__shuffled(block, rng)
+                block = []
+        if block:
+            yield self.__shuffled(block, rng)
+
+    @staticmethod
+    def __shuffled(block, rng):
+        block = np.asarray(block)
+        if rng is not None:
+            block = block[rng.permutation(len(block))]
+        return block
+
+
+def as_source(data):
+    """Wraps data in the matching data source
+
+    Args:
+        data: array, path of a .npy file, function returning an iterable of
+        samples, re-iterable collection of samples or data source
+
+    Returns:
+        (ArraySource or IterableSource): data source
+    """
+    if hasattr(data, 'blocks'):
+        return data
+    if isinstance(data, np.ndarray):
+        return ArraySource(data)
+    if isinstance(data, (str, os.PathLike)):
+        return NpySource(data)
+    if callable(data):
+        return IterableSource(data)
+    return IterableSource(lambda: data)
+
+
+def iter_batches(source, batch_size, block_size, rng=None):
+    """Splits the blocks of a data source in mini-batches
+
+    Args:
+        source (ArraySource or IterableSource): data source
+        batch_size (int): number of samples per mini-batch
+        block_size (int): number of samples shuffled together
+        rng (np.random.Generator, optional): random generator. The samples
+        are read in order when it is None
+
+    Returns:
+        (generator): arrays of at most batch_size samples
+    """
+    for block in source.blocks(block_size, rng):
+        for start in range(0, len(block), batch_size):
+            yield block[start:start + batch_size]
+
+
+class BatchGradient():
+    """Gradient of the objective on the current mini-batch, averaged from
+    the per-sample gradients
+
+    Attributes:
+        df_sample (function): per-sample gradient function
+        batch (np.array): current mini-batch
+    """
+
+    def __init__(self, df_sample):
+        """Constructor
+
+        Args:
+            df_sample (function): df_sample(x, batch) returns the gradients
+            at x of every sample of the batch, stacked along the first axis
+
+        Returns:
+            None
+        """
+        self.df_sample = df_sample
+        self.batch = None
+
+    def __call__(self, x_t):
+        return np.mean(self.df_sample(x_t, self.batch), axis=0)
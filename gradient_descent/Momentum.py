@@ -1,4 +1,5 @@
 from .GradientDescent import GradientDescent
+import numpy as np
 
 
 class Momentum(GradientDescent):
@@ -10,7 +11,7 @@ class Momentum(GradientDescent):
         name (string): name of the optmizer
         f (function): function for optimization
         df (function): first derivation of the function
-        x_t (float): starting variable for analysis
+        x_t (float or np.array): starting variable for analysis
         learning_rate (float): learning rate
         tolerance (int): tolerance for the distance between two consecutive
         estimates in a subsequence that converges
@@ -25,12 +26,13 @@ class Momentum(GradientDescent):
     """
 
     def __init__(self, f, df, x_t, learning_rate=1e-3, tolerance=1e-6,
-                 max_iterations=1000, n_history_points=1000, beta_1=0.9):
+                 max_iterations=1000, n_history_points=1000, beta_1=0.9,
+                 **kwargs):
         """Constructor
         Args:
             f (function): function for optimization
             df (function): first derivation of the function
-            x_t (float): starting variable for analysis
+            x_t (float or np.array): starting variable for analysis
             learning_rate (float, optional): learning rate
             tolerance (int, optional): tolerance for the distance
             between two consecutive estimates in a subsequence that converges
@@ -39,27 +41,106 @@ class Momentum(GradientDescent):
             to be saved during optization
             beta_1 (float, optional): fraction of the update vector of the
             past time step to the current update
+            **kwargs: optional arguments forwarded to GradientDescent,
+            such as batch
 
         Returns:
             None
         """
         GradientDescent.__init__(self, f, df, x_t, learning_rate, tolerance,
-                                 max_iterations, n_history_points)
+                                 max_iterations, n_history_points,
+                                 **kwargs)
         self.name = 'Momentum'
         self.beta_1 = beta_1
         self.__v_t = 0
         self.__v_t_1 = 0
 
-    def _update_parameter(self, x_t):
+    def _get_state(self):
+        """Gets the internal state of the optimizer
+
+        Args:
+            None
+
+        Returns:
+            (dict): state values by name
+        """
+        return {**GradientDescent._get_state(self), 'v_t': self.__v_t}
+
+    def _set_state(self, state):
+        """Restores the internal state of the optimizer
+
+        Args:
+            state (dict): state values by name, as given by _get_state
+
+        Returns:
+            None
+        """
+        GradientDescent._set_state(self, state)
+        self.__v_t = self.__v_t_1 = state['v_t']
+
+    def _init_state(self, x_t):
+        """Allocates the velocity array of array parameters
+
+        Args:
+            x_t (np.array): point the state is shaped after
+
+        Returns:
+            None
+        """
+        GradientDescent._init_state(self, x_t)
+        self.__v_t = self.__v_t_1 = self._state_buffer(self.__v_t, x_t)
+
+    def _compute_update(self, g_t, out=None):
         """Computes the current update vector for Momentum
 
         Params:
-            x_t (float): point for calculation
+            g_t (float): gradient evaluated for the current step
+            out (np.array, optional): preallocated array receiving the update
 
         Returns:
             (float): update amount
         """
-        self.__v_t_1 = self.beta_1*self.__v_t + (1 - self.beta_1)*self.df(x_t)
-        self.__v_t = self.__v_t_1
+        if out is not None:
+            # Same update computed in preallocated arrays: out holds the
+            # intermediate term before receiving the update
+            np.multiply(g_t, 1 - self.beta_1, out=out)
+            self.__v_t *= self.beta_1
+            self.__v_t += out
+            return np.multiply(self.__v_t, self.learning_rate, out=out)
+
+        # In-place updates reuse the state array of vector parameters
+        self.__v_t *= self.beta_1
+        self.__v_t += (1 - self.beta_1)*g_t
+        self.__v_t_1 = self.__v_t
 
         return self.learning_rate*self.__v_t_1
+
+    def _compute_sparse_update(self, indices, g_t):
+        """Computes the update of the rows with a nonzero gradient
+
+        Params:
+            indices (np.array): unique indices of the rows
+            g_t (np.array): gradient of the rows
+
+        Returns:
+            (np.array): update of the rows
+        """
+        v_t = self.__v_t[indices]
+        v_t *= self.beta_1
+        v_t += (1 - self.beta_1)*g_t
+        self.__v_t[indices] = v_t
+        return self.learning_rate*v_t
+
+    def _catch_up(self, indices, skipped):
+        """Decays the velocity of rows with a zero gradient by beta_1 per
+        skipped step. The rows don't move during these steps, the dense
+        update would still move them along their decaying velocity
+
+        Params:
+            indices (np.array): unique indices of the rows
+            skipped (np.array): number of skipped steps of each row
+
+        Returns:
+            None
+        """
+        self.__v_t[indices] *= self.beta_1**skipped
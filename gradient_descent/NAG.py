@@ -1,4 +1,5 @@
 from .GradientDescent import GradientDescent
+import numpy as np
 
 
 class NAG(GradientDescent):
@@ -9,7 +10,7 @@ class NAG(GradientDescent):
     Attributes:
         f (function): function for optimization
         df (function): first derivation of the function
-        x_t (float): starting variable for analysis
+        x_t (float or np.array): starting variable for analysis
         learning_rate (float): learning rate
         tolerance (int): tolerance for the distance between two consecutive
         estimates in a subsequence that converges
@@ -25,13 +26,14 @@ class NAG(GradientDescent):
     """
 
     def __init__(self, f, df, x_t, learning_rate=1e-3, tolerance=1e-6,
-                 max_iterations=1000, n_history_points=1000, gamma=0.9):
+                 max_iterations=1000, n_history_points=1000, gamma=0.9,
+                 **kwargs):
         """Constructor
         Args:
             name (string): name of the optmizer
             f (function): function for optimization
             df (function): first derivation of the function
-            x_t (float): starting variable for analysis
+            x_t (float or np.array): starting variable for analysis
             learning_rate (float, optional): learning rate
             tolerance (int, optional): tolerance for the distance between two
             consecutive estimates in a subsequence that converges
@@ -40,27 +42,106 @@ class NAG(GradientDescent):
             to be saved during optization
             gamma (float, optional): fraction of the past vector that contains
             an exponentially decaying average of past gradients
+            **kwargs: optional arguments forwarded to GradientDescent,
+            such as batch
 
         Returns:
             None
         """
+        if kwargs.get('sparse'):
+            raise ValueError('NAG evaluates the gradient at a look-ahead '
+                             'point that moves every row, it does not '
+                             'support sparse gradients')
         GradientDescent.__init__(self, f, df, x_t, learning_rate, tolerance,
-                                 max_iterations, n_history_points)
+                                 max_iterations, n_history_points,
+                                 **kwargs)
         self.name = 'NAG'
         self.gamma = gamma
         self.__u_t = 0
         self.__u_t_1 = 0
+        self.__x_ahead = None
 
-    def _update_parameter(self, x_t):
-        """Computes the current update vector for Nesterov accelerated gradient
+    def _get_state(self):
+        """Gets the internal state of the optimizer
+
+        Args:
+            None
+
+        Returns:
+            (dict): state values by name
+        """
+        return {'u_t': self.__u_t}
+
+    def _set_state(self, state):
+        """Restores the internal state of the optimizer
+
+        Args:
+            state (dict): state values by name, as given by _get_state
+
+        Returns:
+            None
+        """
+        self.__u_t = self.__u_t_1 = state['u_t']
+
+    def _init_state(self, x_t):
+        """Allocates the update vector and look-ahead point arrays of array
+        parameters
+
+        Args:
+            x_t (np.array): point the state is shaped after
+
+        Returns:
+            None
+        """
+        GradientDescent._init_state(self, x_t)
+        self.__u_t = self.__u_t_1 = self._state_buffer(self.__u_t, x_t)
+        x_ahead = self.__x_ahead
+        if x_ahead is None or x_ahead.shape != x_t.shape or \
+                x_ahead.dtype != x_t.dtype:
+            self.__x_ahead = np.empty_like(x_t)
+
+    def _gradient_point(self, x_t, out=None):
+        """Computes the look-ahead point x_t - gamma*u_t, where NAG
+        evaluates the gradient. Array parameters get it in a buffer of its
+        own rather than in out, which receives the update afterwards: a
+        gradient viewing the point would otherwise change with the update
 
         Params:
             x_t (float): point for calculation
+            out (np.array, optional): preallocated array that may receive
+            the point
+
+        Returns:
+            (float): look-ahead point
+        """
+        if out is not None and self.__x_ahead is not None:
+            out = self.__x_ahead
+        if out is None:
+            return x_t - self.gamma*self.__u_t
+        np.multiply(self.__u_t, self.gamma, out=out)
+        return np.subtract(x_t, out, out=out)
+
+    def _compute_update(self, g_t, out=None):
+        """Computes the current update vector for Nesterov accelerated gradient
+
+        Params:
+            g_t (float): gradient evaluated for the current step
+            out (np.array, optional): preallocated array receiving the update
 
         Returns:
             (float): update amount
         """
-        self.__u_t_1 = self.gamma*self.__u_t \
-            + self.learning_rate*self.df(x_t - self.gamma*self.__u_t)
-        self.__u_t = self.__u_t_1
+        if out is not None:
+            # Same update computed in preallocated arrays: out holds the
+            # scaled gradient before receiving the update
+            np.multiply(g_t, self.learning_rate, out=out)
+            self.__u_t *= self.gamma
+            self.__u_t += out
+            np.copyto(out, self.__u_t)
+            return out
+
+        # In-place updates reuse the state array of vector parameters
+        self.__u_t *= self.gamma
+        self.__u_t += self.learning_rate*g_t
+        self.__u_t_1 = self.__u_t
         return self.__u_t_1
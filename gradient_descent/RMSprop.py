@@ -11,7 +11,7 @@ class RMSprop(GradientDescent):
         name (string): name of the optmizer
         f (function): function for optimization
         df (function): first derivation of the function
-        x_t (float): starting variable for analysis
+        x_t (float or np.array): starting variable for analysis
         learning_rate (float): learning rate
         tolerance (int): tolerance for the distance between two consecutive
         estimates in a subsequence that converges
@@ -26,12 +26,13 @@ class RMSprop(GradientDescent):
     """
 
     def __init__(self, f, df, x_t, learning_rate=1e-3, tolerance=1e-6,
-                 max_iterations=1000, n_history_points=1000, beta_2=0.9):
+                 max_iterations=1000, n_history_points=1000, beta_2=0.9,
+                 **kwargs):
         """Constructor
         Args:
             f (function): function for optimization
             df (function): first derivation of the function
-            x_t (float): starting variable for analysis
+            x_t (float or np.array): starting variable for analysis
             learning_rate (float, optional): learning rate
             tolerance (int, optional): tolerance for the distance between
             two consecutive estimates in a subsequence that converges
@@ -41,31 +42,116 @@ class RMSprop(GradientDescent):
             beta_2 (float, optional): fraction of the past vector that
             contains an exponentially decaying average of
             past squared gradients.
+            **kwargs: optional arguments forwarded to GradientDescent,
+            such as batch
 
         Returns:
             None
         """
         GradientDescent.__init__(self, f, df, x_t, learning_rate, tolerance,
-                                 max_iterations, n_history_points)
+                                 max_iterations, n_history_points,
+                                 **kwargs)
         self.name = 'RMSprop'
         self.beta_2 = beta_2
         self.__s_t = 0
         self.__s_t_1 = 0
 
-    def _update_parameter(self, x_t):
+    def _get_state(self):
+        """Gets the internal state of the optimizer
+
+        Args:
+            None
+
+        Returns:
+            (dict): state values by name
+        """
+        return {**GradientDescent._get_state(self), 's_t': self.__s_t}
+
+    def _set_state(self, state):
+        """Restores the internal state of the optimizer
+
+        Args:
+            state (dict): state values by name, as given by _get_state
+
+        Returns:
+            None
+        """
+        GradientDescent._set_state(self, state)
+        self.__s_t = self.__s_t_1 = state['s_t']
+
+    def _init_state(self, x_t):
+        """Allocates the moment array of array parameters
+
+        Args:
+            x_t (np.array): point the state is shaped after
+
+        Returns:
+            None
+        """
+        GradientDescent._init_state(self, x_t)
+        self.__s_t = self.__s_t_1 = self._state_buffer(self.__s_t, x_t)
+
+    def _compute_update(self, g_t, out=None):
         """Computes the current update vector for RMSprop
 
         Params:
-            x_t (float): point for calculation
+            g_t (float): gradient evaluated for the current step
+            out (np.array, optional): preallocated array receiving the update
 
         Returns:
             (float): update amount
+        """
+        epsilon = 1e-8
+
+        if out is not None:
+            # Same update computed in preallocated arrays: out holds the
+            # intermediate terms before receiving the update
+            np.multiply(g_t, g_t, out=out)
+            out *= 1 - self.beta_2
+            self.__s_t *= self.beta_2
+            self.__s_t += out
+
+            np.sqrt(self.__s_t, out=out)
+            out += epsilon
+            np.divide(g_t, out, out=out)
+            out *= self.learning_rate
+            return out
+
+        # In-place updates reuse the state array of vector parameters
+        self.__s_t *= self.beta_2
+        self.__s_t += (1 - self.beta_2)*g_t**2
+        self.__s_t_1 = self.__s_t
+
+        return self.learning_rate*g_t/(np.sqrt(self.__s_t_1)+epsilon)
+
+    def _compute_sparse_update(self, indices, g_t):
+        """Computes the update of the rows with a nonzero gradient
 
+        Params:
+            indices (np.array): unique indices of the rows
+            g_t (np.array): gradient of the rows
+
+        Returns:
+            (np.array): update of the rows
         """
         epsilon = 1e-8
 
-        self.__s_t_1 = self.beta_2*self.__s_t + \
-            (1 - self.beta_2)*self.df(x_t)**2
-        self.__s_t = self.__s_t_1
+        s_t = self.__s_t[indices]
+        s_t *= self.beta_2
+        s_t += (1 - self.beta_2)*g_t**2
+        self.__s_t[indices] = s_t
+        return self.learning_rate*g_t/(np.sqrt(s_t) + epsilon)
 
-        return self.learning_rate*self.df(x_t)/(np.sqrt(self.__s_t_1)+epsilon)
+    def _catch_up(self, indices, skipped):
+        """Decays the average of squared gradients of rows with a zero
+        gradient by beta_2 per skipped step. As in the dense update, the
+        rows don't move during these steps
+
+        Params:
+            indices (np.array): unique indices of the rows
+            skipped (np.array): number of skipped steps of each row
+
+        Returns:
+            None
+        """
+        self.__s_t[indices] *= self.beta_2**skipped
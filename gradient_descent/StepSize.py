@@ -0,0 +1,409 @@
+"""Step-size rules, plugged into the optimizers with the step_size argument.
+
+At every step, the optimizer computes its update as usual, then the rule
+scales it: the new point is x_t - t*update. Schedules choose t from the
+iteration index, Barzilai-Borwein from the last two steps and the line
+searches by evaluating f along the update. With GradientDescent, t*update
+is a gradient step of learning rate t*learning_rate; with the other
+optimizers the rule scales their preconditioned or accelerated update.
+
+The line searches suit GradientDescent, RMSprop and Adam, whose updates
+are descent directions. Momentum and NAG keep their velocity whatever the
+step size, and their updates that point uphill are applied unchanged, so
+a line search doesn't stabilize a learning rate that is too large for them.
+
+In batch mode every start gets its own step size. The Wolfe line search
+only supports scalar and vector parameters.
+"""
+import numpy as np
+
+
+def _inner(optimizer, a, b):
+    """Inner product of two gradients or updates: one value per start in
+    batch mode"""
+    if optimizer._is_array and not optimizer.batch:
+        return np.vdot(a, b)
+    return a*b
+
+
+def _check_objective(optimizer):
+    """Raises ValueError when the optimizer can't evaluate f"""
+    if optimizer.f is None and optimizer.fg is None:
+        raise ValueError('Line searches need f or fg')
+
+
+def _scale(update, t):
+    """Multiplies the update by the step size, in place for arrays"""
+    if isinstance(update, np.ndarray):
+        update *= t
+        return update
+    return update*t
+
+
+class StepSize():
+    """Base class of the step-size rules. The default rule keeps the update
+    of the optimizer as it is
+
+    Attributes:
+        evaluates_f (bool): whether the rule evaluates f
+    """
+
+    evaluates_f = False
+
+    def reset(self):
+        """Prepares the rule for a new optimization
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+    def __call__(self, optimizer, x_t, g_t, update):
+        """Scales the update of the current step
+
+        Args:
+            optimizer (GradientDescent): running optimizer
+            x_t (float): current point
+            g_t (float): gradient of the current step
+            update (float): update computed by the optimizer. Arrays may be
+            scaled in place
+
+        Returns:
+            (float): update to subtract from x_t
+        """
+        return update
+
+    def _get_state(self):
+        """Gets the state of the rule, stored in checkpoints
+
+        Args:
+            None
+
+        Returns:
+            (dict): state values by name
+        """
+        return {}
+
+    def _set_state(self, state):
+        """Restores the state of the rule
+
+        Args:
+            state (dict): state values by name, as given by _get_state
+
+        Returns:
+            None
+        """
+
+
+class Schedule(StepSize):
+    """Base class of the learning-rate schedules, which scale the update by
+    a factor of the iteration index
+    """
+
+    def factor(self, iteration):
+        """Computes the factor of an iteration
+
+        Args:
+            iteration (int): iteration index, starting at 1
+
+        Returns:
+            (float): factor applied to the learning rate
+        """
+        return 1
+
+    def __call__(self, optimizer, x_t, g_t, update):
+        return _scale(update, self.factor(optimizer.n_iterations))
+
+
+class StepDecay(Schedule):
+    """Divides the learning rate by a constant every few iterations
+
+    Attributes:
+        every (int): number of iterations between two decays
+        gamma (float): factor applied at each decay
+    """
+
+    def __init__(self, every, gamma=0.1):
+        """Constructor
+
+        Args:
+            every (int): number of iterations between two decays
+            gamma (float, optional): factor applied at each decay
+
+        Returns:
+            None
+        """
+        self.every = every
+        self.gamma = gamma
+
+    def factor(self, iteration):
+        return self.gamma**((iteration - 1)//self.every)
+
+
+class CosineAnnealing(Schedule):
+    """Decreases the learning rate along a half cosine, from its value down
+    to min_factor times its value
+
+    Attributes:
+        n_iterations (int): number of iterations of the decrease
+        min_factor (float): factor reached after n_iterations and kept
+        afterwards
+    """
+
+    def __init__(self, n_iterations, min_factor=0.0):
+        """Constructor
+
+        Args:
+            n_iterations (int): number of iterations of the decrease
+            min_factor (float, optional): factor reached after n_iterations
+            and kept afterwards
+
+        Returns:
+            None
+        """
+        self.n_iterations = n_iterations
+        self.min_factor = min_factor
+
+    def factor(self, iteration):
+        progress = min(iteration - 1, self.n_iterations)/self.n_iterations
+        return self.min_factor + (1 - self.min_factor)*0.5*(
+            1 + np.cos(np.pi*progress))
+
+
+class Warmup(Schedule):
+    """Increases the learning rate linearly during the first iterations,
+    then follows another schedule
+
+    Attributes:
+        n_iterations (int): number of warmup iterations
+        schedule (Schedule): schedule followed after the warmup, counting
+        iterations from its end
+    """
+
+    def __init__(self, n_iterations, schedule=None):
+        """Constructor
+
+        Args:
+            n_iterations (int): number of warmup iterations
+            schedule (Schedule, optional): schedule followed after the
+            warmup. Defaults to a constant learning rate
+
+        Returns:
+            None
+        """
+        self.n_iterations = n_iterations
+        self.schedule = schedule or Schedule()
+
+    def factor(self, iteration):
+        if iteration <= self.n_iterations:
+            return iteration/self.n_iterations
+        return self.schedule.factor(iteration - self.n_iterations)
+
+
+class BarzilaiBorwein(StepSize):
+    """Barzilai-Borwein step sizes, estimating the inverse curvature along
+    the last step from the change of the gradient:
+    alpha = (s.s)/(s.y), with s the change of x and y the change of the
+    gradient. The first step is the update of the optimizer
+
+    Attributes:
+        min_step (float): smallest step size
+        max_step (float): largest step size
+    """
+
+    def __init__(self, min_step=1e-10, max_step=1e10):
+        """Constructor
+
+        Args:
+            min_step (float, optional): smallest step size
+            max_step (float, optional): largest step size
+
+        Returns:
+            None
+        """
+        self.min_step = min_step
+        self.max_step = max_step
+        self.__x = None
+        self.__g = None
+        self.__has_previous = False
+
+    def reset(self):
+        self.__has_previous = False
+
+    def __call__(self, optimizer, x_t, g_t, update):
+        if self.__has_previous:
+            s = x_t - self.__x
+            y = g_t - self.__g
+            with np.errstate(divide='ignore', invalid='ignore'):
+                alpha = _inner(optimizer, s, s)/_inner(optimizer, s, y)
+            # Without positive curvature along s, the step is kept
+            alpha = np.where(alpha > 0, alpha, optimizer.learning_rate)
+            alpha = np.clip(alpha, self.min_step, self.max_step)
+            update = _scale(update, (alpha/optimizer.learning_rate)[()])
+
+        # The previous point and gradient are kept in reused buffers
+        if isinstance(x_t, np.ndarray):
+            if self.__x is None or self.__x.shape != x_t.shape or \
+                    self.__x.dtype != x_t.dtype:
+                self.__x = np.empty_like(x_t)
+                self.__g = np.empty_like(x_t)
+            np.copyto(self.__x, x_t)
+            np.copyto(self.__g, g_t)
+        else:
+            self.__x, self.__g = x_t, g_t
+        self.__has_previous = True
+        return update
+
+    def _get_state(self):
+        if not self.__has_previous:
+            return {}
+        return {'x': self.__x, 'g': self.__g}
+
+    def _set_state(self, state):
+        self.__has_previous = 'x' in state
+        if self.__has_previous:
+            self.__x = np.array(state['x'])
+            self.__g = np.array(state['g'])
+            if not self.__x.ndim:
+                self.__x, self.__g = self.__x[()], self.__g[()]
+
+
+class ArmijoBacktracking(StepSize):
+    """Backtracking line search: starting from initial_step, the step size
+    is multiplied by shrink until f decreases enough,
+    f(x - t*update) <= f(x) - c*t*g.update (Armijo condition). Updates
+    that aren't descent directions are kept as they are
+
+    Attributes:
+        initial_step (float): first step size tried
+        shrink (float): factor applied to the step size at each trial
+        c (float): fraction of the linear decrease required
+        max_trials (int): maximum number of trials per step
+    """
+
+    evaluates_f = True
+
+    def __init__(self, initial_step=1.0, shrink=0.5, c=1e-4, max_trials=30):
+        """Constructor
+
+        Args:
+            initial_step (float, optional): first step size tried
+            shrink (float, optional): factor applied to the step size at
+            each trial
+            c (float, optional): fraction of the linear decrease required
+            max_trials (int, optional): maximum number of trials per step
+
+        Returns:
+            None
+        """
+        self.initial_step = initial_step
+        self.shrink = shrink
+        self.c = c
+        self.max_trials = max_trials
+
+    def __call__(self, optimizer, x_t, g_t, update):
+        _check_objective(optimizer)
+        f_0 = optimizer._current_objective(x_t)
+        slope = _inner(optimizer, g_t, update)
+        t = np.full(np.shape(slope), self.initial_step)
+        with np.errstate(over='ignore', invalid='ignore'):
+            for _ in range(self.max_trials):
+                f_t = optimizer._objective(x_t - t*update)
+                accepted = (f_t <= f_0 - self.c*t*slope) | (slope <= 0)
+                if np.all(accepted):
+                    break
+                t = np.where(accepted, t, t*self.shrink)
+        t = np.where(slope > 0, t, 1)
+        return _scale(update, t if np.ndim(t) else t[()])
+
+
+class WolfeLineSearch(StepSize):
+    """Line search satisfying the strong Wolfe conditions: sufficient
+    decrease (Armijo condition) and curvature, |g(x - t*update).update| <=
+    c_2*|g.update|. The step size is doubled until the minimum along the
+    update is bracketed, then the bracket is bisected. Each trial evaluates
+    df, counted in n_gradient_evaluations. The evaluation at the accepted
+    step is the one of the next point, which the next step reuses
+
+    Attributes:
+        initial_step (float): first step size tried
+        c_1 (float): fraction of the linear decrease required
+        c_2 (float): fraction of the slope allowed at the new point
+        max_step (float): largest step size
+        max_trials (int): maximum number of trials per step
+    """
+
+    evaluates_f = True
+
+    def __init__(self, initial_step=1.0, c_1=1e-4, c_2=0.9, max_step=1e10,
+                 max_trials=30):
+        """Constructor
+
+        Args:
+            initial_step (float, optional): first step size tried
+            c_1 (float, optional): fraction of the linear decrease required
+            c_2 (float, optional): fraction of the slope allowed at the new
+            point, 0.9 for quasi-Newton methods and 0.1 for an accurate
+            search
+            max_step (float, optional): largest step size
+            max_trials (int, optional): maximum number of trials per step
+
+        Returns:
+            None
+        """
+        self.initial_step = initial_step
+        self.c_1 = c_1
+        self.c_2 = c_2
+        self.max_step = max_step
+        self.max_trials = max_trials
+
+    def __call__(self, optimizer, x_t, g_t, update):
+        if optimizer.batch:
+            raise ValueError('Wolfe line search does not support batch mode')
+        _check_objective(optimizer)
+
+        # phi(t) = f(x_t - t*update), with phi'(t) = -g(x_t - t*update).update
+        phi_0 = optimizer._current_objective(x_t)
+        slope_0 = -_inner(optimizer, g_t, update)
+        if not slope_0 < 0:
+            return update
+
+        def phi(t):
+            f_t, g = optimizer._evaluate(x_t - t*update)
+            return f_t, g, -_inner(optimizer, g, update)
+
+        def sufficient_decrease(t, phi_t):
+            return phi_t <= phi_0 + self.c_1*t*slope_0
+
+        with np.errstate(over='ignore', invalid='ignore'):
+            t_low, phi_low, t = 0.0, phi_0, self.initial_step
+            g_low = t_high = None
+            for _ in range(self.max_trials):
+                phi_t, g, slope_t = phi(t)
+                if not sufficient_decrease(t, phi_t) or phi_t >= phi_low:
+                    t_high = t
+                elif abs(slope_t) <= -self.c_2*slope_0:
+                    # x_t - t*update is the next point, bit for bit
+                    optimizer._keep_ahead(phi_t, g)
+                    return _scale(update, t)
+                else:
+                    # The minimum lies between t and the end of the bracket
+                    # the slope points to
+                    direction = 1 if t_high is None else t_high - t_low
+                    if slope_t*direction >= 0:
+                        t_high = t_low
+                    t_low, phi_low, g_low = t, phi_t, g
+
+                if t_high is None:
+                    # Still going down: expand the step
+                    t = min(2*t, self.max_step)
+                else:
+                    t = 0.5*(t_low + t_high)
+
+        # Best step with sufficient decrease found so far
+        if t_low > 0:
+            optimizer._keep_ahead(phi_low, g_low)
+            return _scale(update, t_low)
+        return _scale(update, t)
@@ -0,0 +1,315 @@
+"""Stopping criteria, plugged into the optimizers with the stopping argument.
+
+They complement the tolerance on the step and max_iterations: the run also
+stops when the criterion is met. The criterion is checked every check_every
+iterations rather than at every one, so criteria that evaluate f cost one
+evaluation of f per check, shared between all the criteria.
+
+Criteria combine with | (any of them is met) and & (all of them are met):
+
+    stopping = (RelativeChange(1e-9) & GradientNorm(1e-4)) | NonFinite() \
+        | WallClock(60)
+
+In batch mode every start is checked on its own, and the starts that meet
+the criterion stop as the converged ones do.
+"""
+import time
+
+import numpy as np
+
+
+def _norm(optimizer, g_t):
+    """Norm of a gradient: one value per start in batch mode"""
+    if optimizer._is_array and not optimizer.batch:
+        return np.linalg.norm(g_t)
+    return np.abs(g_t)
+
+
+class StoppingCriterion():
+    """Base class of the stopping criteria. The default criterion is never
+    met
+
+    Attributes:
+        evaluates_f (bool): whether the criterion evaluates f
+    """
+
+    evaluates_f = False
+
+    def reset(self):
+        """Prepares the criterion for a new optimization
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+    def __call__(self, optimizer, x_t):
+        """Checks whether the optimization has to stop
+
+        Args:
+            optimizer (GradientDescent): running optimizer
+            x_t (float or np.array): current point
+
+        Returns:
+            (bool): True to stop. In batch mode, (np.array): mask of the
+            starts to stop
+        """
+        return False
+
+    def _get_state(self):
+        """Gets the state of the criterion, stored in checkpoints
+
+        Args:
+            None
+
+        Returns:
+            (dict): state values by name
+        """
+        return {}
+
+    def _set_state(self, state):
+        """Restores the state of the criterion
+
+        Args:
+            state (dict): state values by name, as given by _get_state
+
+        Returns:
+            None
+        """
+
+    def __or__(self, other):
+        return AnyOf(self, other)
+
+    def __and__(self, other):
+        return AllOf(self, other)
+
+
+class _Combination(StoppingCriterion):
+    """Criterion combining other criteria. Every criterion is evaluated at
+    each check, so that all of them keep their state up to date
+
+    Attributes:
+        criteria (tuple): combined criteria
+    """
+
+    def __init__(self, *criteria):
+        """Constructor
+
+        Args:
+            *criteria (StoppingCriterion): combined criteria
+
+        Returns:
+            None
+        """
+        self.criteria = criteria
+
+    @property
+    def evaluates_f(self):
+        return any(criterion.evaluates_f for criterion in self.criteria)
+
+    def reset(self):
+        for criterion in self.criteria:
+            criterion.reset()
+
+    def _get_state(self):
+        return {f'{i}_{name}': value
+                for i, criterion in enumerate(self.criteria)
+                for name, value in criterion._get_state().items()}
+
+    def _set_state(self, state):
+        for i, criterion in enumerate(self.criteria):
+            prefix = f'{i}_'
+            criterion._set_state({name[len(prefix):]: value
+                                  for name, value in state.items()
+                                  if name.startswith(prefix)})
+
+
+class AnyOf(_Combination):
+    """Met when any of the criteria is met"""
+
+    def __call__(self, optimizer, x_t):
+        stop = False
+        for criterion in self.criteria:
+            stop = stop | criterion(optimizer, x_t)
+        return stop
+
+
+class AllOf(_Combination):
+    """Met when all the criteria are met"""
+
+    def __call__(self, optimizer, x_t):
+        stop = True
+        for criterion in self.criteria:
+            stop = stop & criterion(optimizer, x_t)
+        return stop
+
+
+class RelativeChange(StoppingCriterion):
+    """Met when the relative change of f between two checks stays below
+    rtol, |f - f_previous| <= rtol*|f_previous|, for patience consecutive
+    checks
+
+    Attributes:
+        rtol (float): relative change of f considered a plateau
+        patience (int): number of consecutive checks on the plateau
+    """
+
+    evaluates_f = True
+
+    def __init__(self, rtol=1e-8, patience=1):
+        """Constructor
+
+        Args:
+            rtol (float, optional): relative change of f considered a
+            plateau
+            patience (int, optional): number of consecutive checks on the
+            plateau
+
+        Returns:
+            None
+        """
+        self.rtol = rtol
+        self.patience = patience
+        self.reset()
+
+    def reset(self):
+        self.__f = np.nan
+        self.__count = 0
+
+    def __call__(self, optimizer, x_t):
+        f_t = optimizer._stopping_objective(x_t)
+        with np.errstate(invalid='ignore'):
+            flat = np.abs(f_t - self.__f) <= self.rtol*np.abs(self.__f)
+        self.__count = np.where(flat, self.__count + 1, 0)
+        self.__f = f_t
+        return self.__count >= self.patience
+
+    def _get_state(self):
+        return {'f': self.__f, 'count': self.__count}
+
+    def _set_state(self, state):
+        if 'f' in state:
+            self.__f = state['f'][()]
+            self.__count = state['count'][()]
+        else:
+            self.reset()
+
+
+class Patience(StoppingCriterion):
+    """Met when f didn't improve on its best value by more than min_delta
+    for patience consecutive checks
+
+    Attributes:
+        patience (int): number of checks without improvement
+        min_delta (float): smallest decrease of f counted as an improvement
+    """
+
+    evaluates_f = True
+
+    def __init__(self, patience=10, min_delta=0.0):
+        """Constructor
+
+        Args:
+            patience (int, optional): number of checks without improvement
+            min_delta (float, optional): smallest decrease of f counted as
+            an improvement
+
+        Returns:
+            None
+        """
+        self.patience = patience
+        self.min_delta = min_delta
+        self.reset()
+
+    def reset(self):
+        self.__best = np.inf
+        self.__count = 0
+
+    def __call__(self, optimizer, x_t):
+        f_t = optimizer._stopping_objective(x_t)
+        improved = f_t < self.__best - self.min_delta
+        self.__best = np.where(improved, f_t, self.__best)
+        self.__count = np.where(improved, 0, self.__count + 1)
+        return self.__count >= self.patience
+
+    def _get_state(self):
+        return {'best': self.__best, 'count': self.__count}
+
+    def _set_state(self, state):
+        if 'best' in state:
+            self.__best = state['best'][()]
+            self.__count = state['count'][()]
+        else:
+            self.reset()
+
+
+class GradientNorm(StoppingCriterion):
+    """Met when the norm of the last gradient falls below tolerance
+
+    Attributes:
+        tolerance (float): gradient norm at which the optimization stops
+    """
+
+    def __init__(self, tolerance=1e-6):
+        """Constructor
+
+        Args:
+            tolerance (float, optional): gradient norm at which the
+            optimization stops
+
+        Returns:
+            None
+        """
+        self.tolerance = tolerance
+
+    def __call__(self, optimizer, x_t):
+        return _norm(optimizer, optimizer._g_t) <= self.tolerance
+
+
+class WallClock(StoppingCriterion):
+    """Met when the optimization ran for longer than a time budget. A
+    resumed optimization continues from the time of its checkpoint
+
+    Attributes:
+        seconds (float): time budget
+    """
+
+    def __init__(self, seconds):
+        """Constructor
+
+        Args:
+            seconds (float): time budget
+
+        Returns:
+            None
+        """
+        self.seconds = seconds
+        self.reset()
+
+    def reset(self):
+        self.__start = time.monotonic()
+
+    def __call__(self, optimizer, x_t):
+        stop = time.monotonic() - self.__start >= self.seconds
+        return np.full(np.shape(x_t), stop) if optimizer.batch else stop
+
+    def _get_state(self):
+        return {'elapsed': time.monotonic() - self.__start}
+
+    def _set_state(self, state):
+        self.__start = time.monotonic() - float(state.get('elapsed', 0))
+
+
+class NonFinite(StoppingCriterion):
+    """Met when the point or the last gradient holds inf or NaN, which NumPy
+    produces without raising when the optimization diverges. Checks don't
+    evaluate f
+    """
+
+    def __call__(self, optimizer, x_t):
+        if optimizer._is_array and not optimizer.batch:
+            return not (np.isfinite(x_t).all() and
+                        np.isfinite(optimizer._g_t).all())
+        return ~(np.isfinite(x_t) & np.isfinite(optimizer._g_t))
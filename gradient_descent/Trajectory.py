@@ -0,0 +1,263 @@
+"""Full optimization traces stored on disk, for runs whose iterates don't fit
+in memory.
+
+TrajectoryWriter is a callback appending the iterates of fit() to a .npy
+file, in blocks of records. Each record holds the iteration index, the
+point and, optionally, the value of f, in a structured dtype. The header of
+the file is rewritten after every block, so the file is a valid .npy array
+of the records written so far even while the optimization runs, or after
+it crashed.
+
+Trajectory opens a trace as a memory map: nothing is read until it is
+sliced, and the slices are views of the file.
+"""
+import bisect
+import os
+import struct
+
+import numpy as np
+
+from .Callback import Callback
+
+# Widest header: enough digits for any number of records
+_MAX_RECORDS = 10**19
+
+
+def _header(dtype, n_records):
+    """Builds the .npy header of n_records records, padded to a length
+    that doesn't depend on n_records
+
+    Args:
+        dtype (np.dtype): type of the records
+        n_records (int): number of records
+
+    Returns:
+        (bytes): magic string, version, header length and header
+    """
+    def describe(n):
+        return repr({'descr': np.lib.format.dtype_to_descr(dtype),
+                     'fortran_order': False, 'shape': (n,)})
+
+    length = len(describe(_MAX_RECORDS)) + 1
+    # Version 1.0 stores the header length on 2 bytes, 2.0 on 4 bytes
+    major, prefix = (1, '<H') if length + 10 < 2**16 else (2, '<I')
+    magic = np.lib.format.magic(major, 0)
+    start = len(magic) + struct.calcsize(prefix)
+    # The records start on a 64 bytes boundary, as in np.save
+    length = -(-(start + length)//64)*64 - start
+    header = describe(n_records).ljust(length - 1) + '\n'
+    return magic + struct.pack(prefix, length) + header.encode('latin1')
+
+
+def record_dtype(x_t, record_f=False, batch=False):
+    """Type of the records of a trace
+
+    Args:
+        x_t (float or np.array): point of the optimization
+        record_f (bool, optional): whether the records hold f
+        batch (bool, optional): whether x_t holds a batch of starts, each
+        with its own value of f
+
+    Returns:
+        (np.dtype): structured type with iteration, x and optionally f
+    """
+    x_t = np.asarray(x_t)
+    fields = [('iteration', np.int64), ('x', x_t.dtype, x_t.shape)]
+    if record_f:
+        fields.append(('f', np.float64, x_t.shape if batch else ()))
+    return np.dtype(fields)
+
+
+class TrajectoryWriter(Callback):
+    """Callback appending every every-th iterate of the optimizations to a
+    .npy file. The starting point and the last point are always written.
+    Each optimization writes a new trace, except resumed ones, which
+    continue the trace from their checkpoint.
+
+    Records are gathered in a preallocated block of block_size records and
+    written together, so the disk sees one write per block.
+
+    Attributes:
+        path (str): path of the .npy file
+        every (int): number of iterations between two records
+        block_size (int): number of records written at once
+        record_f (bool): whether the records hold f, evaluated at every
+        recorded point
+        n_records (int): number of records of the current trace
+    """
+
+    def __init__(self, path, every=1, block_size=1024, record_f=False):
+        """Constructor
+
+        Args:
+            path (str): path of the .npy file
+            every (int, optional): number of iterations between two records
+            block_size (int, optional): number of records written at once
+            record_f (bool, optional): whether the records hold f
+
+        Returns:
+            None
+        """
+        self.path = os.fspath(path)
+        self.every = max(1, int(every))
+        self.block_size = max(1, int(block_size))
+        self.record_f = record_f
+        self.n_records = 0
+        self.__file = None
+        self.__block = None
+        self.__n_block = 0
+        self.__last = -1
+
+    def on_fit_start(self, optimizer, x_t):
+        self.close()
+        dtype = record_dtype(x_t, self.record_f, optimizer.batch)
+        if self.__block is None or self.__block.dtype != dtype:
+            self.__block = np.empty(self.block_size, dtype=dtype)
+        self.__n_block = 0
+        iteration = optimizer.n_iterations
+
+        if iteration and os.path.exists(self.path):
+            # Resumed: drop the records past the checkpoint
+            trace = np.load(self.path, mmap_mode='r')
+            if trace.dtype == dtype:
+                n_records = bisect.bisect_left(trace['iteration'],
+                                               iteration)
+                offset = trace.offset
+                del trace
+                self.__file = open(self.path, 'r+b')
+                self.__file.truncate(offset + n_records*dtype.itemsize)
+                self.__file.seek(0, os.SEEK_END)
+                self.n_records = n_records
+        if self.__file is None:
+            self.__file = open(self.path, 'wb')
+            self.__file.write(_header(dtype, 0))
+            self.n_records = 0
+        self.__append(optimizer, iteration, x_t)
+
+    def on_step(self, optimizer, x_t, step):
+        if optimizer.n_iterations % self.every == 0:
+            self.__append(optimizer, optimizer.n_iterations, x_t)
+
+    def on_fit_end(self, optimizer, x_t):
+        if self.__file is None:
+            return
+        if self.__last != optimizer.n_iterations:
+            self.__append(optimizer, optimizer.n_iterations, x_t)
+        self.close()
+
+    def __append(self, optimizer, iteration, x_t):
+        """Adds a record to the block, and writes the block when full"""
+        block, n = self.__block, self.__n_block
+        block['iteration'][n] = iteration
+        block['x'][n] = x_t
+        if self.record_f:
+            block['f'][n] = optimizer._objective(x_t)
+        self.__n_block = n + 1
+        self.__last = iteration
+        if self.__n_block == self.block_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the pending records and updates the header
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self.__file is None:
+            return
+        if self.__n_block:
+            self.__block[:self.__n_block].tofile(self.__file)
+            self.n_records += self.__n_block
+            self.__n_block = 0
+        self.__file.seek(0)
+        self.__file.write(_header(self.__block.dtype, self.n_records))
+        self.__file.seek(0, os.SEEK_END)
+        self.__file.flush()
+
+    def close(self):
+        """Writes the pending records and closes the file
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self.__file is not None:
+            self.flush()
+            self.__file.close()
+            self.__file = None
+        self.__last = -1
+
+
+class Trajectory():
+    """Trace written by TrajectoryWriter, opened as a read-only memory map.
+    The fields and the slices are views of the file: only the records
+    accessed are read
+
+    Attributes:
+        records (np.memmap): structured array of the records
+        iterations (np.array): iteration index of each record
+        x (np.array): point of each record
+        f (np.array): value of f of each record, when recorded
+    """
+
+    def __init__(self, path):
+        """Constructor
+
+        Args:
+            path (str): path of the .npy file
+
+        Returns:
+            None
+        """
+        self.records = np.load(path, mmap_mode='r')
+
+    @classmethod
+    def _from_records(cls, records):
+        trajectory = cls.__new__(cls)
+        trajectory.records = records
+        return trajectory
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    @property
+    def iterations(self):
+        return self.records['iteration']
+
+    @property
+    def x(self):
+        return self.records['x']
+
+    @property
+    def f(self):
+        if 'f' not in self.records.dtype.names:
+            raise AttributeError('f was not recorded')
+        return self.records['f']
+
+    def between(self, start=None, stop=None):
+        """Selects the records of an iteration range. The iterations are
+        sorted, so a binary search finds the range reading only about
+        log2(len) records
+
+        Args:
+            start (int, optional): first iteration, included
+            stop (int, optional): last iteration, excluded
+
+        Returns:
+            (Trajectory): view of the records with start <= iteration < stop
+        """
+        iterations = self.iterations
+        # np.searchsorted would copy the strided column of the iterations
+        first = 0 if start is None else \
+            bisect.bisect_left(iterations, start)
+        last = len(self) if stop is None else \
+            bisect.bisect_left(iterations, stop)
+        return self._from_records(self.records[first:last])
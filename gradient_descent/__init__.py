@@ -2,4 +2,15 @@ from .GradientDescent import GradientDescent
 from .Momentum import Momentum
 from .NAG import NAG
 from .Adam import Adam
-from .RMSprop import RMSprop
\ No newline at end of file
+from .RMSprop import RMSprop
+from .LBFGS import LBFGS
+from .History import History, EveryK, LogSpaced, LastN
+from .Checkpoint import Checkpoint
+from .autodiff import grad, value_and_grad
+from .StepSize import (StepSize, Schedule, StepDecay, CosineAnnealing, Warmup,
+                       BarzilaiBorwein, ArmijoBacktracking, WolfeLineSearch)
+from .Callback import Callback, StepTimer, GradientTimer, GradientNormStats
+from .Stopping import (StoppingCriterion, AnyOf, AllOf, RelativeChange,
+                       Patience, GradientNorm, WallClock, NonFinite)
+from .GradientCache import GradientCache
+from .Trajectory import TrajectoryWriter, Trajectory
@@ -0,0 +1,158 @@
+"""Asynchronous fit loop, for optimizations running inside an asyncio event
+loop next to many others.
+
+df (or fg) may be a coroutine function: the loop awaits the gradient of
+each step, then feeds it to the update rule of the optimizer as if df had
+returned it. The loop also yields to the event loop every yield_every
+iterations, so synchronous gradients don't stall it either. f, when given,
+stays a regular function.
+
+Line searches that evaluate df between two steps, such as
+WolfeLineSearch, can't await it and don't support coroutine gradients. With
+a coroutine fg and no f, the step sizes and stopping criteria evaluating f,
+such as ArmijoBacktracking and RelativeChange, aren't supported either.
+"""
+import asyncio
+import inspect
+import time
+
+import numpy as np
+
+
+def _is_async(function):
+    """Checks whether calling a function returns a coroutine"""
+    return inspect.iscoroutinefunction(function) or \
+        inspect.iscoroutinefunction(getattr(function, '__call__', None))
+
+
+class AwaitedGradient():
+    """Stands in for a coroutine df or fg during the steps: returns the
+    value awaited for the current step
+
+    Attributes:
+        value: gradient, or (f, gradient), of the current step
+    """
+
+    def __init__(self):
+        """Constructor
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.value = None
+
+    def __call__(self, x_t):
+        value, self.value = self.value, None
+        if value is None:
+            raise ValueError('A coroutine df or fg is evaluated once per '
+                             'step: line searches evaluating df, such as '
+                             'WolfeLineSearch, are not supported')
+        return value
+
+
+def _nan(x_t):
+    """f of the optimizations with a coroutine fg and no f, which only
+    leaves the values of the history that fg doesn't give undefined"""
+    return np.nan
+
+
+async def fit_async(optimizer, x0=None, yield_every=100, timeout=None,
+                    checkpoint=None):
+    """Runs the optimization of fit() as a coroutine. See
+    GradientDescent.fit_async
+
+    Args:
+        optimizer (GradientDescent): optimizer to run
+        x0 (float or np.array, optional): starting point, see fit
+        yield_every (int, optional): number of iterations between two
+        yields to the event loop
+        timeout (float, optional): seconds after which the optimization is
+        cancelled and asyncio.TimeoutError raised
+        checkpoint (Checkpoint, optional): periodically saves the state of
+        the optimization, and saves it when the optimization is cancelled
+
+    Returns:
+        (float): local minimum measured by the algorithm, as fit
+    """
+    run = _fit(optimizer, x0, max(1, int(yield_every)), checkpoint)
+    if timeout is None:
+        return await run
+    return await asyncio.wait_for(run, timeout)
+
+
+async def _fit(optimizer, x0, yield_every, checkpoint):
+    """Coroutine of the optimization, see fit_async"""
+    callbacks = optimizer.callbacks
+    f, df, fg = optimizer.f, optimizer.df, optimizer.fg
+    awaited = _is_async(fg if fg is not None else df)
+    gradient = AwaitedGradient()
+    if awaited and f is None and fg is not None:
+        for rule in (optimizer.step_size, optimizer.stopping):
+            if getattr(rule, 'evaluates_f', False):
+                raise ValueError(f'{type(rule).__name__} evaluates f, '
+                                 'which a coroutine fg gives only once per '
+                                 'step: give f too')
+    if awaited:
+        # The awaited gradient takes the place of df or fg during the run
+        if fg is not None:
+            optimizer.fg = gradient
+            if f is None:
+                optimizer.f = _nan
+        else:
+            optimizer.df = gradient
+
+    async def advance(x_t):
+        if awaited:
+            point = optimizer._gradient_point(x_t)
+            start = time.perf_counter()
+            gradient.value = await (fg or df)(point)
+            if callbacks:
+                optimizer.gradient_seconds += time.perf_counter() - start
+        return optimizer._step(x_t)
+
+    x_t = step = None
+    completed = 0  # index of the last complete iteration
+    try:
+        optimizer.reset(x0)
+        x_t = optimizer._start()
+        for callback in callbacks:
+            callback.on_fit_start(optimizer, x_t)
+
+        while step is None or (
+                optimizer._is_running(step) and
+                optimizer.n_iterations < optimizer.max_iterations):
+            if step is not None and optimizer.n_iterations % yield_every == 0:
+                await asyncio.sleep(0)
+            try:
+                optimizer.n_iterations += 1
+                x_t, step = await advance(x_t)
+                completed = optimizer.n_iterations
+                if optimizer._end_iteration(x_t, step, checkpoint):
+                    break
+
+            except OverflowError as err:
+                return optimizer._overflow(x_t, err)
+
+        optimizer._complete_history(x_t)
+        if callbacks:
+            optimizer._notify_end(x_t, step)
+
+    except asyncio.CancelledError:
+        # Cancellation happens while awaiting, before the next step
+        # changes the state: the checkpoint lets resume continue from the
+        # last complete one
+        optimizer.n_iterations = completed
+        if checkpoint is not None and completed:
+            checkpoint.save(optimizer, x_t, step)
+        raise
+
+    finally:
+        optimizer.f, optimizer.df, optimizer.fg = f, df, fg
+        if x_t is not None:
+            for callback in callbacks:
+                callback.on_fit_end(optimizer, x_t)
+
+    return optimizer._result(x_t)
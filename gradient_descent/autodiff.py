@@ -0,0 +1,438 @@
+"""Automatic differentiation of NumPy functions, to build df from f.
+
+Two modes are available:
+
+- 'forward' propagates dual numbers, whose tangent holds the derivative of
+  every value with respect to every parameter. One evaluation of f gives
+  the gradient, at a cost growing with the number of parameters, which
+  suits scalar and low-dimensional problems.
+- 'reverse' records the operations of f on a tape of whole arrays, then
+  runs the tape backward once. The cost is a small multiple of one
+  evaluation of f whatever the number of parameters.
+
+f must be written with NumPy operations: arithmetic operators, ufuncs such
+as np.exp or np.sin, np.sum, np.mean, np.dot, @ and indexing. Calls that
+would silently drop the derivative, such as math.exp or float(x), fail
+instead. When f returns an array, the gradient of its sum is computed,
+which gives the element-wise derivatives needed by batch mode.
+"""
+import itertools
+
+import numpy as np
+
+# Partial derivatives of the supported ufuncs, as functions of the inputs
+# and of the output y
+_UNARY = {
+    np.negative: lambda x, y: -1,
+    np.positive: lambda x, y: 1,
+    np.exp: lambda x, y: y,
+    np.expm1: lambda x, y: y + 1,
+    np.log: lambda x, y: 1/x,
+    np.log1p: lambda x, y: 1/(1 + x),
+    np.sqrt: lambda x, y: 0.5/y,
+    np.square: lambda x, y: 2*x,
+    np.reciprocal: lambda x, y: -y**2,
+    np.absolute: lambda x, y: np.sign(x),
+    np.sin: lambda x, y: np.cos(x),
+    np.cos: lambda x, y: -np.sin(x),
+    np.tan: lambda x, y: 1 + y**2,
+    np.arctan: lambda x, y: 1/(1 + x**2),
+    np.sinh: lambda x, y: np.cosh(x),
+    np.cosh: lambda x, y: np.sinh(x),
+    np.tanh: lambda x, y: 1 - y**2,
+}
+
+_BINARY = {
+    np.add: (lambda a, b, y: 1, lambda a, b, y: 1),
+    np.subtract: (lambda a, b, y: 1, lambda a, b, y: -1),
+    np.multiply: (lambda a, b, y: b, lambda a, b, y: a),
+    np.true_divide: (lambda a, b, y: 1/b, lambda a, b, y: -y/b),
+    np.power: (lambda a, b, y: b*a**(b - 1),
+               lambda a, b, y: y*np.log(a)),
+    np.maximum: (lambda a, b, y: a >= b, lambda a, b, y: a < b),
+    np.minimum: (lambda a, b, y: a <= b, lambda a, b, y: a > b),
+}
+
+# Ufuncs whose output is piecewise constant: they are evaluated on the
+# values and stop the derivative
+_CONSTANT = {np.sign, np.floor, np.ceil, np.rint, np.greater,
+             np.greater_equal, np.less, np.less_equal, np.equal,
+             np.not_equal, np.isfinite, np.isnan}
+
+
+def _value(x):
+    """Returns the NumPy value of a traced or constant operand"""
+    return x.value if isinstance(x, _Traced) else x
+
+
+def _normalize_axis(axis, ndim):
+    """Returns a reduction axis as a tuple of non-negative axes"""
+    if axis is None:
+        return tuple(range(ndim))
+    if not isinstance(axis, tuple):
+        axis = (axis,)
+    return tuple(a % ndim for a in axis)
+
+
+class _Traced():
+    """Operators shared by the traced values. Every operator goes through
+    the NumPy ufuncs, so the derivative rules live in __array_ufunc__"""
+
+    def __add__(self, other):
+        return np.add(self, other)
+
+    def __radd__(self, other):
+        return np.add(other, self)
+
+    def __sub__(self, other):
+        return np.subtract(self, other)
+
+    def __rsub__(self, other):
+        return np.subtract(other, self)
+
+    def __mul__(self, other):
+        return np.multiply(self, other)
+
+    def __rmul__(self, other):
+        return np.multiply(other, self)
+
+    def __truediv__(self, other):
+        return np.true_divide(self, other)
+
+    def __rtruediv__(self, other):
+        return np.true_divide(other, self)
+
+    def __pow__(self, other):
+        return np.power(self, other)
+
+    def __rpow__(self, other):
+        return np.power(other, self)
+
+    def __matmul__(self, other):
+        return np.matmul(self, other)
+
+    def __rmatmul__(self, other):
+        return np.matmul(other, self)
+
+    def __neg__(self):
+        return np.negative(self)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return np.absolute(self)
+
+    def __lt__(self, other):
+        return self.value < _value(other)
+
+    def __le__(self, other):
+        return self.value <= _value(other)
+
+    def __gt__(self, other):
+        return self.value > _value(other)
+
+    def __ge__(self, other):
+        return self.value >= _value(other)
+
+    def __len__(self):
+        return len(self.value)
+
+    @property
+    def shape(self):
+        return self.value.shape
+
+    @property
+    def ndim(self):
+        return self.value.ndim
+
+    @property
+    def size(self):
+        return self.value.size
+
+    def mean(self, axis=None):
+        """Mean of the elements over the given axis"""
+        axes = _normalize_axis(axis, self.ndim)
+        return self.sum(axis)/int(np.prod([self.shape[a] for a in axes]))
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs:
+            return NotImplemented
+        values = [_value(x) for x in inputs]
+        if ufunc in _CONSTANT:
+            return ufunc(*values)
+        if ufunc is np.matmul:
+            return self._matmul(*inputs)
+        if ufunc in _UNARY:
+            y = ufunc(*values)
+            return self._elementwise(y, inputs, [_UNARY[ufunc](*values, y)])
+        if ufunc in _BINARY:
+            y = ufunc(*values)
+            partials = [None if not isinstance(x, _Traced)
+                        else partial(*values, y)
+                        for x, partial in zip(inputs, _BINARY[ufunc])]
+            return self._elementwise(y, inputs, partials)
+        raise TypeError(f'{ufunc.__name__} is not supported by automatic '
+                        'differentiation')
+
+    def __array_function__(self, func, types, args, kwargs):
+        if func is np.sum:
+            return args[0].sum(*args[1:], **kwargs)
+        if func is np.mean:
+            return args[0].mean(*args[1:], **kwargs)
+        if func is np.dot:
+            return np.matmul(*args)
+        if func is np.shape:
+            return self.shape
+        return NotImplemented
+
+
+class Dual(_Traced):
+    """Forward-mode dual number. The tangent holds the derivative of each
+    element of the value with respect to each parameter: its shape is the
+    shape of the value followed by the shape of the parameters
+
+    Attributes:
+        value (np.array): value
+        tangent (np.array): derivatives of the value
+        n_axes (int): number of parameter axes at the end of the tangent
+    """
+
+    def __init__(self, value, tangent, n_axes):
+        """Constructor
+
+        Args:
+            value (np.array): value
+            tangent (np.array): derivatives of the value
+            n_axes (int): number of parameter axes at the end of the tangent
+
+        Returns:
+            None
+        """
+        self.value = np.asarray(value)
+        self.tangent = tangent
+        self.n_axes = n_axes
+
+    def __expand(self, partial):
+        """Appends the parameter axes to a partial derivative"""
+        partial = np.asarray(partial)
+        return partial.reshape(partial.shape + (1,)*self.n_axes)
+
+    def _elementwise(self, y, inputs, partials):
+        parameters_shape = self.tangent.shape[self.tangent.ndim -
+                                              self.n_axes:]
+        tangent = 0
+        for x, partial in zip(inputs, partials):
+            if isinstance(x, Dual):
+                tangent = tangent + self.__expand(partial)*x.tangent
+        tangent = np.broadcast_to(tangent, np.shape(y) + parameters_shape)
+        return Dual(y, tangent, self.n_axes)
+
+    def _matmul(self, a, b):
+        k = self.n_axes
+        a_value, b_value = np.asarray(_value(a)), np.asarray(_value(b))
+        last = np.ndim(a_value) - 1
+        tangent = 0
+        if isinstance(a, Dual):
+            # The parameter axes end up in the middle of the contraction
+            tangent = np.moveaxis(
+                np.tensordot(a.tangent, b_value, axes=([last], [0])),
+                range(last, last + k), range(-k, 0))
+        if isinstance(b, Dual):
+            tangent = tangent + np.tensordot(a_value, b.tangent,
+                                             axes=([last], [0]))
+        return Dual(np.matmul(a_value, b_value), tangent, k)
+
+    def sum(self, axis=None):
+        """Sum of the elements over the given axis"""
+        axes = _normalize_axis(axis, self.ndim)
+        return Dual(self.value.sum(axis=axes), self.tangent.sum(axis=axes),
+                    self.n_axes)
+
+    def __getitem__(self, index):
+        return Dual(self.value[index], self.tangent[index], self.n_axes)
+
+
+class Variable(_Traced):
+    """Reverse-mode variable: a node of the tape recording the operations
+    of f on whole arrays
+
+    Attributes:
+        value (np.array): value
+        parents (tuple): (variable, function) pairs, the function mapping
+        the gradient of this node to the gradient of the variable
+    """
+    __counter = itertools.count()
+
+    def __init__(self, value, parents=()):
+        """Constructor
+
+        Args:
+            value (np.array): value
+            parents (tuple, optional): (variable, function) pairs, the
+            function mapping the gradient of this node to the gradient of
+            the variable
+
+        Returns:
+            None
+        """
+        self.value = np.asarray(value)
+        self.parents = parents
+        # Nodes are created in the order of evaluation, so decreasing
+        # indexes are a valid order for the backward pass
+        self._index = next(Variable.__counter)
+
+    @staticmethod
+    def __unbroadcast(gradient, shape):
+        """Sums a gradient over the axes its variable was broadcast along"""
+        gradient = np.asarray(gradient)
+        while gradient.ndim > len(shape):
+            gradient = gradient.sum(axis=0)
+        for axis, length in enumerate(shape):
+            if length == 1 and gradient.shape[axis] != 1:
+                gradient = gradient.sum(axis=axis, keepdims=True)
+        return np.broadcast_to(gradient, shape)
+
+    def _elementwise(self, y, inputs, partials):
+        parents = tuple(
+            (x, lambda g, p=partial, shape=x.shape:
+                Variable.__unbroadcast(g*p, shape))
+            for x, partial in zip(inputs, partials)
+            if isinstance(x, Variable))
+        return Variable(y, parents)
+
+    def _matmul(self, a, b):
+        a_value, b_value = np.asarray(_value(a)), np.asarray(_value(b))
+        parents = []
+        if isinstance(a, Variable):
+            if b_value.ndim == 1:
+                vjp = (lambda g: np.multiply.outer(g, b_value)) \
+                    if a_value.ndim > 1 else (lambda g: g*b_value)
+            else:
+                vjp = (lambda g: g @ b_value.T) if a_value.ndim > 1 \
+                    else (lambda g: b_value @ g)
+            parents.append((a, vjp))
+        if isinstance(b, Variable):
+            if a_value.ndim == 1:
+                vjp = (lambda g: np.multiply.outer(a_value, g)) \
+                    if b_value.ndim > 1 else (lambda g: g*a_value)
+            else:
+                vjp = (lambda g: a_value.T @ g)
+            parents.append((b, vjp))
+        return Variable(np.matmul(a_value, b_value), tuple(parents))
+
+    def sum(self, axis=None):
+        """Sum of the elements over the given axis"""
+        axes = _normalize_axis(axis, self.ndim)
+        shape = self.shape
+        return Variable(self.value.sum(axis=axes), (
+            (self, lambda g: np.broadcast_to(np.expand_dims(g, axes),
+                                             shape)),))
+
+    def __getitem__(self, index):
+        shape, dtype = self.shape, self.value.dtype
+
+        def vjp(g):
+            gradient = np.zeros(shape, dtype=dtype)
+            np.add.at(gradient, index, g)
+            return gradient
+
+        return Variable(self.value[index], ((self, vjp),))
+
+    def backward(self, seed):
+        """Runs the tape backward from this node
+
+        Args:
+            seed (np.array): gradient of the output with respect to this
+            node
+
+        Returns:
+            (dict): gradients by variable
+        """
+        nodes, stack = {}, [self]
+        while stack:
+            node = stack.pop()
+            if node._index not in nodes:
+                nodes[node._index] = node
+                stack.extend(parent for parent, _ in node.parents)
+
+        gradients = {self._index: seed}
+        for index in sorted(nodes, reverse=True):
+            if index not in gradients:
+                continue
+            gradient = gradients[index]
+            for parent, vjp in nodes[index].parents:
+                contribution = vjp(gradient)
+                if parent._index in gradients:
+                    contribution = gradients[parent._index] + contribution
+                gradients[parent._index] = contribution
+        return gradients
+
+
+def _forward(f, x):
+    """Evaluates f and its gradient with dual numbers"""
+    seed = np.eye(x.size, dtype=x.dtype).reshape(x.shape*2)
+    y = f(Dual(x, seed, x.ndim))
+    if not isinstance(y, Dual):
+        return y, np.zeros_like(x)
+    return y.value, y.tangent.sum(axis=tuple(range(y.ndim)))
+
+
+def _reverse(f, x):
+    """Evaluates f and its gradient with the tape"""
+    variable = Variable(x)
+    y = f(variable)
+    if not isinstance(y, Variable):
+        return y, np.zeros_like(x)
+    gradients = y.backward(np.ones_like(y.value))
+    gradient = gradients.get(variable._index, np.zeros_like(x))
+    return y.value, np.asarray(gradient, dtype=x.dtype)
+
+
+_MODES = {'forward': _forward, 'reverse': _reverse}
+
+
+def value_and_grad(f, mode='reverse'):
+    """Builds a function evaluating f and its gradient together
+
+    Args:
+        f (function): function written with NumPy operations
+        mode (str, optional): 'forward' (dual numbers, for scalar and
+        low-dimensional parameters) or 'reverse' (tape)
+
+    Returns:
+        (function): function of x returning (f(x), df(x))
+    """
+    if mode not in _MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected 'forward' or "
+                         "'reverse'")
+    differentiate = _MODES[mode]
+
+    def f_and_df(x):
+        x = np.asarray(x)
+        if not np.issubdtype(x.dtype, np.floating):
+            x = x.astype(float)
+        y, gradient = differentiate(f, x)
+        # Scalars come back as NumPy scalars rather than 0-d arrays
+        return np.asarray(y)[()], gradient[()]
+
+    return f_and_df
+
+
+def grad(f, mode='reverse'):
+    """Builds the gradient of f
+
+    Args:
+        f (function): function written with NumPy operations
+        mode (str, optional): 'forward' (dual numbers, for scalar and
+        low-dimensional parameters) or 'reverse' (tape)
+
+    Returns:
+        (function): df, function of x returning the gradient of f at x
+    """
+    f_and_df = value_and_grad(f, mode)
+
+    def df(x):
+        return f_and_df(x)[1]
+
+    return df
@@ -0,0 +1,265 @@
+"""Command-line entry point running one optimizer from many starting points.
+
+The objective is loaded from a module path, the starting points from a .npy
+or CSV file: a 1-D array holds scalar starts, each row of a 2-D array is a
+vector start. The results are gathered and written at once to a .npy
+structured array or a CSV file.
+
+Usage:
+    gradient-descent package.module:f starts.npy -o results.csv
+        [--gradient package.module:df] [--optimizer Adam]
+        [--learning-rate 0.01] [--tolerance 1e-6] [--max-iterations 1000]
+        [-p beta_1=0.8] [--workers 4] [--trajectory-dir traces]
+
+Without --gradient, df is built from f by automatic differentiation. The
+objective is loaded again in every worker process, so it must be defined
+in an importable module; the current directory is importable, as with
+python -m.
+"""
+import argparse
+import ast
+import csv
+import functools
+import importlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .GradientDescent import GradientDescent
+from .Momentum import Momentum
+from .NAG import NAG
+from .RMSprop import RMSprop
+from .Adam import Adam
+from .LBFGS import LBFGS
+from .Trajectory import TrajectoryWriter
+from .autodiff import grad
+from .sweep import _run, results_table
+
+OPTIMIZERS = {optimizer_class.__name__: optimizer_class
+              for optimizer_class in (GradientDescent, Momentum, NAG,
+                                      RMSprop, Adam, LBFGS)}
+
+
+def load_function(path):
+    """Imports a function from its module path
+
+    Args:
+        path (str): 'package.module:function' or 'package.module.function'
+
+    Returns:
+        (function): imported function
+    """
+    module, separator, name = path.rpartition(':')
+    if not separator:
+        module, _, name = path.rpartition('.')
+    if not module or not name:
+        raise ValueError(f'Invalid function path {path!r}, expected '
+                         "'module:function'")
+    function = importlib.import_module(module)
+    for attribute in name.split('.'):
+        function = getattr(function, attribute)
+    return function
+
+
+@functools.lru_cache(maxsize=None)
+def _objective(objective, gradient):
+    """Loads f and df once per process
+
+    Args:
+        objective (str): module path of f
+        gradient (str): module path of df, None to differentiate f
+
+    Returns:
+        (tuple): f and df
+    """
+    f = load_function(objective)
+    df = grad(f) if gradient is None else load_function(gradient)
+    return f, df
+
+
+def _run_start(objective, gradient, optimizer_class, parameters, options,
+               trajectory_dir, start):
+    """Runs the optimization of one starting point. Executed in the worker
+    processes
+
+    Args:
+        objective (str): module path of f
+        gradient (str): module path of df, None to differentiate f
+        optimizer_class (class): optimizer to run
+        parameters (dict): hyperparameters
+        options (dict): other constructor arguments
+        trajectory_dir (str): directory of the traces, None for no trace
+        start (tuple): index and value of the starting point
+
+    Returns:
+        (dict): result of the optimization, see sweep.iter_sweep
+    """
+    i, x_t = start
+    f, df = _objective(objective, gradient)
+    path = ''
+    if trajectory_dir is not None:
+        path = os.path.join(trajectory_dir, f'{i}.npy')
+        options = {**options, 'callbacks': [TrajectoryWriter(path)]}
+    result = _run(optimizer_class, f, df, x_t, parameters, options)
+    result['start'] = i
+    result['trajectory'] = path
+    return result
+
+
+def load_starts(path):
+    """Reads the starting points
+
+    Args:
+        path (str): .npy file, or CSV file with one start per line
+
+    Returns:
+        (np.array): 1-D array of scalar starts, or 2-D array of vector
+        starts
+    """
+    if path.endswith('.npy'):
+        starts = np.load(path)
+    else:
+        starts = np.loadtxt(path, delimiter=',', ndmin=2)
+        if starts.shape[1] == 1:
+            starts = starts[:, 0]
+    if starts.ndim not in (1, 2):
+        raise ValueError(f'{path} holds a {starts.ndim}-D array, expected '
+                         'scalar starts (1-D) or vector starts (2-D)')
+    return starts
+
+
+def write_results(path, table):
+    """Writes the results table
+
+    Args:
+        path (str): .npy file, or CSV file with one column per element of x
+        table (np.array): results table, see sweep.results_table
+
+    Returns:
+        None
+    """
+    if path.endswith('.npy'):
+        np.save(path, table)
+        return
+    header, columns = [], []
+    for name in table.dtype.names:
+        column = table[name]
+        if column.ndim == 1:
+            header.append(name)
+            columns.append(column.tolist())
+        else:
+            column = column.reshape(len(table), -1)
+            header += [f'{name}_{j}' for j in range(column.shape[1])]
+            columns += column.T.tolist()
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(zip(*columns))
+
+
+def _parameter(text):
+    """Parses a NAME=VALUE hyperparameter"""
+    name, separator, value = text.partition('=')
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f'{text!r} is not NAME=VALUE')
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        raise argparse.ArgumentTypeError(f'{value!r} is not a number')
+    if not isinstance(value, (int, float)):
+        raise argparse.ArgumentTypeError(f'{value!r} is not a number')
+    return name, value
+
+
+def parse_args(argv=None):
+    """Parses the command line
+
+    Args:
+        argv (list, optional): arguments. Defaults to sys.argv[1:]
+
+    Returns:
+        (argparse.Namespace): parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog='gradient-descent',
+        description='Minimizes a function from every starting point of a '
+        'file and writes the results.')
+    parser.add_argument('objective',
+                        help="module path of f, e.g. 'package.module:f'")
+    parser.add_argument('starts',
+                        help='.npy or CSV file of starting points, one per '
+                        'row')
+    parser.add_argument('-o', '--output', required=True,
+                        help='results file, .npy or CSV')
+    parser.add_argument('--gradient',
+                        help='module path of df. Defaults to the automatic '
+                        'differentiation of f')
+    parser.add_argument('--optimizer', choices=sorted(OPTIMIZERS),
+                        default='GradientDescent')
+    parser.add_argument('--learning-rate', type=float,
+                        help="defaults to the optimizer's")
+    parser.add_argument('--tolerance', type=float, default=1e-6)
+    parser.add_argument('--max-iterations', type=int, default=1000)
+    parser.add_argument('-p', '--param', type=_parameter, action='append',
+                        default=[], metavar='NAME=VALUE',
+                        help='other hyperparameter of the optimizer, e.g. '
+                        'beta_1=0.8. Can be repeated')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of processes. Defaults to 1, which '
+                        'runs in the current process')
+    parser.add_argument('--trajectory-dir',
+                        help='directory receiving the full trace of every '
+                        'start, as <start>.npy')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Runs the command line
+
+    Args:
+        argv (list, optional): arguments. Defaults to sys.argv[1:]
+
+    Returns:
+        (int): exit status
+    """
+    args = parse_args(argv)
+    # Like python -m, so that the objective can live next to the job
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    # Fails before starting the workers when the objective can't be loaded
+    _objective(args.objective, args.gradient)
+    starts = load_starts(args.starts)
+    if args.trajectory_dir is not None:
+        os.makedirs(args.trajectory_dir, exist_ok=True)
+
+    parameters = dict(args.param)
+    if args.learning_rate is not None:
+        parameters['learning_rate'] = args.learning_rate
+    options = {'tolerance': args.tolerance,
+               'max_iterations': args.max_iterations,
+               # The history isn't written, so don't record it
+               'n_history_points': 0}
+    run = functools.partial(_run_start, args.objective, args.gradient,
+                            OPTIMIZERS[args.optimizer], parameters, options,
+                            args.trajectory_dir)
+    starts = list(enumerate(starts))
+    if args.workers > 1:
+        # Chunks amortize the transfers when the runs are short
+        chunksize = max(1, len(starts)//(4*args.workers))
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(run, starts, chunksize=chunksize))
+    else:
+        results = [run(start) for start in starts]
+
+    table = results_table(results)
+    write_results(args.output, table)
+    n_diverged = int(table['diverged'].sum())
+    print(f'{len(table)} optimizations, {n_diverged} diverged, results '
+          f'written to {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
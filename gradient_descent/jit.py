@@ -0,0 +1,182 @@
+"""Compiled fit loops for scalar parameters, built with Numba when it is
+installed. The whole optimization runs as machine code, with the update of
+each optimizer inlined in its loop, so neither the loop nor the calls to df
+go through the interpreter. This module is only imported by fit() when the
+'numba' backend is selected.
+"""
+import warnings
+import weakref
+
+import numpy as np
+
+from .GradientDescent import GradientDescent
+from .Momentum import Momentum
+from .NAG import NAG
+from .RMSprop import RMSprop
+from .Adam import Adam
+
+try:
+    import numba
+    from numba.core.errors import NumbaError
+    from numba.core.registry import CPUDispatcher
+except ImportError:
+    numba = None
+
+
+def _gradient_descent_loop(df, x_t, tolerance, max_iterations,
+                           learning_rate):
+    n_iterations = 0
+    while True:
+        n_iterations += 1
+        g_t = df(x_t)
+        update = learning_rate*g_t
+        x_t = x_t - update
+        if not (abs(update) > tolerance and n_iterations < max_iterations):
+            return x_t, n_iterations, g_t
+
+
+def _momentum_loop(df, x_t, tolerance, max_iterations, learning_rate,
+                   beta_1, v_t):
+    n_iterations = 0
+    while True:
+        n_iterations += 1
+        g_t = df(x_t)
+        v_t *= beta_1
+        v_t += (1 - beta_1)*g_t
+        update = learning_rate*v_t
+        x_t = x_t - update
+        if not (abs(update) > tolerance and n_iterations < max_iterations):
+            return x_t, n_iterations, g_t, v_t
+
+
+def _nag_loop(df, x_t, tolerance, max_iterations, learning_rate, gamma,
+              u_t):
+    n_iterations = 0
+    while True:
+        n_iterations += 1
+        g_t = df(x_t - gamma*u_t)
+        u_t *= gamma
+        u_t += learning_rate*g_t
+        update = u_t
+        x_t = x_t - update
+        if not (abs(update) > tolerance and n_iterations < max_iterations):
+            return x_t, n_iterations, g_t, u_t
+
+
+def _rmsprop_loop(df, x_t, tolerance, max_iterations, learning_rate,
+                  beta_2, s_t):
+    epsilon = 1e-8
+    n_iterations = 0
+    while True:
+        n_iterations += 1
+        g_t = df(x_t)
+        s_t *= beta_2
+        s_t += (1 - beta_2)*g_t**2
+        update = learning_rate*g_t/(np.sqrt(s_t) + epsilon)
+        x_t = x_t - update
+        if not (abs(update) > tolerance and n_iterations < max_iterations):
+            return x_t, n_iterations, g_t, s_t
+
+
+def _adam_loop(df, x_t, tolerance, max_iterations, learning_rate, beta_1,
+               beta_2, m_t, v_t):
+    epsilon = 1e-8
+    n_iterations = 0
+    while True:
+        n_iterations += 1
+        g_t = df(x_t)
+        m_t *= beta_1
+        m_t += (1 - beta_1)*g_t
+        v_t *= beta_2
+        v_t += (1 - beta_2)*g_t**2
+        m_hat_t = m_t/(1 - beta_1**n_iterations)
+        v_hat_t = v_t/(1 - beta_2**n_iterations)
+        update = learning_rate*m_hat_t/(np.sqrt(v_hat_t) + epsilon)
+        x_t = x_t - update
+        if not (abs(update) > tolerance and n_iterations < max_iterations):
+            return x_t, n_iterations, g_t, m_t, v_t
+
+
+# Loop, hyperparameters and state of each optimizer. Subclasses of the
+# optimizers may change the update, so only the exact classes are compiled
+LOOPS = {
+    GradientDescent: (_gradient_descent_loop, ('learning_rate',), ()),
+    Momentum: (_momentum_loop, ('learning_rate', 'beta_1'), ('v_t',)),
+    NAG: (_nag_loop, ('learning_rate', 'gamma'), ('u_t',)),
+    RMSprop: (_rmsprop_loop, ('learning_rate', 'beta_2'), ('s_t',)),
+    Adam: (_adam_loop, ('learning_rate', 'beta_1', 'beta_2'),
+           ('m_t', 'v_t')),
+}
+
+_compiled_loops = {}
+_compiled_functions = weakref.WeakKeyDictionary()
+
+
+def _compile(function):
+    """Compiles a Python function, reusing earlier compilations
+
+    Args:
+        function (function): function to compile
+
+    Returns:
+        (CPUDispatcher): compiled function
+    """
+    if isinstance(function, CPUDispatcher):
+        return function
+    try:
+        return _compiled_functions[function]
+    except (KeyError, TypeError):
+        compiled = numba.njit(function)
+    try:
+        _compiled_functions[function] = compiled
+    except TypeError:
+        pass  # not weak-referenceable, compiled again next time
+    return compiled
+
+
+def fit_compiled(optimizer):
+    """Runs the fit loop of a scalar optimization as compiled code
+
+    Args:
+        optimizer (GradientDescent): optimizer with a scalar x_t
+
+    Returns:
+        (float): local minimum measured by the algorithm, or None when Numba
+        isn't installed, the optimizer has no compiled loop or df can't be
+        compiled. The caller then runs the Python loop
+    """
+    if numba is None or type(optimizer) not in LOOPS:
+        return None
+
+    loop, hyperparameters, state_names = LOOPS[type(optimizer)]
+    if loop not in _compiled_loops:
+        _compiled_loops[loop] = numba.njit(loop)
+
+    state = optimizer._get_state()
+    arguments = [float(getattr(optimizer, name)) for name in hyperparameters]
+    arguments += [float(state[name]) for name in state_names]
+
+    x_t = float(optimizer.x_t)
+    try:
+        x_t, n_iterations, g_t, *state_values = _compiled_loops[loop](
+            _compile(optimizer.df), x_t, optimizer.tolerance,
+            optimizer.max_iterations, *arguments)
+    except NumbaError as err:
+        warnings.warn('df could not be compiled, falling back to the '
+                      f'Python loop: {str(err).splitlines()[0]}')
+        return None
+
+    optimizer.n_iterations = n_iterations
+    optimizer.n_gradient_evaluations = n_iterations
+    optimizer._set_state(dict(zip(state_names, state_values)))
+
+    # Only the starting point and the minimum are recorded
+    history = optimizer.history
+    if history.capacity:
+        x_0 = optimizer.x_t
+        history.record(0, x_0, optimizer._objective(x_0), np.nan)
+        history.record(n_iterations, x_t, optimizer._objective(x_t),
+                       abs(g_t))
+    optimizer._g_t = g_t
+
+    return x_t
@@ -0,0 +1,53 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+from .ExceptionHandler import ConvergencePointsValueError
+
+
+def plot_optimization(optimizer, x1=None, x2=None, n_points=100):
+    """Plotting function between interval (x1,x2). This module is imported on
+    demand by GradientDescent.plot_optimization, so that importing the
+    package doesn't load matplotlib
+
+    Args:
+        optimizer (GradientDescent): optimizer whose convergence points are
+        plotted
+        x1 (float, optional): start of interval
+        x2 (float, optional): end of interval
+        n_points (int, optional): number of point to be plotted
+        between x1 and x2
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: when the history doesn't store the points, as for array
+        parameters unless the optimizer is built with history_x=True
+    """
+    if optimizer.convergence_points is None:
+        raise ValueError('The history does not store the points to plot: '
+                         'build the optimizer with history_x=True')
+
+    try:
+        if not len(optimizer.convergence_points):
+            raise ConvergencePointsValueError('Empty x-axis. \
+                No Convergence Points')
+
+        x1 = x1 or min(optimizer.convergence_points)
+        x2 = x2 or max(optimizer.convergence_points)
+
+        x_axis = np.linspace(x1, x2, n_points)
+        y_x = optimizer._objective(x_axis)
+
+        plt.plot(x_axis, y_x, color='blue')
+        plt.ylabel('$f(x)$')
+        plt.xlabel('$x$')
+        plt.title(f'{optimizer.name}')
+
+        # Plot points on f(x), as recorded during the optimization
+        plt.plot(optimizer.convergence_points, optimizer.history.f,
+                 'bo', color='red')
+        plt.show()
+
+    except ConvergencePointsValueError as err:
+        print('Please, run the fit() method first: ', err)
@@ -0,0 +1,244 @@
+"""Sharded updates of large parameter vectors, used by the optimizers built
+with shards=n.
+
+The point, the gradient and the state arrays of the optimizer (e.g. m_t and
+v_t for Adam) live in multiprocessing.shared_memory blocks. The flattened
+arrays are split into n contiguous shards, and one worker process per shard
+applies the update rule of the optimizer to its shard, in place. At each
+step the main process evaluates df, copies the gradient to shared memory
+and sends the iteration index to the workers, which send back the squared
+norm of the update of their shard: the norm of the whole update, tested for
+convergence, is the only value reduced centrally.
+
+The blocks and the workers are created at the first sharded step and reused
+by the following runs of the optimizer, until its close() method is called
+or it is garbage collected.
+"""
+import copy
+import multiprocessing
+import weakref
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+
+def _shard_optimizer(optimizer):
+    """Copies the hyperparameters of an optimizer, without its functions,
+    history or arrays, to send it to the workers
+
+    Args:
+        optimizer (GradientDescent): sharded optimizer
+
+    Returns:
+        (GradientDescent): copy holding only the scalar attributes
+    """
+    shard = copy.copy(optimizer)
+    for name, value in vars(shard).items():
+        if not isinstance(value, (bool, int, float, str, np.number)):
+            setattr(shard, name, None)
+    return shard
+
+
+def _update_shard(connection, optimizer, arrays, start, stop):
+    """Applies the updates of a shard until the main process stops sending
+    iterations
+
+    Args:
+        connection (Connection): pipe to the main process
+        optimizer (GradientDescent): copy of the hyperparameters
+        arrays (dict): shared arrays by name: x, g and the state
+        start (int): first index of the shard, in the flattened arrays
+        stop (int): last index of the shard, excluded
+
+    Returns:
+        None
+    """
+    shard = {name: array.reshape(-1)[start:stop]
+             for name, array in arrays.items()}
+    x_t, g_t = shard.pop('x'), shard.pop('g')
+    optimizer._set_state(shard)
+    out = np.empty_like(x_t)
+    try:
+        while True:
+            iteration = connection.recv()
+            if iteration is None:
+                return
+            try:
+                optimizer.n_iterations = iteration
+                update = optimizer._compute_update(g_t, out)
+                x_t -= update
+                connection.send(float(np.dot(update, update)))
+            except Exception as err:
+                connection.send(err)
+    finally:
+        # Releases the views, so that the blocks can be closed
+        optimizer._set_state({name: 0 for name in shard})
+
+
+def _serve(connection, optimizer, names, shape, dtype, start, stop):
+    """Entry point of the worker processes
+
+    Args:
+        connection (Connection): pipe to the main process
+        optimizer (GradientDescent): copy of the hyperparameters
+        names (dict): names of the shared memory blocks, by array name
+        shape (tuple): shape of the arrays
+        dtype (np.dtype): type of the arrays
+        start (int): first index of the shard, in the flattened arrays
+        stop (int): last index of the shard, excluded
+
+    Returns:
+        None
+    """
+    blocks = {name: SharedMemory(name=block)
+              for name, block in names.items()}
+    try:
+        _update_shard(connection, optimizer,
+                      {name: np.ndarray(shape, dtype, buffer=block.buf)
+                       for name, block in blocks.items()}, start, stop)
+    finally:
+        for block in blocks.values():
+            block.close()
+        connection.close()
+
+
+def _shutdown(connections, processes, blocks):
+    """Stops the workers and frees the shared memory"""
+    for connection in connections:
+        try:
+            connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        connection.close()
+    for process in processes:
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            # Views of the block are still referenced: the memory is
+            # released when they are
+            pass
+        block.unlink()
+
+
+class ShardPool():
+    """Shared memory blocks and worker processes of a sharded optimizer
+
+    Attributes:
+        x (np.array): shared point, updated in place by the workers
+        g (np.array): shared gradient
+        state (dict): shared state arrays of the optimizer, by name
+        n_shards (int): number of worker processes
+    """
+
+    def __init__(self, optimizer, x_t, n_shards):
+        """Constructor
+
+        Args:
+            optimizer (GradientDescent): sharded optimizer, with its state
+            arrays allocated
+            x_t (np.array): current point
+            n_shards (int): number of shards, at most x_t.size
+
+        Returns:
+            None
+        """
+        names = ['x', 'g'] + list(optimizer._get_state())
+        blocks = {name: SharedMemory(create=True, size=max(1, x_t.nbytes))
+                  for name in names}
+        arrays = {name: np.ndarray(x_t.shape, x_t.dtype, buffer=block.buf)
+                  for name, block in blocks.items()}
+        self.x = arrays.pop('x')
+        self.g = arrays.pop('g')
+        self.state = arrays
+        self.n_shards = max(1, min(int(n_shards), x_t.size))
+
+        context = multiprocessing.get_context()
+        shard = _shard_optimizer(optimizer)
+        bounds = np.linspace(0, x_t.size, self.n_shards + 1).astype(int)
+        self.__connections = []
+        processes = []
+        self.__finalizer = weakref.finalize(
+            self, _shutdown, self.__connections, processes,
+            list(blocks.values()))
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            connection, child = context.Pipe()
+            process = context.Process(
+                target=_serve, daemon=True,
+                args=(child, shard, {name: block.name
+                                     for name, block in blocks.items()},
+                      x_t.shape, x_t.dtype, start, stop))
+            process.start()
+            child.close()
+            self.__connections.append(connection)
+            processes.append(process)
+
+    def attach(self, optimizer, x_t):
+        """Moves the point and the state of the optimizer to shared memory,
+        when they were replaced, e.g. by a new run or a checkpoint
+
+        Args:
+            optimizer (GradientDescent): sharded optimizer
+            x_t (np.array): current point
+
+        Returns:
+            (np.array): shared point
+        """
+        state = optimizer._get_state()
+        if any(value is not self.state[name]
+               for name, value in state.items()):
+            for name, value in state.items():
+                if value is not self.state[name]:
+                    np.copyto(self.state[name], value)
+            optimizer._set_state(self.state)
+        if x_t is not self.x:
+            np.copyto(self.x, x_t)
+        return self.x
+
+    def step(self, g_t, iteration):
+        """Updates every shard
+
+        Args:
+            g_t (np.array): gradient of the step
+            iteration (int): iteration index of the step
+
+        Returns:
+            (float): euclidean norm of the update
+        """
+        if g_t is not self.g:
+            np.copyto(self.g, g_t)
+        for connection in self.__connections:
+            connection.send(iteration)
+        squared_norm = 0.0
+        error = None
+        # Every shard answers before an error is raised, so that the pipes
+        # stay in step
+        for connection in self.__connections:
+            result = connection.recv()
+            if isinstance(result, Exception):
+                error = result
+            else:
+                squared_norm += result
+        if error is not None:
+            raise error
+        return np.sqrt(squared_norm)
+
+    def close(self, optimizer):
+        """Copies the state of the optimizer back to private memory, stops
+        the workers and frees the shared memory
+
+        Args:
+            optimizer (GradientDescent): sharded optimizer
+
+        Returns:
+            None
+        """
+        optimizer._set_state({
+            name: value.copy() if value is self.state.get(name) else value
+            for name, value in optimizer._get_state().items()})
+        self.x = self.g = None
+        self.state = {}
+        self.__finalizer()
@@ -0,0 +1,302 @@
+"""Hyperparameter sweeps running many optimizations on a process pool.
+
+A search space maps optimizer classes to the values of their
+hyperparameters, e.g.::
+
+    space = {Adam: {'learning_rate': [1e-3, 1e-2], 'beta_1': [0.8, 0.9]},
+             Momentum: {'learning_rate': (1e-4, 1e-1)}}
+
+Grid search tries every combination of the listed values. Random search
+draws n_samples configurations per optimizer: lists are sampled uniformly,
+(low, high) tuples uniformly in the interval and callables are called with
+a np.random.Generator.
+
+compare runs several optimizers from the same set of starting points, in
+worker processes or threads, and gathers the results in the same kind of
+table.
+
+f and df are sent to the worker processes, so they must be picklable,
+i.e. defined at module level. Worker threads don't have this constraint,
+and run in parallel when df releases the GIL, as large NumPy operations do.
+"""
+import itertools
+import os
+import time
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed)
+
+import numpy as np
+
+from .GradientDescent import GradientDescent
+from .Momentum import Momentum
+from .NAG import NAG
+from .RMSprop import RMSprop
+from .Adam import Adam
+from .Trajectory import TrajectoryWriter
+
+OPTIMIZERS = [GradientDescent, Momentum, NAG, RMSprop, Adam]
+
+
+def grid_search(space):
+    """Lists every combination of the values of a search space
+
+    Args:
+        space (dict): lists of hyperparameter values by name, by optimizer
+        class
+
+    Returns:
+        (list): (optimizer class, hyperparameters) configurations
+    """
+    configurations = []
+    for optimizer_class, parameters in space.items():
+        names = list(parameters)
+        for values in itertools.product(*(parameters[name]
+                                          for name in names)):
+            configurations.append((optimizer_class, dict(zip(names, values))))
+    return configurations
+
+
+def random_search(space, n_samples, seed=None):
+    """Draws random configurations from a search space
+
+    Args:
+        space (dict): hyperparameter distributions by name, by optimizer
+        class. Lists are sampled uniformly, (low, high) tuples uniformly in
+        the interval and callables are called with a np.random.Generator
+        n_samples (int): number of configurations per optimizer class
+        seed (int, optional): seed of the random generator
+
+    Returns:
+        (list): (optimizer class, hyperparameters) configurations
+    """
+    rng = np.random.default_rng(seed)
+
+    def sample(distribution):
+        if callable(distribution):
+            return distribution(rng)
+        if isinstance(distribution, tuple):
+            return rng.uniform(*distribution)
+        return distribution[rng.integers(len(distribution))]
+
+    return [(optimizer_class, {name: sample(distribution)
+                               for name, distribution in parameters.items()})
+            for optimizer_class, parameters in space.items()
+            for _ in range(n_samples)]
+
+
+def _run(optimizer_class, f, df, x_t, parameters, options):
+    """Runs one optimization. Executed in the worker processes
+
+    Args:
+        optimizer_class (class): optimizer to run
+        f (function): function for optimization
+        df (function): first derivation of the function
+        x_t (float): starting point
+        parameters (dict): hyperparameters of the configuration
+        options (dict): constructor arguments shared by every configuration
+
+    Returns:
+        (dict): result of the optimization
+    """
+    optimizer = optimizer_class(f, df, x_t, **{**options, **parameters})
+    start = time.perf_counter()
+    x = optimizer.fit()
+    wall_time = time.perf_counter() - start
+
+    # fit returns the exception when the function overflows
+    diverged = isinstance(x, Exception)
+    if diverged:
+        x, f_x = np.full(np.shape(x_t), np.nan), np.nan
+    else:
+        with np.errstate(all='ignore'):
+            f_x = f(x)
+        diverged = not (np.all(np.isfinite(x)) and np.isfinite(f_x))
+
+    return {'optimizer': optimizer_class.__name__,
+            'parameters': parameters,
+            'x': x,
+            'f': f_x,
+            'n_iterations': optimizer.n_iterations,
+            'time': wall_time,
+            'diverged': diverged}
+
+
+def iter_sweep(f, df, x_t, configurations, max_workers=None, **options):
+    """Runs the configurations on a process pool, yielding each result as
+    soon as it is available
+
+    Args:
+        f (function): function for optimization
+        df (function): first derivation of the function
+        x_t (float): starting point of every optimization
+        configurations (list): (optimizer class, hyperparameters) pairs, as
+        given by grid_search or random_search
+        max_workers (int, optional): number of processes. Defaults to the
+        number of processors
+        **options: constructor arguments shared by every configuration,
+        e.g. max_iterations or tolerance
+
+    Returns:
+        (generator): results as dicts with the keys optimizer, parameters,
+        x, f, n_iterations, time and diverged, in completion order
+    """
+    # The history isn't sent back, so don't record it by default
+    options.setdefault('n_history_points', 0)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_run, optimizer_class, f, df, x_t,
+                                   parameters, options)
+                   for optimizer_class, parameters in configurations]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Stops the pending runs if the caller stops iterating early
+            for future in futures:
+                future.cancel()
+
+
+def _text_dtype(values):
+    """Unicode dtype wide enough for the longest of the strings
+
+    Args:
+        values (iterable): strings stored in a field
+
+    Returns:
+        (str): dtype of the field
+    """
+    return f'U{max([1] + [len(value) for value in values])}'
+
+
+def results_table(results):
+    """Gathers sweep results in a structured array, with one float column
+    per hyperparameter (NaN for the optimizers that don't use it)
+
+    Args:
+        results (list): results yielded by iter_sweep
+
+    Returns:
+        (np.array): structured array with the fields optimizer, the
+        hyperparameters, x, f, n_iterations, time and diverged, followed by
+        start and trajectory for the results of compare
+    """
+    results = list(results)
+    names = sorted({name for result in results
+                    for name in result['parameters']})
+    x_shape = np.shape(results[0]['x']) if results else ()
+    optimizers = _text_dtype(result['optimizer'] for result in results)
+    dtype = [('optimizer', optimizers)] + \
+        [(name, float) for name in names] + \
+        [('x', float, x_shape), ('f', float), ('n_iterations', int),
+         ('time', float), ('diverged', bool)]
+    fields = ['x', 'f', 'n_iterations', 'time', 'diverged']
+    if results and 'start' in results[0]:
+        dtype += [('start', int),
+                  ('trajectory', _text_dtype(result['trajectory']
+                                             for result in results))]
+        fields += ['start', 'trajectory']
+
+    table = np.zeros(len(results), dtype=dtype)
+    for row, result in zip(table, results):
+        row['optimizer'] = result['optimizer']
+        for name in names:
+            row[name] = result['parameters'].get(name, np.nan)
+        for field in fields:
+            row[field] = result[field]
+    return table
+
+
+def sweep(f, df, x_t, space, search='grid', n_samples=10, seed=None,
+          max_workers=None, **options):
+    """Runs a grid or random hyperparameter search on a process pool
+
+    Args:
+        f (function): function for optimization
+        df (function): first derivation of the function
+        x_t (float): starting point of every optimization
+        space (dict): search space, see the module documentation
+        search (str, optional): 'grid' or 'random'
+        n_samples (int, optional): configurations per optimizer class for
+        random search
+        seed (int, optional): seed of the random search
+        max_workers (int, optional): number of processes
+        **options: constructor arguments shared by every configuration
+
+    Returns:
+        (np.array): results table, see results_table
+    """
+    if search == 'grid':
+        configurations = grid_search(space)
+    elif search == 'random':
+        configurations = random_search(space, n_samples, seed)
+    else:
+        raise ValueError(f"Unknown search {search!r}, expected 'grid' or "
+                         "'random'")
+    return results_table(iter_sweep(f, df, x_t, configurations, max_workers,
+                                    **options))
+
+
+def compare(f, df, starts, optimizers=None, parameters=None,
+            executor='process', max_workers=None, trajectory_dir=None,
+            **options):
+    """Runs several optimizers from each starting point of a set, in
+    parallel, to compare them on the same objective
+
+    Args:
+        f (function): function for optimization
+        df (function): first derivation of the function
+        starts (list): starting points, e.g. [-1.0, 2.0] for scalar
+        parameters or a list of arrays for vector parameters
+        optimizers (list, optional): optimizer classes. Defaults to
+        GradientDescent, Momentum, NAG, RMSprop and Adam
+        parameters (dict, optional): hyperparameters by optimizer class,
+        e.g. {Adam: {'learning_rate': 0.1}}
+        executor (str, optional): 'process' or 'thread'
+        max_workers (int, optional): number of workers. Defaults to the
+        number of processors
+        trajectory_dir (str, optional): directory receiving the full trace
+        of every run, written by TrajectoryWriter as
+        <optimizer>_<start>.npy
+        **options: constructor arguments shared by every run, e.g.
+        max_iterations or tolerance
+
+    Returns:
+        (np.array): results table, see results_table, with one row per
+        optimizer and starting point, in the order of optimizers then
+        starts. start is the index of the starting point and trajectory
+        the path of the trace, to open with Trajectory, or ''
+    """
+    if executor == 'process':
+        pool = ProcessPoolExecutor
+    elif executor == 'thread':
+        pool = ThreadPoolExecutor
+    else:
+        raise ValueError(f"Unknown executor {executor!r}, expected "
+                         "'process' or 'thread'")
+    optimizers = optimizers or OPTIMIZERS
+    parameters = parameters or {}
+    options.setdefault('n_history_points', 0)
+
+    runs = []
+    with pool(max_workers=max_workers) as workers:
+        for optimizer_class in optimizers:
+            for i, x_t in enumerate(starts):
+                run_options = options
+                path = ''
+                if trajectory_dir is not None:
+                    path = os.path.join(trajectory_dir,
+                                        f'{optimizer_class.__name__}_{i}.npy')
+                    run_options = {**options, 'callbacks': [
+                        *options.get('callbacks', ()),
+                        TrajectoryWriter(path)]}
+                future = workers.submit(_run, optimizer_class, f, df, x_t,
+                                        parameters.get(optimizer_class, {}),
+                                        run_options)
+                runs.append((future, i, path))
+
+        results = []
+        for future, i, path in runs:
+            result = future.result()
+            result['start'] = i
+            result['trajectory'] = path
+            results.append(result)
+    return results_table(results)
@@ -14,7 +14,10 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/DanielDaCosta/optimization-algorithms",
     packages=setuptools.find_packages(),
-    python_requires='>=3.6',
+    python_requires='>=3.8',
+    entry_points={
+        'console_scripts': ['gradient-descent=gradient_descent.cli:main'],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
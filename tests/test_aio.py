@@ -0,0 +1,227 @@
+import asyncio
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from gradient_descent import (GradientDescent, Momentum, NAG, RMSprop, Adam,
+                              LBFGS, Checkpoint, ArmijoBacktracking,
+                              WolfeLineSearch, RelativeChange, GradientNorm)
+from tests.test_callback import Recorder
+
+OPTIMIZERS = [GradientDescent, Momentum, NAG, RMSprop, Adam]
+
+
+def f(x):
+    return np.sum(x**4 - 3*x**2 + x)
+
+
+def df(x):
+    return 4*x**3 - 6*x + 1
+
+
+async def async_df(x):
+    await asyncio.sleep(0)
+    return df(x)
+
+
+async def async_fg(x):
+    await asyncio.sleep(0)
+    return f(x), df(x)
+
+
+class TestAsync(unittest.TestCase):
+
+    def test_coroutine_gradient(self):
+        """Test that fit_async with a coroutine df or fg gives the results
+        of fit, for scalar, vector and batch parameters
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for x_0, batch in ((1.5, False), (np.linspace(-2, 2, 5), False),
+                           (np.linspace(-2, 2, 5), True)):
+            for optimizer_class in OPTIMIZERS:
+                f_t = f if not batch else (lambda x: x**4 - 3*x**2 + x)
+                reference = optimizer_class(f_t, df, x_0, learning_rate=0.01,
+                                            batch=batch)
+                expected = reference.fit()
+                name = optimizer_class.__name__
+
+                optimizer = optimizer_class(f_t, async_df, x_0,
+                                            learning_rate=0.01, batch=batch)
+                minimum = asyncio.run(optimizer.fit_async())
+                np.testing.assert_array_equal(minimum, expected, name)
+                self.assertEqual(optimizer.n_iterations,
+                                 reference.n_iterations)
+                np.testing.assert_array_equal(optimizer.history.f,
+                                              reference.history.f)
+                self.assertIs(optimizer.df, async_df, 'df was not restored')
+
+                if batch:
+                    continue
+                optimizer = optimizer_class(None, None, x_0,
+                                            learning_rate=0.01, fg=async_fg)
+                minimum = asyncio.run(optimizer.fit_async())
+                np.testing.assert_array_equal(minimum, expected, name)
+
+    def test_synchronous_gradient(self):
+        """Test that synchronous optimizations share the event loop
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        async def run():
+            optimizers = [Adam(f, df, x, learning_rate=0.01, tolerance=0,
+                               max_iterations=300) for x in (-1.0, 1.0)]
+            order = []
+
+            async def fit(i):
+                await optimizers[i].fit_async(yield_every=100)
+                order.append(i)
+
+            # Both runs progress together, switching every 100 iterations
+            ticks = []
+
+            async def ticker():
+                while len(order) < 2:
+                    ticks.append([o.n_iterations for o in optimizers])
+                    await asyncio.sleep(0)
+
+            await asyncio.gather(fit(0), fit(1), ticker())
+            return ticks
+
+        ticks = asyncio.run(run())
+        self.assertIn([100, 100], ticks)
+        self.assertIn([200, 200], ticks)
+
+    def test_line_search(self):
+        """Test that Armijo line searches work with coroutine gradients,
+        which can't be evaluated by Wolfe line searches
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        optimizer = LBFGS(f, async_df, np.linspace(-2, 2, 5),
+                          step_size=ArmijoBacktracking())
+        minimum = asyncio.run(optimizer.fit_async())
+        np.testing.assert_allclose(df(minimum), 0, atol=1e-5)
+        optimizer.step_size = WolfeLineSearch()
+        with self.assertRaises(ValueError):
+            asyncio.run(optimizer.fit_async())
+
+    def test_fused_without_f(self):
+        """Test that a coroutine fg without f is refused by the step sizes
+        and criteria evaluating f, and accepted by the others
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        x_0 = np.linspace(-2, 2, 5)
+        for options in ({'step_size': ArmijoBacktracking()},
+                        {'stopping': RelativeChange(0.05)},
+                        {'stopping': GradientNorm(1e-3) |
+                         RelativeChange(0.05)}):
+            optimizer = GradientDescent(None, None, x_0, fg=async_fg,
+                                        learning_rate=0.01, **options)
+            with self.assertRaises(ValueError):
+                asyncio.run(optimizer.fit_async())
+            # f makes them available
+            optimizer.f = f
+            expected = GradientDescent(f, df, x_0, learning_rate=0.01,
+                                       **options).fit()
+            np.testing.assert_allclose(asyncio.run(optimizer.fit_async()),
+                                       expected)
+
+        optimizer = GradientDescent(None, None, x_0, fg=async_fg,
+                                    learning_rate=0.01,
+                                    stopping=GradientNorm(1e-3))
+        minimum = asyncio.run(optimizer.fit_async())
+        self.assertTrue(optimizer.stopped)
+        self.assertLessEqual(np.linalg.norm(df(minimum)), 1e-3)
+
+    def test_timeout(self):
+        """Test that a timeout cancels the optimization and checkpoints its
+        last complete step, which resume continues
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        x_0 = np.linspace(-2, 2, 5)
+        options = {'learning_rate': 1e-4, 'tolerance': 0,
+                   'max_iterations': 400}
+        expected = Adam(f, df, x_0, **options).fit()
+
+        async def slow_df(x):
+            await asyncio.sleep(1e-3)
+            return df(x)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.npz')
+            optimizer = Adam(f, slow_df, x_0, **options)
+            with self.assertRaises(asyncio.TimeoutError):
+                asyncio.run(optimizer.fit_async(
+                    timeout=0.05, checkpoint=Checkpoint(path, every=10**6)))
+            self.assertIs(optimizer.df, slow_df)
+            self.assertGreater(optimizer.n_iterations, 0)
+            self.assertLess(optimizer.n_iterations, 400)
+
+            resumed = Adam(f, df, x_0, **options)
+            np.testing.assert_array_equal(resumed.resume(path), expected)
+
+    def test_events(self):
+        """Test that fit_async notifies the events in the order of fit
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for gradient in (df, async_df):
+            recorder = Recorder()
+            optimizer = Adam(f, gradient, np.ones(3), learning_rate=0.01,
+                             callbacks=[recorder])
+            asyncio.run(optimizer.fit_async(yield_every=7))
+            n = optimizer.n_iterations
+            self.assertEqual(recorder.events,
+                             ['start'] + list(range(1, n + 1)) +
+                             ['converge', 'end'])
+
+    def test_cancellation(self):
+        """Test that a cancelled task leaves the optimizer usable
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        optimizer = GradientDescent(f, async_df, np.ones(3),
+                                    learning_rate=1e-6, tolerance=0,
+                                    max_iterations=10**9)
+
+        async def run():
+            task = asyncio.ensure_future(optimizer.fit_async())
+            await asyncio.sleep(0.02)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        self.assertIs(optimizer.df, async_df)
+        optimizer.max_iterations = 100
+        asyncio.run(optimizer.fit_async())
+        self.assertEqual(optimizer.n_iterations, 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import numpy as np
+
+from gradient_descent import GradientDescent, Adam, grad, value_and_grad
+
+A = np.array([[3., 1.], [1., 2.]])
+
+FUNCTIONS = [
+    lambda x: np.sum(x**4 - 3*x**2 + x),
+    lambda x: np.sum(np.exp(np.sin(x))*x/(1 + x**2)),
+    lambda x: 0.5*x @ A @ x - np.dot(x, [1., 2.]),
+    lambda x: np.sum(np.tanh(x[1:] - x[:-1])**2) +
+    np.mean(np.sqrt(np.abs(x) + 1)),
+    lambda x: (1 - x[0])**2 + 100*(x[1] - x[0]**2)**2,
+    lambda x: np.sum((A @ x)*x) + np.sum(np.maximum(x, 0)),
+]
+
+
+def central_differences(f, x, epsilon=1e-6):
+    return np.array([(f(x + epsilon*e) - f(x - epsilon*e))/(2*epsilon)
+                     for e in np.eye(len(x))])
+
+
+class TestAutodiff(unittest.TestCase):
+
+    def test_gradients(self):
+        """Test the gradients of both modes against finite differences
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        x = np.array([0.3, -1.2])
+        for i, f in enumerate(FUNCTIONS):
+            expected = central_differences(f, x)
+            for mode in ('forward', 'reverse'):
+                value, gradient = value_and_grad(f, mode)(x)
+                self.assertAlmostEqual(value, f(x), places=12,
+                                       msg=f'incorrect value, {mode} {i}')
+                np.testing.assert_allclose(gradient, expected, atol=1e-6,
+                                           err_msg=f'{mode} function {i}')
+
+    def test_shapes(self):
+        """Test scalar and element-wise gradients, and their types
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        x = np.array([1., 2., 3.])
+        for mode in ('forward', 'reverse'):
+            self.assertEqual(grad(lambda x: x**3, mode)(2.0), 12.0,
+                             'incorrect scalar derivative')
+            self.assertEqual(np.shape(grad(lambda x: x**3, mode)(2.0)), ())
+            np.testing.assert_array_equal(grad(lambda x: 4*x**2, mode)(x),
+                                          8*x, 'incorrect batch derivative')
+            gradient = grad(lambda x: np.sum(x**2), mode)(
+                x.astype(np.float32))
+            self.assertEqual(gradient.dtype, np.float32, 'incorrect dtype')
+            np.testing.assert_array_equal(grad(lambda x: 2.0, mode)(x),
+                                          np.zeros(3))
+
+    def test_unsupported(self):
+        """Test that operations dropping the derivative raise
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for mode in ('forward', 'reverse'):
+            with self.assertRaises(TypeError):
+                grad(lambda x: np.sum(np.arcsinh(x)), mode)(np.ones(2))
+            with self.assertRaises(TypeError):
+                grad(lambda x: float(x), mode)(1.0)
+        with self.assertRaises(ValueError):
+            grad(np.sum, 'symbolic')
+
+    def test_optimization(self):
+        """Test optimizers built with a derived df
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        def f(x):
+            return 4*np.sum(x**2)
+
+        x_0 = np.linspace(-10, 10, 50)
+        reference = Adam(f, lambda x: 8*x, x_0, learning_rate=0.1)
+        derived = Adam(f, 'reverse', x_0, learning_rate=0.1)
+        np.testing.assert_allclose(derived.fit(), reference.fit(),
+                                   atol=1e-12)
+        self.assertEqual(derived.n_iterations, reference.n_iterations)
+
+        optimizer = GradientDescent(lambda x: 4*x**2, 'forward', x_t=10,
+                                    learning_rate=0.1)
+        self.assertLessEqual(abs(optimizer.fit()), 1e-6,
+                             'Failed to converge to zero')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,216 @@
+import asyncio
+import io
+import time
+import unittest
+import warnings
+from contextlib import redirect_stdout
+import numpy as np
+
+from gradient_descent import (GradientDescent, Momentum, NAG, RMSprop, Adam,
+                              Callback, StepTimer, GradientTimer,
+                              GradientNormStats)
+
+OPTIMIZERS = [GradientDescent, Momentum, NAG, RMSprop, Adam]
+
+
+def f(x):
+    return np.sum(4*x**2)
+
+
+def df(x):
+    return 8*x
+
+
+class Recorder(Callback):
+    """Records the events it receives"""
+
+    def __init__(self):
+        self.events = []
+
+    def on_fit_start(self, optimizer, x_t):
+        self.events.append('start')
+
+    def on_step(self, optimizer, x_t, step):
+        self.events.append(optimizer.n_iterations)
+
+    def on_converge(self, optimizer, x_t):
+        self.events.append('converge')
+
+    def on_diverge(self, optimizer, x_t, error=None):
+        self.events.append('diverge')
+
+    def on_fit_end(self, optimizer, x_t):
+        self.events.append('end')
+
+
+class TestCallback(unittest.TestCase):
+
+    def test_events(self):
+        """Test that every step and the end of the optimization are
+        notified, for scalar, vector and batch parameters
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for x_0, batch in ((10.0, False), (np.ones(5), False),
+                           (np.linspace(1, 2, 4), True)):
+            for optimizer_class in OPTIMIZERS:
+                recorder = Recorder()
+                optimizer = optimizer_class(f if not batch else
+                                            (lambda x: 4*x**2), df, x_0,
+                                            learning_rate=0.01, batch=batch,
+                                            max_iterations=5000,
+                                            callbacks=[recorder])
+                optimizer.fit()
+                n = optimizer.n_iterations
+                self.assertLess(n, 5000, 'did not converge')
+                self.assertEqual(recorder.events,
+                                 ['start'] + list(range(1, n + 1)) +
+                                 ['converge', 'end'],
+                                 optimizer_class.__name__)
+
+        # Reaching max_iterations is neither a convergence nor a divergence
+        recorder = Recorder()
+        GradientDescent(f, df, 10.0, learning_rate=1e-4, max_iterations=10,
+                        callbacks=[recorder]).fit()
+        self.assertEqual(recorder.events,
+                         ['start'] + list(range(1, 11)) + ['end'])
+
+        # The end is notified when the first step raises
+        def failing_df(x):
+            raise ValueError('df failed')
+
+        recorder = Recorder()
+        with self.assertRaises(ValueError):
+            GradientDescent(f, failing_df, 10.0,
+                            callbacks=[recorder]).fit()
+        self.assertEqual(recorder.events, ['start', 'end'])
+
+    def test_diverge(self):
+        """Test that a point that isn't finite is notified as a divergence
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        recorder = Recorder()
+        optimizer = GradientDescent(f, df, np.ones(3), learning_rate=10,
+                                    max_iterations=1000, callbacks=[recorder])
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            optimizer.fit()
+        self.assertEqual(recorder.events[-2:], ['diverge', 'end'])
+        self.assertNotIn('converge', recorder.events)
+
+    def test_overflow(self):
+        """Test that an OverflowError ends fit and fit_async with a
+        divergence, returning the error without printing it
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        class Errors(Recorder):
+            def on_diverge(self, optimizer, x_t, error=None):
+                self.events.append(error)
+
+        for run in (lambda optimizer: optimizer.fit(),
+                    lambda optimizer: asyncio.run(optimizer.fit_async())):
+            recorder = Errors()
+            optimizer = GradientDescent(lambda x: x**4, lambda x: 4*x**3,
+                                        10.0, learning_rate=10,
+                                        callbacks=[recorder])
+            with redirect_stdout(io.StringIO()) as output:
+                error = run(optimizer)
+            self.assertIsInstance(error, OverflowError)
+            self.assertEqual(recorder.events[-2:], [error, 'end'])
+            self.assertEqual(output.getvalue(), '')
+
+    def test_collectors(self):
+        """Test the time per step, the time spent in df and the gradient
+        norm statistics
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        def slow_df(x):
+            time.sleep(1e-3)
+            return 8*x
+
+        timer, gradient_timer, stats = (StepTimer(), GradientTimer(),
+                                        GradientNormStats())
+        norms = []
+
+        class Norms(Callback):
+            def on_step(self, optimizer, x_t, step):
+                norms.append(np.linalg.norm(optimizer._g_t))
+
+        optimizer = GradientDescent(f, slow_df, np.ones(3), learning_rate=0.05,
+                                    callbacks=[timer, gradient_timer, stats,
+                                               Norms()])
+        optimizer.fit()
+        n = optimizer.n_iterations
+
+        self.assertEqual(len(timer.times), n)
+        self.assertGreaterEqual(timer.times.min(), 1e-3)
+        self.assertAlmostEqual(timer.mean, timer.total/n)
+        self.assertGreaterEqual(gradient_timer.gradient_seconds, n*1e-3)
+        self.assertLessEqual(gradient_timer.gradient_seconds,
+                             gradient_timer.total_seconds)
+        self.assertGreater(gradient_timer.gradient_fraction, 0.5)
+        self.assertAlmostEqual(gradient_timer.overhead_seconds,
+                               gradient_timer.total_seconds -
+                               gradient_timer.gradient_seconds)
+
+        self.assertEqual(stats.count, n)
+        self.assertAlmostEqual(stats.mean, np.mean(norms))
+        self.assertAlmostEqual(stats.std, np.std(norms))
+        self.assertEqual(stats.min, min(norms))
+        self.assertEqual(stats.max, max(norms))
+        self.assertEqual(stats.last, norms[-1])
+
+        # A new fit starts new collections
+        optimizer.fit()
+        self.assertEqual(len(timer.times), n)
+        self.assertEqual(stats.count, n)
+
+    def test_batch_statistics(self):
+        """Test that the gradient norm statistics are kept per start in
+        batch mode
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        stats = GradientNormStats()
+        optimizer = GradientDescent(lambda x: 4*x**2, df, [1., -2., 3.],
+                                    learning_rate=0.05, batch=True,
+                                    callbacks=[stats])
+        optimizer.fit()
+        self.assertEqual(np.shape(stats.max), (3,))
+        # The largest gradient is the one at the starting point
+        np.testing.assert_allclose(stats.max, [8, 16, 24])
+
+    def test_no_callbacks(self):
+        """Test that df isn't timed without callbacks
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        optimizer = GradientDescent(f, df, np.ones(3), learning_rate=0.05)
+        optimizer.fit()
+        self.assertEqual(optimizer.callbacks, [])
+        self.assertEqual(optimizer.gradient_seconds, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from gradient_descent import (GradientDescent, Momentum, NAG, RMSprop, Adam,
+                              Checkpoint, LogSpaced)
+
+
+class Interrupted(Exception):
+    """Raised by df to simulate a job killed during the optimization"""
+
+
+def f(x):
+    return np.sum(x**4 - 3*x**2 + x)
+
+
+def df(x):
+    return 4*x**3 - 6*x + 1
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        """Setting up requirements for test
+        Params:
+            None
+        Returns:
+            None
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'checkpoint.npz')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def interrupted_fit(self, optimizer, n_calls, checkpoint):
+        """Runs fit until df has been called n_calls times
+
+        Args:
+            optimizer (GradientDescent): optimizer to run
+            n_calls (int): number of gradient evaluations before the
+            interruption
+            checkpoint (Checkpoint): checkpoint of the run
+
+        Returns:
+            None
+        """
+        calls = []
+
+        def interrupted_df(x):
+            if len(calls) == n_calls:
+                raise Interrupted
+            calls.append(x)
+            return df(x)
+
+        optimizer.df = interrupted_df
+        with self.assertRaises(Interrupted):
+            optimizer.fit(checkpoint=checkpoint)
+
+    def test_resume(self):
+        """Test that resuming gives the result of the uninterrupted run
+        bit for bit
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        x_0 = np.linspace(-2, 2, 20)
+        options = {'learning_rate': 0.01, 'max_iterations': 500,
+                   'tolerance': 1e-12, 'n_history_points': 16}
+        for optimizer_class in (GradientDescent, Momentum, NAG, RMSprop,
+                                Adam):
+            for x_t, batch in ((x_0, False), (x_0, True), (0.5, False)):
+                reference = optimizer_class(f, df, x_t, batch=batch,
+                                            history_sampling=LogSpaced(),
+                                            **options)
+                expected = reference.fit()
+
+                optimizer = optimizer_class(f, df, x_t, batch=batch,
+                                            history_sampling=LogSpaced(),
+                                            **options)
+                self.interrupted_fit(optimizer, 75, Checkpoint(self.path,
+                                                               every=20))
+
+                resumed = optimizer_class(f, df, x_t, batch=batch,
+                                          history_sampling=LogSpaced(),
+                                          **options)
+                minimum = resumed.resume(self.path)
+
+                message = f'{optimizer_class.__name__} batch={batch}'
+                np.testing.assert_array_equal(minimum, expected, message)
+                self.assertEqual(resumed.n_iterations, reference.n_iterations,
+                                 message)
+                self.assertEqual(resumed.n_gradient_evaluations,
+                                 reference.n_gradient_evaluations, message)
+                self.assertEqual(resumed._get_state().keys(),
+                                 reference._get_state().keys())
+                for name, value in reference._get_state().items():
+                    np.testing.assert_array_equal(
+                        resumed._get_state()[name], value, message)
+                for name in ('iterations', 'x', 'f', 'gradient_norm'):
+                    np.testing.assert_array_equal(
+                        getattr(resumed.history, name),
+                        getattr(reference.history, name), message)
+                if batch:
+                    np.testing.assert_array_equal(
+                        resumed.n_iterations_per_start,
+                        reference.n_iterations_per_start, message)
+
+    def test_seconds(self):
+        """Test that checkpoints are written on a time interval
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        optimizer = Adam(f, df, np.zeros(3), max_iterations=10)
+        optimizer.fit(checkpoint=Checkpoint(self.path, seconds=3600))
+        self.assertFalse(os.path.exists(self.path), 'checkpoint written early')
+
+        optimizer.fit(checkpoint=Checkpoint(self.path, seconds=1e-9))
+        with np.load(self.path) as checkpoint:
+            self.assertEqual(int(checkpoint['n_iterations']), 10,
+                             'last checkpoint not written')
+        self.assertFalse(os.path.exists(self.path + '.tmp'),
+                         'temporary file left behind')
+
+    def test_mismatch(self):
+        """Test that checkpoints of another optimizer are rejected
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        Adam(f, df, np.zeros(3), max_iterations=10).fit(
+            checkpoint=Checkpoint(self.path, every=5))
+        with self.assertRaises(ValueError):
+            Momentum(f, df, np.zeros(3)).resume(self.path)
+        with self.assertRaises(ValueError):
+            Adam(f, df, np.zeros(4)).resume(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
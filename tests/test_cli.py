@@ -0,0 +1,151 @@
+import csv
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+import numpy as np
+
+from gradient_descent import Adam, Trajectory
+from gradient_descent.cli import main, load_function, load_starts
+
+
+def f(x):
+    return np.sum(x**4 - 3*x**2 + x)
+
+
+def df(x):
+    return 4*x**3 - 6*x + 1
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        """Setting up requirements for test
+        Params:
+            None
+        Returns:
+            None
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.starts = np.array([[-2.0, 0.5], [1.5, 2.0], [0.0, -1.0]])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def run_main(self, *argv):
+        with redirect_stdout(io.StringIO()) as output:
+            status = main([str(arg) for arg in argv])
+        return status, output.getvalue()
+
+    def test_npy(self):
+        """Test vector starts read from and written to .npy files, on a
+        process pool, with the results of the optimizer
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        np.save(self.path('starts.npy'), self.starts)
+        status, output = self.run_main(
+            'tests.test_cli:f', self.path('starts.npy'), '--gradient',
+            'tests.test_cli:df', '--optimizer', 'Adam', '--learning-rate',
+            0.01, '-p', 'beta_1=0.8', '--workers', 2, '-o',
+            self.path('results.npy'))
+        self.assertEqual(status, 0)
+        self.assertIn('3 optimizations, 0 diverged', output)
+
+        results = np.load(self.path('results.npy'))
+        np.testing.assert_array_equal(results['start'], [0, 1, 2])
+        np.testing.assert_array_equal(results['beta_1'], 0.8)
+        for start, row in zip(self.starts, results):
+            optimizer = Adam(f, df, start, learning_rate=0.01, beta_1=0.8)
+            np.testing.assert_array_equal(row['x'], optimizer.fit())
+            self.assertEqual(row['n_iterations'], optimizer.n_iterations)
+
+    def test_csv(self):
+        """Test scalar starts read from and written to CSV files, with
+        automatic differentiation and trajectories
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        with open(self.path('starts.csv'), 'w') as file:
+            file.write('-2.0\n1.5\n0.25\n')
+        status, _ = self.run_main(
+            'tests.test_cli.f', self.path('starts.csv'), '--learning-rate',
+            0.01, '--trajectory-dir', self.path('traces'), '-o',
+            self.path('results.csv'))
+        self.assertEqual(status, 0)
+
+        with open(self.path('results.csv')) as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['optimizer'], 'GradientDescent')
+        for row, start in zip(rows, [-2.0, 1.5, 0.25]):
+            self.assertAlmostEqual(df(float(row['x'])), 0, places=3)
+            trace = Trajectory(row['trajectory'])
+            self.assertEqual(trace.x[0], start)
+            self.assertEqual(trace.iterations[-1], int(row['n_iterations']))
+
+    def test_vector_csv(self):
+        """Test that vector results get one CSV column per element
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        np.savetxt(self.path('starts.csv'), self.starts, delimiter=',')
+        np.testing.assert_array_equal(load_starts(self.path('starts.csv')),
+                                      self.starts)
+        self.run_main('tests.test_cli:f', self.path('starts.csv'), '-o',
+                      self.path('results.csv'), '--max-iterations', 10)
+        with open(self.path('results.csv')) as file:
+            header = next(csv.reader(file))
+        self.assertEqual(header, ['optimizer', 'x_0', 'x_1', 'f',
+                                  'n_iterations', 'time', 'diverged',
+                                  'start', 'trajectory'])
+
+    def test_errors(self):
+        """Test invalid objectives and hyperparameters
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        with self.assertRaises(ValueError):
+            load_function('f')
+        with self.assertRaises(AttributeError):
+            load_function('tests.test_cli:g')
+        np.save(self.path('starts.npy'), self.starts)
+        with self.assertRaises(SystemExit), redirect_stderr(io.StringIO()):
+            main(['tests.test_cli:f', self.path('starts.npy'), '-o',
+                  self.path('results.npy'), '-p', 'beta_1'])
+
+    def test_lean_startup(self):
+        """Test that the command line doesn't load matplotlib
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        process = subprocess.run(
+            [sys.executable, '-c', 'import sys, gradient_descent.cli; '
+             "print('matplotlib' in sys.modules)"],
+            capture_output=True, text=True, check=True)
+        self.assertEqual(process.stdout.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
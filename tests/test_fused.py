@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from gradient_descent import (GradientDescent, Momentum, NAG, RMSprop, Adam,
+                              Checkpoint, LastN)
+
+OPTIMIZERS = [GradientDescent, Momentum, NAG, RMSprop, Adam]
+
+
+def f(x):
+    return np.sum(x**4 - 3*x**2 + x)
+
+
+def df(x):
+    return 4*x**3 - 6*x + 1
+
+
+class TestFused(unittest.TestCase):
+
+    def setUp(self):
+        """Setting up requirements for test
+        Params:
+            None
+        Returns:
+            None
+        """
+        self.calls = []
+
+    def fg(self, x):
+        """Counted value and gradient of f"""
+        self.calls.append(x)
+        return f(x), df(x)
+
+    def test_fused_optimization(self):
+        """Test that fg gives the results of f and df, and that the
+        history holds f at every recorded point
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for optimizer_class in OPTIMIZERS:
+            for x_0, batch in ((np.linspace(-2, 2, 20), False),
+                               (np.linspace(-2, 2, 20), True), (0.5, False)):
+                self.calls.clear()
+                reference = optimizer_class(f, df, x_0, learning_rate=0.01,
+                                            batch=batch,
+                                            history_sampling=LastN(),
+                                            history_x=True)
+                fused = optimizer_class(None, None, x_0, learning_rate=0.01,
+                                        batch=batch, history_sampling=LastN(),
+                                        fg=self.fg, history_x=True)
+                message = f'{optimizer_class.__name__} batch={batch}'
+                np.testing.assert_array_equal(fused.fit(), reference.fit(),
+                                              message)
+                np.testing.assert_array_equal(fused.history.x,
+                                              reference.history.x, message)
+                np.testing.assert_array_equal(fused.history.f,
+                                              reference.history.f, message)
+                # Every call of fg is counted
+                self.assertEqual(fused.n_gradient_evaluations,
+                                 len(self.calls), message)
+                if optimizer_class is not NAG:
+                    # One evaluation per step, plus f at the last point
+                    self.assertEqual(len(self.calls), fused.n_iterations + 1,
+                                     message)
+
+    def test_objective_calls(self):
+        """Test that f is only called at the last point when fg is given
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        points = []
+
+        def counting_f(x):
+            points.append(x.copy())
+            return f(x)
+
+        optimizer = Adam(counting_f, None, np.linspace(-2, 2, 5),
+                         learning_rate=0.01, fg=self.fg)
+        minimum = optimizer.fit()
+        self.assertEqual(len(points), 1, 'f called during the optimization')
+        np.testing.assert_array_equal(points[0], minimum)
+        self.assertTrue(np.all(np.isfinite(optimizer.history.f)),
+                        'f missing from the history')
+
+    def test_checkpoint(self):
+        """Test that a pending value of f survives a checkpoint
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.npz')
+            reference = Adam(None, None, np.linspace(-2, 2, 5),
+                             learning_rate=0.01, max_iterations=100,
+                             history_sampling=LastN(), fg=self.fg)
+            reference.fit()
+            Adam(None, None, np.linspace(-2, 2, 5), learning_rate=0.01,
+                 max_iterations=50, history_sampling=LastN(),
+                 fg=self.fg).fit(checkpoint=Checkpoint(path, every=10))
+            resumed = Adam(None, None, np.linspace(-2, 2, 5),
+                           learning_rate=0.01, max_iterations=100,
+                           history_sampling=LastN(), fg=self.fg)
+            resumed.resume(path)
+            np.testing.assert_array_equal(resumed.history.f,
+                                          reference.history.f)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import numpy as np
+
+from gradient_descent import GradientDescent, NAG, LBFGS, GradientCache
+
+
+def rosenbrock(x):
+    return np.sum(100*(x[1:] - x[:-1]**2)**2 + (1 - x[:-1])**2)
+
+
+def rosenbrock_gradient(x):
+    g = np.zeros_like(x)
+    g[:-1] = -400*x[:-1]*(x[1:] - x[:-1]**2) - 2*(1 - x[:-1])
+    g[1:] += 200*(x[1:] - x[:-1]**2)
+    return g
+
+
+class TestGradientCache(unittest.TestCase):
+
+    def setUp(self):
+        """Setting up requirements for test
+        Params:
+            None
+        Returns:
+            None
+        """
+        self.calls = []
+
+    def df(self, x):
+        """Counted gradient of 4x^2"""
+        self.calls.append(np.copy(x))
+        return 8*x
+
+    def test_lru(self):
+        """Test the hits, misses and least recently used eviction
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        cache = GradientCache(self.df, maxsize=2)
+        for x in (1.0, 2.0, 1.0, 3.0, 1.0, 2.0):
+            self.assertEqual(cache(x), 8*x)
+        # 2.0 was evicted by 3.0, 1.0 was kept as the most recently used
+        self.assertEqual([float(x) for x in self.calls], [1, 2, 3, 2])
+        self.assertEqual(cache.cache_info(), (2, 4, 2, 2))
+        self.assertAlmostEqual(cache.hit_rate, 1/3)
+
+        cache.clear()
+        self.assertEqual(cache.cache_info(), (0, 0, 2, 0))
+        with self.assertRaises(ValueError):
+            GradientCache(self.df, maxsize=0)
+
+    def test_arrays(self):
+        """Test exact and quantized keys of arrays, and that cached
+        gradients are protected from buffers reused by df
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        buffer = np.empty(3)
+
+        def df(x):
+            return np.multiply(x, 8, out=buffer)
+
+        cache = GradientCache(df)
+        g = cache(np.ones(3))
+        cache(np.full(3, 2.))
+        np.testing.assert_array_equal(cache(np.ones(3)), 8)
+        self.assertIs(cache(np.ones(3)), g)
+        self.assertFalse(g.flags.writeable)
+        self.assertEqual(cache.misses, 2)
+        # Same values with another shape or type are other points
+        cache = GradientCache(self.df)
+        for x in (np.ones(3), np.ones((3, 1)), np.ones(3, dtype=np.float32)):
+            cache(x)
+        self.assertEqual(cache.misses, 3)
+
+        quantized = GradientCache(self.df, resolution=0.1)
+        quantized(np.array([0.01, -0.02]))
+        quantized(np.array([-0.04, 0.03]))
+        quantized(np.array([0.1, 0.0]))
+        self.assertEqual(quantized.cache_info()[:2], (1, 2))
+
+    def test_optimization(self):
+        """Test that cached gradients give the same optimization, and save
+        the gradient evaluations of repeated points
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        # Multi-start runs from the same point
+        cache = GradientCache(self.df, maxsize=10000)
+        optimizer = NAG(lambda x: 4*x**2, cache, 10.0, learning_rate=0.01)
+        expected = optimizer.fit()
+        n_calls = len(self.calls)
+        self.assertEqual(optimizer.fit(), expected)
+        self.assertEqual(len(self.calls), n_calls)
+        self.assertEqual(cache.hits, optimizer.n_gradient_evaluations)
+
+        # The gradient at the point the Wolfe line search accepts is reused
+        # by the next step, which doesn't call df again
+        x_0 = np.zeros(6)
+        reference = LBFGS(rosenbrock, rosenbrock_gradient, x_0)
+        cache = GradientCache(rosenbrock_gradient)
+        optimizer = LBFGS(rosenbrock, cache, x_0)
+        np.testing.assert_array_equal(optimizer.fit(), reference.fit())
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses + cache.hits,
+                         optimizer.n_gradient_evaluations)
+
+        # Batch optimizations cache the gradients of all the starts
+        cache = GradientCache(self.df)
+        optimizer = GradientDescent(lambda x: 4*x**2, cache, [1., 2.],
+                                    learning_rate=0.01, batch=True)
+        optimizer.fit()
+        self.assertEqual(cache.hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
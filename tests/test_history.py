@@ -0,0 +1,208 @@
+import importlib.util
+import tracemalloc
+import unittest
+import numpy as np
+
+from gradient_descent.History import History, EveryK, LogSpaced, LastN
+from gradient_descent.GradientDescent import GradientDescent
+from gradient_descent.Adam import Adam
+
+
+class TestHistoryClass(unittest.TestCase):
+
+    def setUp(self):
+        """Setting up requirements for test
+        Params:
+            None
+        Returns:
+            None
+        """
+        self.history = History(4, shape=(2,))
+
+    def test_initizialization(self):
+        """Testing Attributes initialization
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.assertEqual(self.history.capacity, 4,
+                         'incorrect value of capacity')
+        self.assertEqual(len(self.history), 0, 'history is not empty')
+        self.assertEqual(self.history.x.shape, (0, 2),
+                         'incorrect shape of x')
+        self.assertEqual(self.history.x.dtype, np.float64,
+                         'incorrect dtype of x')
+
+    def test_ring_buffer(self):
+        """Test that wrapped records are returned in chronological order,
+        as views on the buffers
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for i in range(7):
+            self.history.record(i, [i, -i], i**2, 2*i)
+
+        self.assertEqual(len(self.history), 4, 'incorrect number of records')
+        np.testing.assert_array_equal(self.history.iterations, [3, 4, 5, 6])
+        np.testing.assert_array_equal(self.history.x[:, 0], [3, 4, 5, 6])
+        np.testing.assert_array_equal(self.history.f, [9, 16, 25, 36])
+        np.testing.assert_array_equal(self.history.gradient_norm,
+                                      [6, 8, 10, 12])
+        self.assertIsNotNone(self.history.x.base,
+                             'records are returned as a copy')
+
+        self.history.reset()
+        self.assertEqual(len(self.history), 0, 'history was not emptied')
+
+    def test_growth(self):
+        """Test that the buffers grow with the records, keeping them, up to
+        the capacity
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        history = History(100, shape=(2,))
+        for i in range(40):
+            history.record(i, [i, -i], i**2, 2*i)
+        np.testing.assert_array_equal(history.iterations, np.arange(40))
+        np.testing.assert_array_equal(history.x[:, 1], -np.arange(40))
+        # The mirrored buffers hold 2*64 rows, not 2*capacity
+        self.assertEqual(len(history.f.base), 128)
+
+        for i in range(40, 250):
+            history.record(i, [i, -i], i**2, 2*i)
+        np.testing.assert_array_equal(history.iterations, np.arange(150, 250))
+        np.testing.assert_array_equal(history.f, np.arange(150, 250)**2)
+        self.assertEqual(len(history.f.base), 200)
+
+    def test_sampling(self):
+        """Test the sampling policies
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        iterations = range(1, 101)
+        self.assertEqual([i for i in iterations if EveryK(25)(i)],
+                         [25, 50, 75, 100])
+        self.assertEqual(sum(map(LastN(), iterations)), 100)
+
+        log_spaced = LogSpaced(points_per_decade=1)
+        self.assertEqual([i for i in iterations if log_spaced(i)],
+                         [1, 10, 100])
+        log_spaced.reset()
+        self.assertTrue(log_spaced(1), 'policy was not reset')
+
+    def test_optimization_history(self):
+        """Test the history recorded by fit
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        optimizer = GradientDescent(lambda x: 4*x**2, lambda x: 8*x, x_t=10,
+                                    learning_rate=0.1, n_history_points=5,
+                                    history_sampling=LastN())
+        minimum = optimizer.fit()
+        history = optimizer.history
+
+        self.assertEqual(len(history), 5, 'incorrect number of records')
+        np.testing.assert_array_equal(
+            history.iterations,
+            np.arange(optimizer.n_iterations - 4, optimizer.n_iterations + 1))
+        self.assertEqual(history.x[-1], minimum,
+                         'last record is not the minimum')
+        np.testing.assert_allclose(history.f, 4*history.x**2)
+        np.testing.assert_array_equal(optimizer.convergence_points, history.x)
+
+    def test_large_vector(self):
+        """Test that the default history of vector parameters doesn't copy
+        the points, so that large vectors fit in memory
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        def f(x):
+            return np.sum((x - 1)**2)
+
+        def df(x):
+            return 2*(x - 1)
+
+        # Starts at the minimum, where the first step converges
+        x_0 = np.ones(10**6)
+        tracemalloc.start()
+        try:
+            optimizer = Adam(f, df, x_0)
+            optimizer.fit()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        # x, its copy, m_t, v_t, the update buffer, the gradient and the
+        # temporaries of f
+        self.assertLess(peak, 10*x_0.nbytes)
+        self.assertIsNone(optimizer.history.x)
+        self.assertEqual(optimizer.n_iterations, 1)
+        np.testing.assert_array_equal(optimizer.history.iterations, [0])
+        np.testing.assert_array_equal(optimizer.history.f, [0])
+
+        # Only the records are allocated, by the first one
+        optimizer = GradientDescent(f, df, np.ones(10**7))
+        self.assertEqual(len(optimizer.history), 0)
+
+    def test_large_batch(self):
+        """Test that the default history of a batch of starts doesn't copy
+        the points, and only allocates the rows of its records
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        x_0 = np.linspace(-1, 3, 10**4)
+        tracemalloc.start()
+        try:
+            optimizer = Adam(lambda x: (x - 1)**2, lambda x: 2*(x - 1), x_0,
+                             learning_rate=0.1, batch=True)
+            optimizer.fit()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertIsNone(optimizer.history.x)
+        self.assertLess(len(optimizer.history), 32)
+        # f and the gradient norms of a full history would take
+        # 4*capacity = 4000 times the memory of the starts
+        self.assertLess(peak, 400*x_0.nbytes)
+
+    @unittest.skipUnless(importlib.util.find_spec('matplotlib'),
+                         'matplotlib is not installed')
+    def test_plot_without_points(self):
+        """Test that plotting a history that doesn't store the points
+        raises a clear error
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        optimizer = GradientDescent(lambda x: np.sum(x**2), lambda x: 2*x,
+                                    np.ones(3), max_iterations=5)
+        optimizer.fit()
+        self.assertIsNone(optimizer.convergence_points)
+        with self.assertRaisesRegex(ValueError, 'history_x=True'):
+            optimizer.plot_optimization()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import subprocess
+import sys
+import unittest
+
+
+class TestImportTime(unittest.TestCase):
+
+    def import_package(self):
+        """Imports the package in a fresh interpreter
+
+        Args:
+            None
+
+        Returns:
+            (str): import time report written by -X importtime
+        """
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                                  'import gradient_descent'],
+                                 capture_output=True, text=True, check=True)
+        return process.stderr
+
+    def test_matplotlib_not_imported(self):
+        """Test that importing the package doesn't load matplotlib
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        report = self.import_package()
+        self.assertNotIn('matplotlib', report,
+                         'matplotlib is imported with the package')
+
+    def test_asyncio_not_imported(self):
+        """Test that importing the package doesn't load asyncio, which only
+        fit_async uses
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        report = self.import_package()
+        self.assertNotIn('asyncio', report,
+                         'asyncio is imported with the package')
+
+    def test_import_time(self):
+        """Test the time spent importing the package and its dependencies
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        report = self.import_package()
+        # Lines have the form "import time: self | cumulative | package"
+        cumulative = [int(line.split('|')[1])
+                      for line in report.splitlines()
+                      if line.split('|')[-1].strip() == 'gradient_descent']
+        self.assertEqual(len(cumulative), 1, 'package import not reported')
+        self.assertLess(cumulative[0], 1e6,
+                        'importing gradient_descent took more than 1s')
+
+
+if __name__ == '__main__':
+    unittest.main()
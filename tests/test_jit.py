@@ -0,0 +1,139 @@
+import unittest
+import warnings
+from unittest import mock
+
+import numpy as np
+
+from gradient_descent import GradientDescent, Momentum, NAG, RMSprop, Adam
+from gradient_descent import jit
+
+OPTIMIZERS = [GradientDescent, Momentum, NAG, RMSprop, Adam]
+
+
+def f(x):
+    """Apply function to point x
+
+    Args:
+        x (float): point on x-axis
+
+    Returns:
+        (float): f(x)
+    """
+    return 4*x**2
+
+
+def df(x):
+    """Apply function gradient to point x
+
+    Args:
+        x (float): point on x-axis
+
+    Returns:
+        (float): df(x)
+    """
+    return 8*x
+
+
+@unittest.skipIf(jit.numba is None, 'numba is not installed')
+class TestJitBackend(unittest.TestCase):
+
+    def test_matches_python_backend(self):
+        """Test that the compiled loop matches the Python loop
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for optimizer_class in OPTIMIZERS:
+            reference = optimizer_class(f, df, x_t=10, learning_rate=0.01,
+                                        tolerance=1e-10)
+            compiled = optimizer_class(f, df, x_t=10, learning_rate=0.01,
+                                       tolerance=1e-10, backend='numba')
+            self.assertAlmostEqual(compiled.fit(), reference.fit(), places=12,
+                                   msg=f'{optimizer_class.__name__} result '
+                                   'differs from the Python backend')
+            self.assertEqual(compiled.n_iterations, reference.n_iterations,
+                             'incorrect value of n_iterations')
+            self.assertEqual(compiled._get_state().keys(),
+                             reference._get_state().keys())
+            for name, value in reference._get_state().items():
+                np.testing.assert_allclose(compiled._get_state()[name], value,
+                                           rtol=1e-9,
+                                           err_msg=f'incorrect state {name}')
+            np.testing.assert_array_equal(compiled.history.iterations,
+                                          [0, compiled.n_iterations])
+
+    def test_without_f(self):
+        """Test the compiled loop of an optimizer built without f
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        reference = GradientDescent(None, df, x_t=3.0, learning_rate=0.01)
+        compiled = GradientDescent(None, df, x_t=3.0, learning_rate=0.01,
+                                   backend='numba')
+        self.assertAlmostEqual(compiled.fit(), reference.fit(), places=12)
+        self.assertTrue(np.isnan(compiled.history.f).all(),
+                        'incorrect history of f')
+
+    def test_fallback_to_python(self):
+        """Test that a df numba can't compile runs on the Python loop
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        calls = []
+
+        def recording_df(x):
+            calls.append(x)
+            return 8*x
+
+        optimizer = Adam(f, recording_df, x_t=10, learning_rate=0.1,
+                         backend='numba')
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            minimum = optimizer.fit()
+        self.assertEqual(len(caught), 1, 'fallback was not reported')
+        self.assertEqual(len(calls), optimizer.n_iterations,
+                         'Python loop was not used')
+        self.assertLessEqual(abs(minimum), 1e-4,
+                             'Failed to converge to zero for the function: \
+                                 4x**2')
+
+
+class TestJitUnavailable(unittest.TestCase):
+
+    def test_missing_numba(self):
+        """Test the fallback to the Python loop without numba
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        reference = Momentum(f, df, x_t=10, learning_rate=0.1)
+        with mock.patch.object(jit, 'numba', None):
+            optimizer = Momentum(f, df, x_t=10, learning_rate=0.1,
+                                 backend='numba')
+            self.assertEqual(optimizer.fit(), reference.fit(),
+                             'incorrect result of the fallback')
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        with self.assertRaises(ValueError):
+            GradientDescent(f, df, x_t=10, backend='cuda')
+
+
+if __name__ == '__main__':
+    unittest.main()
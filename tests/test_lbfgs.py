@@ -0,0 +1,219 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+
+from gradient_descent.LBFGS import LBFGS
+from gradient_descent.Adam import Adam
+from gradient_descent.Checkpoint import Checkpoint
+from gradient_descent.StepSize import ArmijoBacktracking, WolfeLineSearch
+
+
+def rosenbrock(x):
+    return np.sum(100*(x[1:] - x[:-1]**2)**2 + (1 - x[:-1])**2)
+
+
+def rosenbrock_gradient(x):
+    g = np.zeros_like(x)
+    g[:-1] = -400*x[:-1]*(x[1:] - x[:-1]**2) - 2*(1 - x[:-1])
+    g[1:] += 200*(x[1:] - x[:-1]**2)
+    return g
+
+
+class TestLBFGSClass(unittest.TestCase):
+
+    def setUp(self):
+        """Setting up requirements for test
+        Params:
+            None
+
+        Returns:
+            None
+        """
+        def f(x):
+            """Apply function to point x
+
+            Args:
+                x (float): point on x-axis
+
+            Returns:
+                (float): f(x)
+            """
+            return 4*x**2
+
+        def df(x):
+            """Apply function gradient to point x
+
+            Args:
+                x (float): point on x-axis
+
+            Returns:
+                (float): df(x)
+            """
+            return 8*x
+
+        self.lbfgs = LBFGS(f, df, x_t=10, max_iterations=1000,
+                           tolerance=1e-6, n_history_points=1000, memory=5)
+
+    def test_initizialization(self):
+        """Testing Attributes initialization
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.assertEqual(self.lbfgs.x_t, 10, 'incorrect initial value of x_t')
+        self.assertEqual(self.lbfgs.learning_rate, 1.0,
+                         'incorrect value of learning_rate')
+        self.assertEqual(self.lbfgs.memory, 5, 'incorrect value of memory')
+        self.assertIsInstance(self.lbfgs.step_size, WolfeLineSearch,
+                              'incorrect default step size')
+        self.assertIsNone(self.lbfgs.s, 'pairs allocated before the fit')
+        batch = LBFGS(self.lbfgs.f, self.lbfgs.df, [1., 2.], batch=True)
+        self.assertIsInstance(batch.step_size, ArmijoBacktracking,
+                              'incorrect default step size in batch mode')
+
+    def test_optimization(self):
+        """Test the optimization of a scalar function
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        minimum = self.lbfgs.fit()
+        self.assertLessEqual(abs(minimum), 1e-6,
+                             'Failed to converge to zero for the function: \
+                                 4x^2')
+        self.assertLessEqual(self.lbfgs.n_iterations, 10,
+                             'too many iterations')
+
+    def test_vector_optimization(self):
+        """Test that L-BFGS solves the Rosenbrock function in a fraction of
+        the iterations of Adam
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        x_0 = np.zeros(10)
+        optimizer = LBFGS(rosenbrock, rosenbrock_gradient, x_0,
+                          tolerance=1e-10)
+        minimum = optimizer.fit()
+        np.testing.assert_allclose(minimum, np.ones(10), atol=1e-6)
+        np.testing.assert_array_equal(x_0, np.zeros(10),
+                                      'starting point was modified')
+
+        adam = Adam(rosenbrock, rosenbrock_gradient, x_0, learning_rate=0.01,
+                    tolerance=1e-10, max_iterations=5000)
+        adam.fit()
+        self.assertLess(optimizer.n_iterations, adam.n_iterations/10)
+
+    def test_line_search_reuse(self):
+        """Test that the gradient of the point accepted by the Wolfe line
+        search isn't evaluated again by the next step, with f and df or fg
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        calls = []
+
+        def counting_gradient(x):
+            calls.append(x)
+            return rosenbrock_gradient(x)
+
+        def fg(x):
+            calls.append(x)
+            return rosenbrock(x), rosenbrock_gradient(x)
+
+        x_0 = np.zeros(10)
+        optimizer = LBFGS(rosenbrock, counting_gradient, x_0,
+                          history_x=True, tolerance=1e-10)
+        minimum = optimizer.fit()
+        self.assertEqual(len(calls), optimizer.n_gradient_evaluations)
+        self.assertLess(len(calls), 1.5*optimizer.n_iterations)
+        for i in range(1, len(calls)):
+            self.assertFalse(np.array_equal(calls[i], calls[i - 1]),
+                             'gradient evaluated twice at a point')
+
+        calls.clear()
+        fused = LBFGS(None, None, x_0, fg=fg, history_x=True,
+                      tolerance=1e-10)
+        np.testing.assert_array_equal(fused.fit(), minimum)
+        np.testing.assert_array_equal(fused.history.f, optimizer.history.f)
+        self.assertEqual(len(calls), fused.n_gradient_evaluations)
+
+    def test_batch_optimization(self):
+        """Test that every start keeps its own curvature pairs
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        def f(x):
+            return x**4 - 3*x**2 + x
+
+        def df(x):
+            return 4*x**3 - 6*x + 1
+
+        x_0 = np.linspace(-2, 2, 9)
+        optimizer = LBFGS(f, df, x_0, batch=True, tolerance=1e-10)
+        minimums = optimizer.fit()
+        np.testing.assert_allclose(df(minimums), 0, atol=1e-6)
+        for i, x in enumerate(x_0):
+            single = LBFGS(f, df, x, step_size=ArmijoBacktracking(),
+                           tolerance=1e-10)
+            self.assertAlmostEqual(minimums[i], single.fit(), places=6)
+
+    def test_circular_buffer(self):
+        """Test that the pairs are stored in place in a circular buffer
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        optimizer = LBFGS(rosenbrock, rosenbrock_gradient, np.zeros(4),
+                          memory=3, tolerance=0, max_iterations=8,
+                          history_x=True)
+        optimizer.fit()
+        s = optimizer.s
+        self.assertEqual(s.shape, (3, 4), 'incorrect shape of the pairs')
+        optimizer.fit(x0=np.full(4, 0.5))
+        self.assertIs(optimizer.s, s, 'pairs were reallocated')
+
+        # The 8th step stored the 7th pair, x_7 - x_6, in slot (7 - 1) % 3:
+        # the first step has no pair
+        x = optimizer.history.x
+        np.testing.assert_allclose(optimizer.s[(7 - 1) % 3], x[-2] - x[-3])
+
+    def test_checkpoint(self):
+        """Test that the curvature pairs resume bit for bit
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        reference = LBFGS(rosenbrock, rosenbrock_gradient, np.zeros(6),
+                          memory=4, tolerance=0, max_iterations=30)
+        expected = reference.fit()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.npz')
+            LBFGS(rosenbrock, rosenbrock_gradient, np.zeros(6), memory=4,
+                  tolerance=0, max_iterations=17).fit(
+                checkpoint=Checkpoint(path, every=17))
+            resumed = LBFGS(rosenbrock, rosenbrock_gradient, np.zeros(6),
+                            memory=4, tolerance=0, max_iterations=30)
+            np.testing.assert_array_equal(resumed.resume(path), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
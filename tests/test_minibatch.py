@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from gradient_descent import GradientDescent, Momentum, Adam
+from gradient_descent.MiniBatch import (ArraySource, IterableSource,
+                                        NpySource, iter_batches)
+
+
+def df_sample(x, batch):
+    """Per-sample gradients of the squared error of the line x[0]*a + x[1]
+
+    Args:
+        x (np.array): slope and intercept
+        batch (np.array): samples (a, b), one per row
+
+    Returns:
+        (np.array): gradient of every sample, one per row
+    """
+    residuals = x[0]*batch[:, 0] + x[1] - batch[:, 1]
+    return np.stack([2*residuals*batch[:, 0], 2*residuals], axis=1)
+
+
+class TestMiniBatch(unittest.TestCase):
+
+    def setUp(self):
+        """Setting up requirements for test
+        Params:
+            None
+        Returns:
+            None
+        """
+        rng = np.random.default_rng(0)
+        a = rng.uniform(-1, 1, 2000)
+        self.data = np.stack([a, 3*a + 1 + rng.normal(0, 0.01, a.size)],
+                             axis=1)
+
+    def test_blocks(self):
+        """Test that an epoch visits every sample once
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        rng = np.random.default_rng(0)
+        for source in (ArraySource(self.data),
+                       IterableSource(lambda: iter(self.data))):
+            batches = list(iter_batches(source, 32, 256, rng))
+            samples = np.concatenate(batches)
+            self.assertTrue(all(len(batch) <= 32 for batch in batches))
+            self.assertFalse(np.array_equal(samples, self.data),
+                             'samples were not shuffled')
+            np.testing.assert_array_equal(np.sort(samples[:, 0]),
+                                          np.sort(self.data[:, 0]))
+
+    def test_optimization(self):
+        """Test the fit of a line on mini-batches of in-memory samples
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for optimizer in (GradientDescent(None, None, x_t=[0., 0.],
+                                          learning_rate=0.1),
+                          Momentum(None, None, x_t=[0., 0.],
+                                   learning_rate=0.1),
+                          Adam(None, None, x_t=[0., 0.],
+                               learning_rate=0.05)):
+            x = optimizer.fit_minibatch(df_sample, self.data, batch_size=32,
+                                        n_epochs=5, seed=0)
+            np.testing.assert_allclose(x, [3, 1], atol=0.05,
+                                       err_msg=f'{optimizer.name} failed')
+            self.assertEqual(optimizer.n_iterations, 5*63,
+                             'incorrect number of iterations')
+            self.assertIsNone(optimizer.df, 'df was not restored')
+
+    def test_streaming_sources(self):
+        """Test the fit on samples streamed from a .npy file and from a
+        generator
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        def generate():
+            for sample in self.data:
+                yield sample
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'samples.npy')
+            np.save(path, self.data)
+            self.assertIsInstance(NpySource(path).data, np.memmap)
+
+            for data in (path, generate):
+                optimizer = Adam(None, None, x_t=[0., 0.],
+                                 learning_rate=0.05)
+                x = optimizer.fit_minibatch(df_sample, data, batch_size=50,
+                                            n_epochs=5, block_size=500,
+                                            seed=1)
+                np.testing.assert_allclose(x, [3, 1], atol=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -57,10 +57,10 @@ class TestNAGClass(unittest.TestCase):
                          'incorrect value of tolerance')
         self.assertEqual(self.nag.n_iterations, 0,
                          'incorrect value of n_iterations')
-        np.testing.assert_array_equal(self.nag.convergence_points,
-                                      np.array([None]*1000),
-                                      'incorrect inialization of array \
-                                          convergence_points')
+        self.assertEqual(len(self.nag.convergence_points), 0,
+                         'incorrect inialization of convergence_points')
+        self.assertEqual(self.nag.history.capacity, 1000,
+                         'incorrect inialization of history')
         self.assertEqual(self.nag.gamma, 0.9,
                          'incorrect initilialization of gamma')
         self.assertEqual(self.nag._NAG__u_t, 0,
@@ -102,6 +102,155 @@ class TestNAGClass(unittest.TestCase):
         self.assertGreaterEqual(self.nag.n_iterations, 1,
                                 "n_iterations wasn't properly updated")
 
+    def test_batch_optimization(self):
+        """Test the optimization of several starting points at once
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        starts = np.array([-10, -3, 0.5, 3, 10])
+        optimizer = NAG(self.nag.f, self.nag.df, x_t=starts, learning_rate=0.1,
+                        max_iterations=1000, tolerance=1e-6, gamma=0.9,
+                        batch=True)
+        minimums = optimizer.fit()
+        self.assertEqual(minimums.shape, starts.shape,
+                         'incorrect shape of batch result')
+        self.assertTrue(optimizer.converged.all(),
+                        'not every starting point converged')
+
+        for i, x_t in enumerate(starts):
+            single = NAG(self.nag.f, self.nag.df, x_t=x_t, learning_rate=0.1,
+                         max_iterations=1000, tolerance=1e-6, gamma=0.9)
+            self.assertAlmostEqual(minimums[i], single.fit(),
+                                   msg='batch result differs from single run')
+            self.assertEqual(optimizer.n_iterations_per_start[i],
+                             single.n_iterations,
+                             'incorrect number of iterations per start')
+
+    def test_vector_optimization(self):
+        """Test the optimization of a vector of parameters
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        def f(x):
+            return 4*x**2
+
+        def df(x):
+            return 8*x
+
+        x_0 = np.linspace(-10, 10, 50)
+        optimizer = NAG(f, df, x_t=x_0, learning_rate=0.1, max_iterations=1000,
+                        tolerance=1e-6, gamma=0.9)
+        minimum = optimizer.fit()
+        self.assertEqual(minimum.shape, x_0.shape,
+                         'incorrect shape of vector result')
+        self.assertLessEqual(np.linalg.norm(minimum), 1e-3,
+                             'Failed to converge to zero for the function: \
+                                 4*x**2')
+        self.assertTrue(np.isnan(optimizer.history.f).all(),
+                        'element-wise values of f recorded')
+        np.testing.assert_array_equal(x_0, np.linspace(-10, 10, 50),
+                                      'starting point was modified')
+
+        # State arrays are updated in place between steps
+        optimizer._update_parameter(x_0)
+        state = optimizer._NAG__u_t
+        optimizer._update_parameter(x_0)
+        self.assertIs(optimizer._NAG__u_t, state,
+                      'state array was reallocated')
+
+    def test_inplace_update(self):
+        """Test that the preallocated update kernel matches _update_parameter
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        x_0 = np.linspace(-10, 10, 50)
+        reference = NAG(self.nag.f, self.nag.df, x_t=x_0, learning_rate=0.1,
+                        gamma=0.9)
+        inplace = NAG(self.nag.f, self.nag.df, x_t=x_0, learning_rate=0.1,
+                      gamma=0.9)
+        out = np.empty_like(x_0)
+        for _ in range(3):
+            reference.n_iterations += 1
+            expected = reference._update_parameter(x_0)
+            update = inplace.step(x_0, out=out)
+            self.assertIs(update, out, 'update not written into out')
+            np.testing.assert_allclose(update, expected,
+                                       err_msg='incorrect in-place update')
+
+    def test_gradient_evaluations(self):
+        """Test that df is evaluated exactly once per iteration
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        calls = []
+
+        def f(x):
+            return 4*np.sum(x**2)
+
+        def counting_df(x):
+            calls.append(x)
+            return self.nag.df(x)
+
+        for x_0 in (10, np.linspace(-10, 10, 50)):
+            calls.clear()
+            optimizer = NAG(f, counting_df, x_t=x_0,
+                            learning_rate=0.1, gamma=0.9)
+            optimizer.fit()
+            self.assertEqual(len(calls), optimizer.n_iterations,
+                             'df called more than once per iteration')
+            self.assertEqual(optimizer.n_gradient_evaluations, len(calls),
+                             'incorrect count of gradient evaluations')
+
+    def test_reset(self):
+        """Test that every fit starts from a cleared state, reusing the state
+        buffers, and that fit(x0) restarts from a new point
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        def f(x):
+            return 4*np.sum(x**2)
+
+        x_0 = np.linspace(-10, 10, 50)
+        optimizer = NAG(f, self.nag.df, x_t=x_0,
+                        history_x=True, learning_rate=0.1, gamma=0.9)
+        first = optimizer.fit()
+        state = optimizer._NAG__u_t
+        np.testing.assert_array_equal(optimizer.fit(), first,
+                                      'second fit started from a stale state')
+        self.assertIs(optimizer._NAG__u_t, state,
+                      'state array was reallocated')
+
+        x_1 = np.linspace(5, -5, 50)
+        fresh = NAG(f, self.nag.df, x_t=x_1,
+                    history_x=True, learning_rate=0.1, gamma=0.9)
+        np.testing.assert_array_equal(optimizer.fit(x0=x_1), fresh.fit(),
+                                      'fit(x0) differs from a new optimizer')
+        self.assertEqual(optimizer.n_iterations, fresh.n_iterations,
+                         'incorrect number of iterations')
+        np.testing.assert_array_equal(optimizer.history.x, fresh.history.x,
+                                      'incorrect history')
+        with self.assertRaises(ValueError):
+            optimizer.fit(x0=np.zeros(3))
+
+        # Scalar state is cleared as well
+        self.assertEqual(self.nag.fit(), self.nag.fit(),
+                         'second fit started from a stale state')
+
 
 if __name__ == '__main__':
     unittest.main()
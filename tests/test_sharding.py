@@ -0,0 +1,169 @@
+import asyncio
+import gc
+import multiprocessing
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from gradient_descent import (GradientDescent, Momentum, NAG, RMSprop, Adam,
+                              LBFGS, Checkpoint, StepTimer)
+
+OPTIMIZERS = [GradientDescent, Momentum, NAG, RMSprop, Adam]
+
+
+def f(x):
+    return np.sum(x**4 - 3*x**2 + x)
+
+
+def df(x):
+    return 4*x**3 - 6*x + 1
+
+
+class TestSharding(unittest.TestCase):
+
+    def setUp(self):
+        """Setting up requirements for test
+        Params:
+            None
+        Returns:
+            None
+        """
+        self.x_0 = np.linspace(-2, 2, 301).reshape(7, 43)
+
+    def test_same_results(self):
+        """Test that sharded optimizations give the results of unsharded
+        ones, including when they are run again on the same workers
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for optimizer_class in OPTIMIZERS:
+            name = optimizer_class.__name__
+            reference = optimizer_class(f, df, self.x_0, learning_rate=0.01)
+            expected = reference.fit()
+            optimizer = optimizer_class(f, df, self.x_0, learning_rate=0.01,
+                                        shards=3)
+            try:
+                minimum = optimizer.fit()
+                np.testing.assert_array_equal(minimum, expected, name)
+                self.assertEqual(optimizer.n_iterations,
+                                 reference.n_iterations, name)
+                np.testing.assert_array_equal(optimizer.history.f,
+                                              reference.history.f, name)
+
+                # The second run reuses the shared memory, without
+                # altering the result of the first one
+                pool = optimizer._shard_pool
+                np.testing.assert_array_equal(optimizer.fit(), expected,
+                                              name)
+                self.assertIs(optimizer._shard_pool, pool)
+                np.testing.assert_array_equal(minimum, expected, name)
+            finally:
+                optimizer.close()
+            self.assertIsNone(optimizer._shard_pool)
+            np.testing.assert_array_equal(optimizer._get_state().get('m_t'),
+                                          reference._get_state().get('m_t'))
+
+    def test_more_shards_than_parameters(self):
+        """Test that there is at most one shard per parameter
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        optimizer = Adam(f, df, [-1.0, 1.0], learning_rate=0.01, shards=4)
+        try:
+            expected = Adam(f, df, [-1.0, 1.0], learning_rate=0.01).fit()
+            np.testing.assert_array_equal(optimizer.fit(), expected)
+            self.assertEqual(optimizer._shard_pool.n_shards, 2)
+        finally:
+            optimizer.close()
+
+    def test_resume(self):
+        """Test that a checkpoint of a sharded optimization is resumed, by
+        sharded and unsharded optimizers
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        options = {'learning_rate': 1e-3, 'tolerance': 0,
+                   'max_iterations': 100}
+        expected = Adam(f, df, self.x_0, **options).fit()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.npz')
+            optimizer = Adam(f, df, self.x_0, shards=2, **{
+                **options, 'max_iterations': 64})
+            try:
+                optimizer.fit(checkpoint=Checkpoint(path, every=50))
+                # The same workers continue from the checkpoint
+                optimizer.max_iterations = 100
+                np.testing.assert_array_equal(optimizer.resume(path),
+                                              expected)
+            finally:
+                optimizer.close()
+            np.testing.assert_array_equal(
+                Adam(f, df, self.x_0, **options).resume(path), expected)
+
+    def test_async_and_callbacks(self):
+        """Test sharded optimizations run by fit_async, with callbacks
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        expected = Momentum(f, df, self.x_0, learning_rate=0.01).fit()
+        timer = StepTimer()
+        optimizer = Momentum(f, df, self.x_0, learning_rate=0.01, shards=2,
+                             callbacks=[timer])
+        try:
+            minimum = asyncio.run(optimizer.fit_async())
+            np.testing.assert_array_equal(minimum, expected)
+            self.assertEqual(len(timer.times), optimizer.n_iterations)
+        finally:
+            optimizer.close()
+
+    def test_garbage_collection(self):
+        """Test that the workers stop when the optimizer is collected
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        optimizer = RMSprop(f, df, self.x_0, shards=2, max_iterations=10)
+        optimizer.fit()
+        processes = multiprocessing.active_children()
+        self.assertGreaterEqual(len(processes), 2)
+        del optimizer
+        gc.collect()
+        for process in processes:
+            process.join(5)
+            self.assertFalse(process.is_alive())
+
+    def test_unsupported(self):
+        """Test the modes that don't support sharding
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        with self.assertRaises(ValueError):
+            Adam(f, df, 1.0, shards=2)
+        with self.assertRaises(ValueError):
+            Adam(f, df, self.x_0, batch=True, shards=2)
+        with self.assertRaises(ValueError):
+            Adam(f, df, self.x_0, sparse=True, shards=2)
+        with self.assertRaises(ValueError):
+            LBFGS(f, df, self.x_0, shards=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from gradient_descent import (GradientDescent, Momentum, NAG, RMSprop, Adam,
+                              LBFGS, Checkpoint)
+
+TARGET = np.random.default_rng(0).normal(size=(40, 3))
+
+
+def f(x):
+    return np.sum((x - TARGET)**2)
+
+
+def sparse_df(x):
+    """Gradient of f on a subset of the rows, which changes with x like
+    the rows of the samples of a mini-batch"""
+    indices = np.flatnonzero(np.sin(100*x[:, 0]) > 0.5)
+    return indices, 2*(x[indices] - TARGET[indices])
+
+
+def dense_df(x):
+    indices, values = sparse_df(x)
+    g_t = np.zeros_like(x)
+    g_t[indices] = values
+    return g_t
+
+
+class TestSparse(unittest.TestCase):
+
+    def setUp(self):
+        """Setting up requirements for test
+        Params:
+            None
+        Returns:
+            None
+        """
+        self.x_0 = np.linspace(-1, 1, 120).reshape(40, 3)
+        self.options = {'learning_rate': 0.01, 'tolerance': 0,
+                        'max_iterations': 200}
+
+    def test_dense_equivalence(self):
+        """Test that GradientDescent and RMSprop, which don't move rows
+        without a gradient, take the steps of the dense update
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for optimizer_class in (GradientDescent, RMSprop):
+            expected = optimizer_class(f, dense_df, self.x_0,
+                                       **self.options).fit()
+            optimizer = optimizer_class(f, sparse_df, self.x_0, sparse=True,
+                                        **self.options)
+            minimum = optimizer.fit()
+            np.testing.assert_allclose(minimum, expected, rtol=1e-12,
+                                       err_msg=optimizer_class.__name__)
+            self.assertLess(f(minimum), f(self.x_0))
+
+    def test_lazy_updates(self):
+        """Test that Momentum and Adam only move rows with a gradient, with
+        moments caught up over the skipped steps
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for optimizer_class in (Momentum, Adam):
+            name = optimizer_class.__name__
+            # Every row has a gradient at every step: the dense update
+            optimizer = optimizer_class(
+                f, lambda x: (np.arange(len(x)), 2*(x - TARGET)), self.x_0,
+                sparse=True, **self.options)
+            expected = optimizer_class(f, lambda x: 2*(x - TARGET), self.x_0,
+                                       **self.options).fit()
+            np.testing.assert_allclose(optimizer.fit(), expected, rtol=1e-12,
+                                       err_msg=name)
+
+            # Row 0 has a gradient on steps 1 and 4 only
+            def df(x):
+                if optimizer.n_iterations in (1, 4):
+                    return np.array([0]), np.ones((1, 3))
+                return np.array([1]), np.ones((1, 3))
+
+            optimizer = optimizer_class(f, df, self.x_0, sparse=True,
+                                        learning_rate=0.1, tolerance=0,
+                                        max_iterations=4)
+            x = optimizer.fit()
+            np.testing.assert_array_equal(x[2:], self.x_0[2:], name)
+            # Its moments decay over steps 2 and 3, when it doesn't move
+            if optimizer_class is Momentum:
+                v_4 = 0.9*(0.9**2*0.1) + 0.1
+                steps = 0.1*0.1 + 0.1*v_4
+            else:
+                m_4 = 0.9*(0.9**2*0.1) + 0.1
+                v_4 = 0.999*(0.999**2*0.001) + 0.001
+                steps = 0.1/(1 + 1e-8) + 0.1*(m_4/(1 - 0.9**4)) / \
+                    (np.sqrt(v_4/(1 - 0.999**4)) + 1e-8)
+            np.testing.assert_allclose(self.x_0[0] - x[0], steps,
+                                       rtol=1e-12, err_msg=name)
+
+    def test_repeated_indices(self):
+        """Test that the gradients of repeated rows are summed
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        def df(x):
+            indices, values = sparse_df(x)
+            return np.concatenate([indices, indices]), \
+                np.concatenate([values/4, 3*values/4])
+
+        expected = Adam(f, sparse_df, self.x_0, sparse=True,
+                        **self.options).fit()
+        minimum = Adam(f, df, self.x_0, sparse=True, **self.options).fit()
+        np.testing.assert_allclose(minimum, expected, rtol=1e-12)
+
+    def test_convergence(self):
+        """Test that steps without a gradient, or with the gradient of
+        converged rows only, aren't taken as a convergence
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        calls = []
+
+        def empty_df(x):
+            calls.append(x)
+            if len(calls) % 3 == 0:
+                return np.array([], dtype=int), np.zeros((0, 3))
+            return sparse_df(x)
+
+        optimizer = Adam(f, empty_df, self.x_0, sparse=True, tolerance=0,
+                         max_iterations=500)
+        optimizer.fit()
+        self.assertEqual(optimizer.n_iterations, 500)
+
+        # Row 0 starts at its minimum, and is the only one of even steps
+        x_0 = self.x_0.copy()
+        x_0[0] = TARGET[0]
+
+        def converged_df(x):
+            calls.append(x)
+            if len(calls) % 2 == 0:
+                return np.array([0]), np.zeros((1, 3))
+            return np.arange(len(x)), 2*(x - TARGET)
+
+        calls.clear()
+        optimizer = Adam(f, converged_df, x_0, sparse=True,
+                         learning_rate=0.01, max_iterations=200)
+        minimum = optimizer.fit()
+        self.assertEqual(optimizer.n_iterations, 200)
+        self.assertLess(f(minimum), f(x_0)/2)
+
+    def test_resume(self):
+        """Test that resuming a sparse optimization keeps the iteration of
+        the last update of each row
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        expected = Momentum(f, sparse_df, self.x_0, sparse=True,
+                            **self.options).fit()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.npz')
+            options = {**self.options, 'max_iterations': 77}
+            Momentum(f, sparse_df, self.x_0, sparse=True, **options).fit(
+                checkpoint=Checkpoint(path, every=50))
+            optimizer = Momentum(f, sparse_df, self.x_0, sparse=True,
+                                 **self.options)
+            np.testing.assert_array_equal(optimizer.resume(path), expected)
+
+    def test_unsupported(self):
+        """Test the optimizers and modes that don't support sparse
+        gradients
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for optimizer_class in (NAG, LBFGS):
+            with self.assertRaises(ValueError):
+                optimizer_class(f, sparse_df, self.x_0, sparse=True)
+        with self.assertRaises(ValueError):
+            Adam(f, sparse_df, self.x_0, sparse=True, batch=True)
+        with self.assertRaises(ValueError):
+            Adam(f, sparse_df, 1.0, sparse=True)
+        optimizer = Adam(f, sparse_df, self.x_0, sparse=True)
+        with self.assertRaises(ValueError):
+            optimizer.step(self.x_0)
+        with self.assertRaises(ValueError):
+            optimizer.fit_minibatch(lambda x, batch: batch, np.ones((4, 3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
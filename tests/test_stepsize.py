@@ -0,0 +1,160 @@
+import os
+import tempfile
+import unittest
+import warnings
+import numpy as np
+
+from gradient_descent import (GradientDescent, Adam, Checkpoint, StepDecay,
+                              CosineAnnealing, Warmup, BarzilaiBorwein,
+                              ArmijoBacktracking, WolfeLineSearch)
+
+# Ill-conditioned quadratic, with curvatures from 1 to 100
+D = np.logspace(0, 2, 10)
+
+
+def f(x):
+    return 0.5*np.sum(D*x**2)
+
+
+def df(x):
+    return D*x
+
+
+class TestStepSize(unittest.TestCase):
+
+    def test_schedules(self):
+        """Test the factors of the learning-rate schedules
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        decay = StepDecay(10, gamma=0.5)
+        self.assertEqual([decay.factor(i) for i in (1, 10, 11, 21)],
+                         [1, 1, 0.5, 0.25])
+        cosine = CosineAnnealing(100, min_factor=0.1)
+        self.assertAlmostEqual(cosine.factor(1), 1)
+        self.assertAlmostEqual(cosine.factor(51), 0.55)
+        self.assertAlmostEqual(cosine.factor(500), 0.1)
+        warmup = Warmup(4, StepDecay(10, gamma=0.5))
+        self.assertEqual([warmup.factor(i) for i in (1, 2, 4, 5, 15)],
+                         [0.25, 0.5, 1, 1, 0.5])
+
+        optimizer = GradientDescent(f, df, np.ones(10), learning_rate=0.01,
+                                    step_size=Warmup(4))
+        update = optimizer.step(np.ones(10))
+        np.testing.assert_allclose(update, 0.25*0.01*D)
+
+    def test_line_searches(self):
+        """Test that line searches converge where the learning rate makes
+        the fixed step diverge
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            fixed = GradientDescent(f, df, np.ones(10), learning_rate=0.5,
+                                    max_iterations=2000)
+            self.assertFalse(np.isfinite(f(fixed.fit())), 'did not diverge')
+
+        for step_size in (ArmijoBacktracking(), WolfeLineSearch(),
+                          BarzilaiBorwein()):
+            optimizer = GradientDescent(f, df, np.ones(10), learning_rate=0.5,
+                                        max_iterations=2000, tolerance=1e-10,
+                                        step_size=step_size)
+            minimum = optimizer.fit()
+            self.assertLessEqual(np.linalg.norm(minimum), 1e-6,
+                                 f'{type(step_size).__name__} failed')
+
+    def test_barzilai_borwein(self):
+        """Test that Barzilai-Borwein steps need fewer iterations than the
+        best fixed learning rate
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        fixed = GradientDescent(f, df, np.ones(10), learning_rate=0.019,
+                                max_iterations=5000, tolerance=1e-10)
+        fixed.fit()
+        optimizer = GradientDescent(f, df, np.ones(10), learning_rate=0.019,
+                                    max_iterations=5000, tolerance=1e-10,
+                                    step_size=BarzilaiBorwein())
+        minimum = optimizer.fit()
+        self.assertLessEqual(np.linalg.norm(minimum), 1e-6)
+        self.assertLess(optimizer.n_iterations, fixed.n_iterations/2)
+
+    def test_wolfe_conditions(self):
+        """Test that the Wolfe step satisfies the strong Wolfe conditions
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        search = WolfeLineSearch(initial_step=0.001, c_2=0.1)
+        optimizer = GradientDescent(f, df, np.ones(10), learning_rate=1.0,
+                                    step_size=search)
+        x_t = np.ones(10)
+        g_t = df(x_t)
+        update = optimizer.step(x_t).copy()
+        t = update[0]/g_t[0]
+        self.assertLessEqual(f(x_t - update),
+                             f(x_t) - search.c_1*np.dot(g_t, update))
+        self.assertLessEqual(abs(np.dot(df(x_t - update), g_t)),
+                             search.c_2*np.dot(g_t, g_t))
+        self.assertGreater(t, search.initial_step, 'step was not expanded')
+        self.assertGreater(optimizer.n_gradient_evaluations, 1)
+
+    def test_batch(self):
+        """Test per-start step sizes in batch mode
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        x_0 = np.linspace(-5, 5, 11)
+        for step_size in (ArmijoBacktracking(), BarzilaiBorwein()):
+            optimizer = GradientDescent(lambda x: 10*x**2, lambda x: 20*x,
+                                        x_0, learning_rate=0.5, batch=True,
+                                        tolerance=1e-10, step_size=step_size)
+            minimums = optimizer.fit()
+            self.assertLessEqual(np.max(np.abs(minimums)), 1e-6,
+                                 f'{type(step_size).__name__} failed')
+        with self.assertRaises(ValueError):
+            GradientDescent(f, df, x_0, batch=True,
+                            step_size=WolfeLineSearch()).fit()
+        with self.assertRaises(ValueError):
+            GradientDescent(None, df, x_0,
+                            step_size=ArmijoBacktracking()).fit()
+
+    def test_checkpoint(self):
+        """Test that Barzilai-Borwein steps resume bit for bit
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        options = {'learning_rate': 0.01, 'tolerance': 0}
+        reference = Adam(f, df, np.ones(10), max_iterations=60,
+                         step_size=BarzilaiBorwein(), **options)
+        expected = reference.fit()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.npz')
+            Adam(f, df, np.ones(10), max_iterations=30,
+                 step_size=BarzilaiBorwein(), **options).fit(
+                checkpoint=Checkpoint(path, every=10))
+            resumed = Adam(f, df, np.ones(10), max_iterations=60,
+                           step_size=BarzilaiBorwein(), **options)
+            np.testing.assert_array_equal(resumed.resume(path), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
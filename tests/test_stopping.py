@@ -0,0 +1,225 @@
+import os
+import tempfile
+import unittest
+import warnings
+import numpy as np
+
+from gradient_descent import (GradientDescent, Momentum, NAG, RMSprop, Adam,
+                              Checkpoint, Callback, RelativeChange, Patience,
+                              GradientNorm, WallClock, NonFinite, LastN)
+
+
+def f(x):
+    return np.sum(4*x**2)
+
+
+def df(x):
+    return 8*x
+
+
+class TestStopping(unittest.TestCase):
+
+    def test_relative_change(self):
+        """Test that a plateau of f stops the optimization before the
+        tolerance on the step is reached
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        def f_floor(x):
+            return f(x) + 1
+
+        reference = GradientDescent(f_floor, df, np.ones(5),
+                                    learning_rate=1e-3, tolerance=1e-12,
+                                    max_iterations=20000)
+        reference.fit()
+        optimizer = GradientDescent(f_floor, df, np.ones(5),
+                                    learning_rate=1e-3,
+                                    tolerance=1e-12, max_iterations=20000,
+                                    stopping=RelativeChange(1e-3, patience=2),
+                                    check_every=10)
+        minimum = optimizer.fit()
+        self.assertTrue(optimizer.stopped)
+        self.assertLess(optimizer.n_iterations, reference.n_iterations)
+        self.assertEqual(optimizer.n_iterations % 10, 0,
+                         'criterion checked between two checks')
+        self.assertLess(f(minimum), 1e-2*f(np.ones(5)))
+
+    def test_gradient_norm(self):
+        """Test the gradient norm criterion and the | combination
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        optimizer = GradientDescent(f, df, np.ones(5), learning_rate=1e-2,
+                                    tolerance=1e-12, max_iterations=20000,
+                                    stopping=GradientNorm(1e-3) | NonFinite(),
+                                    check_every=1)
+        optimizer.fit()
+        self.assertTrue(optimizer.stopped)
+        self.assertLessEqual(np.linalg.norm(optimizer._g_t), 1e-3)
+        self.assertGreater(np.linalg.norm(optimizer._g_t), 1e-3*(1 - 0.16),
+                           'did not stop at the first gradient below 1e-3')
+
+        # Both criteria have to be met with &
+        optimizer.stopping = GradientNorm(1e-3) & WallClock(3600)
+        optimizer.fit()
+        self.assertFalse(optimizer.stopped)
+
+    def test_gradient_viewing_point(self):
+        """Test that a df returning its argument, the gradient of
+        0.5*sum(x**2), gives the gradients of a df returning a copy
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for optimizer_class in (GradientDescent, Momentum, NAG, RMSprop,
+                                Adam):
+            optimizers = [optimizer_class(None, gradient, np.ones(5),
+                                          learning_rate=0.01, tolerance=0,
+                                          max_iterations=10**5,
+                                          history_sampling=LastN(),
+                                          stopping=GradientNorm(1e-3),
+                                          check_every=1)
+                          for gradient in (lambda x: x, np.copy)]
+            minimums = [optimizer.fit() for optimizer in optimizers]
+            name = optimizer_class.__name__
+            np.testing.assert_array_equal(minimums[0], minimums[1], name)
+            np.testing.assert_array_equal(optimizers[0].history.gradient_norm,
+                                          optimizers[1].history.gradient_norm,
+                                          name)
+            self.assertLessEqual(np.linalg.norm(minimums[0]), 1e-3, name)
+
+    def test_non_finite(self):
+        """Test that diverging starts of a batch, whose steps never fall
+        below the tolerance, are detected and stopped
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        diverged = []
+
+        class Recorder(Callback):
+            def on_diverge(self, optimizer, x_t, error=None):
+                diverged.append(optimizer.n_iterations)
+
+        # The learning rate is too large for the last start only
+        curvatures = np.array([1., 2., 1000.])
+        optimizer = GradientDescent(lambda x: curvatures*x**2/2,
+                                    lambda x: curvatures*x, np.ones(3),
+                                    learning_rate=0.1, batch=True,
+                                    max_iterations=100000,
+                                    stopping=NonFinite(), check_every=50,
+                                    callbacks=[Recorder()])
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            minimums = optimizer.fit()
+        self.assertTrue(optimizer.stopped)
+        self.assertLessEqual(optimizer.n_iterations, 1000)
+        np.testing.assert_array_less(np.abs(minimums[:2]), 1e-4)
+        self.assertFalse(np.isfinite(minimums[2]))
+        self.assertEqual(diverged, [optimizer.n_iterations])
+
+    def test_wall_clock(self):
+        """Test that the wall clock budget stops the optimization
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        optimizer = GradientDescent(f, df, 10.0, learning_rate=1e-12,
+                                    tolerance=0, max_iterations=10**9,
+                                    stopping=WallClock(0.05))
+        optimizer.fit()
+        self.assertTrue(optimizer.stopped)
+        self.assertLess(optimizer.n_iterations, 10**9)
+
+    def test_patience(self):
+        """Test that the starts of a batch stop on their own
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        def f_batch(x):
+            # The starts below 0 reach a floor at f = 1
+            return np.where(x < 0, np.maximum(4*x**2, 1), 4*x**2)
+
+        x_0 = np.array([-2., -1., 1., 2.])
+        optimizer = GradientDescent(f_batch, df, x_0, learning_rate=1e-2,
+                                    batch=True, tolerance=1e-8,
+                                    max_iterations=5000,
+                                    stopping=Patience(5), check_every=10)
+        minimums = optimizer.fit()
+        per_start = optimizer.n_iterations_per_start
+        np.testing.assert_array_less(per_start[:2], per_start[2:])
+        np.testing.assert_array_less(np.abs(minimums[2:]), 1e-6)
+        np.testing.assert_array_less(-0.5 - 1e-9, minimums[:2])
+
+    def test_checkpoint(self):
+        """Test that the state of the criteria resumes bit for bit
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        def make(max_iterations):
+            return Adam(f, df, np.linspace(1, 2, 4), learning_rate=1e-2,
+                        tolerance=0, max_iterations=max_iterations,
+                        stopping=RelativeChange(1e-4, patience=3) |
+                        Patience(3), check_every=5)
+
+        reference = make(5000)
+        expected = reference.fit()
+        self.assertTrue(reference.stopped)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.npz')
+            make(reference.n_iterations - 7).fit(
+                checkpoint=Checkpoint(path, every=5))
+            resumed = make(5000)
+            np.testing.assert_array_equal(resumed.resume(path), expected)
+            self.assertEqual(resumed.n_iterations, reference.n_iterations)
+
+    def test_fused_calls(self):
+        """Test that the checks take f from the fused evaluations, without
+        calling fg more than the steps do
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        calls = []
+
+        def fg(x):
+            calls.append(x)
+            return f(x), df(x)
+
+        stopping = RelativeChange(1e-4, patience=3) | Patience(3)
+        reference = Adam(f, df, np.linspace(1, 2, 4), learning_rate=1e-2,
+                         tolerance=0, max_iterations=5000, check_every=1,
+                         stopping=stopping)
+        expected = reference.fit()
+        optimizer = Adam(None, None, np.linspace(1, 2, 4), fg=fg,
+                         learning_rate=1e-2, tolerance=0, max_iterations=5000,
+                         check_every=1, stopping=stopping)
+        np.testing.assert_array_equal(optimizer.fit(), expected)
+        self.assertEqual(optimizer.n_iterations, reference.n_iterations)
+        # One call per step, plus the check of the last point
+        self.assertEqual(len(calls), optimizer.n_iterations + 1)
+        self.assertEqual(optimizer.n_gradient_evaluations, len(calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from gradient_descent import GradientDescent, Momentum, Adam, Trajectory
+from gradient_descent.sweep import (grid_search, random_search, iter_sweep,
+                                    sweep, compare)
+
+
+def f(x):
+    """Apply function to point x
+
+    Args:
+        x (float): point on x-axis
+
+    Returns:
+        (float): f(x)
+    """
+    return 4*x**2
+
+
+def df(x):
+    """Apply function gradient to point x
+
+    Args:
+        x (float): point on x-axis
+
+    Returns:
+        (float): df(x)
+    """
+    return 8*x
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        """Setting up requirements for test
+        Params:
+            None
+        Returns:
+            None
+        """
+        self.space = {Adam: {'learning_rate': [0.01, 0.1],
+                             'beta_1': [0.8, 0.9]},
+                      GradientDescent: {'learning_rate': [0.1, 1.0]}}
+
+    def test_grid_search(self):
+        """Test the configurations of grid search
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        configurations = grid_search(self.space)
+        self.assertEqual(len(configurations), 6,
+                         'incorrect number of configurations')
+        self.assertIn((Adam, {'learning_rate': 0.1, 'beta_1': 0.8}),
+                      configurations)
+
+    def test_random_search(self):
+        """Test the configurations of random search
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        space = {Momentum: {'learning_rate': (1e-3, 1e-1),
+                            'beta_1': [0.5, 0.9],
+                            'n_history_points': lambda rng: 10}}
+        configurations = random_search(space, n_samples=20, seed=0)
+        self.assertEqual(len(configurations), 20,
+                         'incorrect number of configurations')
+        for optimizer_class, parameters in configurations:
+            self.assertIs(optimizer_class, Momentum)
+            self.assertTrue(1e-3 <= parameters['learning_rate'] <= 1e-1)
+            self.assertIn(parameters['beta_1'], [0.5, 0.9])
+            self.assertEqual(parameters['n_history_points'], 10)
+        self.assertEqual(configurations,
+                         random_search(space, n_samples=20, seed=0),
+                         'random search is not reproducible')
+
+    def test_sweep(self):
+        """Test the results table of a sweep on a process pool
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        table = sweep(f, df, 10, self.space, max_workers=2,
+                      max_iterations=500)
+        self.assertEqual(len(table), 6, 'incorrect number of results')
+        self.assertEqual(set(table.dtype.names),
+                         {'optimizer', 'beta_1', 'learning_rate', 'x', 'f',
+                          'n_iterations', 'time', 'diverged'})
+
+        gradient_descent = table[table['optimizer'] == 'GradientDescent']
+        self.assertTrue(np.isnan(gradient_descent['beta_1']).all(),
+                        'beta_1 is set for GradientDescent')
+        # A learning rate of 1 makes gradient descent diverge on 4x**2
+        diverged = gradient_descent['learning_rate'] == 1.0
+        np.testing.assert_array_equal(gradient_descent['diverged'], diverged)
+        self.assertLessEqual(abs(gradient_descent['x'][~diverged][0]), 1e-6)
+        self.assertTrue((table['n_iterations'] <= 500).all())
+
+    def test_iter_sweep(self):
+        """Test that results are streamed
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        configurations = grid_search(self.space)
+        results = iter_sweep(f, df, 10, configurations, max_workers=2)
+        first = next(results)
+        self.assertIn(first['optimizer'], ['Adam', 'GradientDescent'])
+        self.assertEqual(len(list(results)), len(configurations) - 1)
+
+    def test_compare(self):
+        """Test that compare runs every optimizer from every starting point,
+        on processes and threads, and writes their trajectories
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        starts = [-2.0, 1.0, 3.0]
+        table = compare(f, df, starts, max_workers=2, max_iterations=300,
+                        parameters={Adam: {'learning_rate': 0.1}})
+        self.assertEqual(len(table), 15, 'incorrect number of results')
+        self.assertEqual(list(table['optimizer'][::3]),
+                         ['GradientDescent', 'Momentum', 'NAG', 'RMSprop',
+                          'Adam'])
+        np.testing.assert_array_equal(table['start'], [0, 1, 2]*5)
+        self.assertTrue((table['trajectory'] == '').all())
+        adam = table[table['optimizer'] == 'Adam']
+        np.testing.assert_array_equal(adam['learning_rate'], 0.1)
+        self.assertFalse(table['diverged'].any())
+
+        with tempfile.TemporaryDirectory() as directory:
+            threads = compare(f, df, starts, optimizers=[GradientDescent,
+                                                         Adam],
+                              executor='thread', trajectory_dir=directory,
+                              max_iterations=300)
+            # Same runs as on processes
+            np.testing.assert_array_equal(threads['x'][:3], table['x'][:3])
+            for row in threads:
+                trace = Trajectory(row['trajectory'])
+                self.assertEqual(os.path.dirname(row['trajectory']),
+                                 directory)
+                self.assertEqual(trace.x[0], starts[row['start']])
+                self.assertEqual(trace.x[-1], row['x'])
+                self.assertEqual(trace.iterations[-1], row['n_iterations'])
+                del trace
+
+        with self.assertRaises(ValueError):
+            compare(f, df, starts, executor='cluster')
+
+    def test_long_names(self):
+        """Test that the table keeps class names and trajectory paths of
+        any length
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        optimizer = type('A' + 'daptiveMomentEstimation'*2, (Adam,), {})
+        with tempfile.TemporaryDirectory() as directory:
+            directory = os.path.join(directory, *['nested_directory']*16)
+            os.makedirs(directory)
+            table = compare(f, df, [1.0], optimizers=[optimizer],
+                            executor='thread', trajectory_dir=directory,
+                            max_iterations=10)
+            self.assertEqual(table['optimizer'][0], optimizer.__name__)
+            self.assertGreater(len(table['trajectory'][0]), 256)
+            self.assertTrue(os.path.exists(table['trajectory'][0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
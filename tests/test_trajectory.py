@@ -0,0 +1,159 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from gradient_descent import (GradientDescent, Adam, Callback, Checkpoint,
+                              TrajectoryWriter, Trajectory)
+
+
+def f(x):
+    return np.sum(x**4 - 3*x**2 + x)
+
+
+def df(x):
+    return 4*x**3 - 6*x + 1
+
+
+class Iterates(Callback):
+    """Keeps a copy of every iterate"""
+
+    def on_fit_start(self, optimizer, x_t):
+        self.x = [np.copy(x_t)]
+
+    def on_step(self, optimizer, x_t, step):
+        self.x.append(np.copy(x_t))
+
+
+class TestTrajectory(unittest.TestCase):
+
+    def setUp(self):
+        """Setting up requirements for test
+        Params:
+            None
+        Returns:
+            None
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'trace.npy')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_full_trace(self):
+        """Test that every iterate is written, in blocks, and read back as
+        views of the file
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        iterates = Iterates()
+        writer = TrajectoryWriter(self.path, block_size=16, record_f=True)
+        optimizer = Adam(f, df, np.linspace(-2, 2, 6), learning_rate=0.01,
+                         callbacks=[iterates, writer])
+        minimum = optimizer.fit()
+
+        trace = Trajectory(self.path)
+        self.assertEqual(len(trace), optimizer.n_iterations + 1)
+        np.testing.assert_array_equal(trace.iterations,
+                                      np.arange(len(trace)))
+        np.testing.assert_array_equal(trace.x, iterates.x)
+        np.testing.assert_array_equal(trace.x[-1], minimum)
+        self.assertEqual(trace.f[-1], f(minimum))
+        # Same file as np.save would write
+        np.testing.assert_array_equal(np.load(self.path)['x'], iterates.x)
+
+        part = trace.between(100, 110)
+        np.testing.assert_array_equal(part.iterations, np.arange(100, 110))
+        self.assertIsInstance(part.records, np.memmap)
+        self.assertTrue(np.shares_memory(part.x, trace.records))
+        self.assertEqual(len(trace.between(stop=5)), 5)
+        self.assertEqual(len(trace.between(10**6)), 0)
+
+    def test_every(self):
+        """Test that every k-th iterate is written, with the starting point,
+        the last point and a scalar parameter, in batch mode
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        writer = TrajectoryWriter(self.path, every=10)
+        optimizer = GradientDescent(f, df, 1.5, learning_rate=0.01,
+                                    max_iterations=95, tolerance=0,
+                                    callbacks=[writer])
+        optimizer.fit()
+        trace = Trajectory(self.path)
+        np.testing.assert_array_equal(trace.iterations,
+                                      list(range(0, 91, 10)) + [95])
+        self.assertEqual(trace.x.shape, (11,))
+        with self.assertRaises(AttributeError):
+            trace.f
+
+        writer = TrajectoryWriter(self.path, every=50, record_f=True)
+        optimizer = GradientDescent(lambda x: x**4 - 3*x**2 + x, df,
+                                    np.linspace(-2, 2, 4), learning_rate=0.01,
+                                    batch=True, callbacks=[writer])
+        minimums = optimizer.fit()
+        trace = Trajectory(self.path)
+        self.assertEqual(trace.f.shape, (len(trace), 4))
+        np.testing.assert_array_equal(trace.x[-1], minimums)
+
+    def test_partial_trace(self):
+        """Test that the blocks already written are readable while the
+        optimization runs, and after it is interrupted
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        path = self.path
+        lengths = []
+
+        class Reader(Callback):
+            def on_step(self, optimizer, x_t, step):
+                if optimizer.n_iterations == 25:
+                    lengths.append(len(Trajectory(path)))
+                if optimizer.n_iterations == 40:
+                    raise KeyboardInterrupt
+
+        writer = TrajectoryWriter(path, block_size=8)
+        optimizer = GradientDescent(f, df, np.ones(3), learning_rate=1e-4,
+                                    callbacks=[writer, Reader()])
+        with self.assertRaises(KeyboardInterrupt):
+            optimizer.fit()
+        # Iterations 0 to 23 are in 3 blocks of 8 records
+        self.assertEqual(lengths, [24])
+        np.testing.assert_array_equal(Trajectory(path).iterations,
+                                      np.arange(41))
+
+    def test_resume(self):
+        """Test that a resumed optimization continues the trace of its
+        checkpoint
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        options = {'learning_rate': 1e-3, 'tolerance': 0}
+        reference = os.path.join(self.directory.name, 'reference.npy')
+        Adam(f, df, np.ones(3), max_iterations=100,
+             callbacks=[TrajectoryWriter(reference)], **options).fit()
+
+        checkpoint = os.path.join(self.directory.name, 'checkpoint.npz')
+        Adam(f, df, np.ones(3), max_iterations=73,
+             callbacks=[TrajectoryWriter(self.path)], **options).fit(
+            checkpoint=Checkpoint(checkpoint, every=30))
+        Adam(f, df, np.ones(3), max_iterations=100,
+             callbacks=[TrajectoryWriter(self.path)], **options).resume(
+            checkpoint)
+        np.testing.assert_array_equal(np.load(self.path), np.load(reference))
+
+
+if __name__ == '__main__':
+    unittest.main()